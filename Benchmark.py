@@ -0,0 +1,224 @@
+"""
+Module: Benchmark
+Purpose: Measures the speed and correctness of move generation and search.
+         Perft counts the leaf nodes of the move tree from the initial position and
+         from positions with chain captures, promotions and king endings, and checks
+         them against known counts. The search benchmark runs CheckersAI to a fixed
+         depth on fixed positions and reports nodes per second, time to each depth and
+         peak memory. Results are written as JSON so two runs can be compared.
+
+Usage:
+    python Benchmark.py run --output Baseline.json
+    python Benchmark.py run --output Changed.json
+    python Benchmark.py compare Baseline.json Changed.json --threshold 0.1
+    python Benchmark.py run --algorithm pvs --output PVS.json
+
+Positions use PDN FEN with squares numbered as in BitBoard (square index + 1):
+"W:W21,22,K30:B1,2" is White to move with men on 21 and 22, a king on 30 and
+black men on 1 and 2.
+"""
+
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+from BitBoard import INITIAL_FEN, MoveToNotation, ParseFEN
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# (Name, FEN, known perft counts for depth 1, 2, ..., default depth)
+PERFT_POSITIONS = [
+    ("Initial", INITIAL_FEN, (7, 49, 302, 1469, 7361, 36768, 179740, 845931), 7),
+    ("Chain Captures", "W:WK8,K23,K24:B4,10,11,17,18,19,26",
+     (10, 22, 64, 261, 1280, 5449, 28197, 129192, 673387), 8),
+    ("Promotions", "B:W5,7,K26,28:B22,24,K3,K1",
+     (2, 3, 8, 15, 63, 237, 1292, 5518, 31285, 137062), 10),
+    ("Capture Onto Promotion Row", "W:W10,K32:B6,7,14,15,22",
+     (2, 16, 64, 448, 2254, 14405, 65701, 405818), 7),
+    ("King Ending", "W:WK1,K3:BK30,K32", (4, 16, 88, 484, 2706, 15129, 87192, 499234), 7),
+    ("Middlegame", "B:W17,21,22,23,25,26,27,K3:B1,2,6,9,10,11,K30",
+     (8, 54, 244, 1263, 5474, 25420, 109940, 503567), 7),
+]
+
+# (Name, FEN, search depth)
+SEARCH_POSITIONS = [
+    ("Initial", INITIAL_FEN, 11),
+    ("Middlegame", "B:W17,21,22,23,25,26,27,K3:B1,2,6,9,10,11,K30", 11),
+    ("Chain Captures", "W:WK8,K23,K24:B4,10,11,17,18,19,26", 11),
+    ("King Ending", "W:WK1,K3:BK30,K32", 14),
+]
+
+
+def Perft(AI, Board, Player, Depth):
+    """Count the leaf nodes of Player's move tree on Board to Depth plies."""
+    Moves = AI.GetPossibleMoves(Board, Player)
+    if Depth == 1:
+        return len(Moves)
+    Opponent = 'B' if Player == 'W' else 'W'
+    Nodes = 0
+    for Move in Moves:
+        Undo = Board.MakeMove(Move)
+        Nodes += Perft(AI, Board, Opponent, Depth - 1)
+        Board.UnmakeMove(Undo)
+    return Nodes
+
+
+def PeakMemoryKB():
+    """Return the process's peak resident set size in KB, or None if it cannot be read."""
+    if resource is None:
+        return None
+    Peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return Peak // 1024 if sys.platform == "darwin" else Peak  # macOS reports bytes
+
+
+def RunPerft(AI, DepthOffset=0, Report=print):
+    """Run perft on every PERFT_POSITIONS entry; returns one result dictionary per position."""
+    Results = []
+    for Name, FEN, Counts, Depth in PERFT_POSITIONS:
+        Depth = max(1, Depth + DepthOffset)
+        Board, Player = ParseFEN(FEN)
+        StartTime = time.perf_counter()
+        Nodes = Perft(AI, Board, Player, Depth)
+        Seconds = time.perf_counter() - StartTime
+        Expected = Counts[Depth - 1] if Depth <= len(Counts) else None
+        Results.append({"Name": Name, "Depth": Depth, "Nodes": Nodes, "Expected": Expected,
+                        "Correct": Expected is None or Nodes == Expected, "Seconds": Seconds,
+                        "NodesPerSecond": Nodes / Seconds if Seconds else 0})
+        Report("perft %-28s depth %2d: %9d nodes %s %.3fs (%.0f nodes/s)"
+               % (Name, Depth, Nodes, "ok" if Results[-1]["Correct"] else "WRONG, expected %s" % Expected,
+                  Seconds, Results[-1]["NodesPerSecond"]))
+    return Results
+
+
+def RunSearch(DepthOffset=0, TraceMemory=False, Algorithm="minimax", Report=print):
+    """
+    Search every SEARCH_POSITIONS entry to its fixed depth with a fresh CheckersAI using
+    Algorithm ("minimax" or "pvs"; see CheckersAI.Algorithm).
+    With TraceMemory the search is repeated under tracemalloc to find its peak Python heap use.
+    Returns one result dictionary per position.
+    """
+    from GameBoard import GameBoard
+    from SearchToolBox import CheckersAI
+    Results = []
+    for Name, FEN, Depth in SEARCH_POSITIONS:
+        Depth = max(1, Depth + DepthOffset)
+        Board, Player = ParseFEN(FEN)
+        AI = CheckersAI(GameBoard())
+        AI.Algorithm = Algorithm
+        TimeToDepth = []
+        StartTime = time.perf_counter()
+        Score, BestMove = AI.IterativeDeepening(
+            Board, MaxDepth=Depth, IsMaximizing=Player == 'B',
+            Progress=lambda Reached, Score, Move: TimeToDepth.append(time.perf_counter() - StartTime))
+        Seconds = time.perf_counter() - StartTime
+        Result = {"Name": Name, "Depth": Depth, "CompletedDepth": AI.CompletedDepth,
+                  "Nodes": AI.SearchNodes, "Seconds": Seconds,
+                  "NodesPerSecond": AI.SearchNodes / Seconds if Seconds else 0,
+                  "TimeToDepth": TimeToDepth, "Score": Score if abs(Score) != math.inf else str(Score),
+                  "BestMove": MoveToNotation(BestMove) if BestMove else None, "PeakHeapKB": None}
+        if TraceMemory:
+            tracemalloc.start()
+            AI = CheckersAI(GameBoard())
+            AI.Algorithm = Algorithm
+            AI.IterativeDeepening(Board, MaxDepth=Depth, IsMaximizing=Player == 'B')
+            Result["PeakHeapKB"] = tracemalloc.get_traced_memory()[1] // 1024
+            tracemalloc.stop()
+        Results.append(Result)
+        Report("search %-22s depth %2d: %9d nodes %.3fs (%.0f nodes/s), best %s, score %s%s"
+               % (Name, Depth, Result["Nodes"], Seconds, Result["NodesPerSecond"], Result["BestMove"],
+                  Result["Score"], ", peak heap %d KB" % Result["PeakHeapKB"] if TraceMemory else ""))
+    return Results
+
+
+def RunBenchmarks(OutputPath=None, DepthOffset=0, TraceMemory=False, Algorithm="minimax", Report=print):
+    """Run the perft and search benchmarks; returns the results and writes them to OutputPath if given."""
+    from GameBoard import GameBoard
+    from SearchToolBox import CheckersAI
+    Results = {
+        "Python": platform.python_version(),
+        "Platform": platform.platform(),
+        "Time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "DepthOffset": DepthOffset,
+        "Algorithm": Algorithm,
+        "Perft": RunPerft(CheckersAI(GameBoard()), DepthOffset, Report),
+        "Search": RunSearch(DepthOffset, TraceMemory, Algorithm, Report),
+        "PeakMemoryKB": PeakMemoryKB(),
+    }
+    if Results["PeakMemoryKB"] is not None:
+        Report("peak memory: %d KB" % Results["PeakMemoryKB"])
+    if OutputPath is not None:
+        with open(OutputPath, "w") as File:
+            json.dump(Results, File, indent=1)
+    return Results
+
+
+def CompareRuns(Old, New, Threshold=0.1, Report=print):
+    """
+    Compare two benchmark result dictionaries. Reports every benchmark and returns the
+    list of problems: wrong perft counts, changed perft counts, and throughput or
+    time-to-depth slowdowns of more than Threshold (a fraction).
+    """
+    Problems = []
+    for Section in ("Perft", "Search"):
+        OldResults = {(Result["Name"], Result["Depth"]): Result for Result in Old[Section]}
+        for Result in New[Section]:
+            Key = (Result["Name"], Result["Depth"])
+            Label = "%s %s depth %d" % (Section.lower(), *Key)
+            if Section == "Perft" and not Result["Correct"]:
+                Problems.append("%s: %d nodes, expected %d" % (Label, Result["Nodes"], Result["Expected"]))
+            if Key not in OldResults:
+                Report("%-40s new" % Label)
+                continue
+            Before = OldResults[Key]
+            Change = Result["NodesPerSecond"] / Before["NodesPerSecond"] - 1 if Before["NodesPerSecond"] else 0
+            TimeChange = Result["Seconds"] / Before["Seconds"] - 1 if Before["Seconds"] else 0
+            Note = ""
+            if Result["Nodes"] != Before["Nodes"]:
+                Note = ", nodes %d -> %d" % (Before["Nodes"], Result["Nodes"])
+                if Section == "Perft":
+                    Problems.append("%s: perft count changed%s" % (Label, Note))
+            if Change < -Threshold:
+                Problems.append("%s: %.1f%% fewer nodes per second" % (Label, -100 * Change))
+            if Section == "Search" and TimeChange > Threshold:
+                Problems.append("%s: time to depth %.1f%% longer" % (Label, 100 * TimeChange))
+            Report("%-40s %+6.1f%% nodes/s, %+6.1f%% time%s" % (Label, 100 * Change, 100 * TimeChange, Note))
+    for Problem in Problems:
+        Report("SLOWDOWN/ERROR: " + Problem)
+    return Problems
+
+
+def Main(Arguments=None):
+    """Command-line entry point for running and comparing benchmarks."""
+    Parser = argparse.ArgumentParser(description="Run or compare checkers move generation and search benchmarks.")
+    Commands = Parser.add_subparsers(dest="Command", required=True)
+    Run = Commands.add_parser("run", help="run the perft and search benchmarks")
+    Run.add_argument("--output", default=None, help="JSON file for the results")
+    Run.add_argument("--quick", action="store_true", help="search two plies shallower everywhere")
+    Run.add_argument("--trace-memory", action="store_true", help="also measure each search's peak heap use")
+    Run.add_argument("--algorithm", choices=("minimax", "pvs"), default="minimax",
+                     help="search algorithm of the search benchmark (default minimax)")
+    Compare = Commands.add_parser("compare", help="compare two JSON result files")
+    Compare.add_argument("old")
+    Compare.add_argument("new")
+    Compare.add_argument("--threshold", type=float, default=0.1, help="slowdown fraction to flag (default 0.1)")
+    Options = Parser.parse_args(Arguments)
+
+    if Options.Command == "run":
+        Results = RunBenchmarks(Options.output, -2 if Options.quick else 0, Options.trace_memory, Options.algorithm)
+        return 0 if all(Result["Correct"] for Result in Results["Perft"]) else 1
+    with open(Options.old) as File:
+        Old = json.load(File)
+    with open(Options.new) as File:
+        New = json.load(File)
+    return 1 if CompareRuns(Old, New, Options.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(Main())
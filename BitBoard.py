@@ -0,0 +1,440 @@
+"""
+Module: BitBoard
+Purpose: Implements a compact 32-square bitboard representation of the checkers board.
+         A position is described by three integers (Black, White, Kings) and moves are
+         generated with shift-and-mask operations instead of scanning 64 string cells.
+         Also converts positions and moves to and from the GameBoard.Board layout, and
+         positions to and from PDN FEN strings.
+
+Each BitBoard also carries a 64-bit Zobrist hash of its pieces, updated
+incrementally as moves are applied. The side to move is not part of the
+position; XOR ZOBRIST_SIDE into the hash when White is to move.
+
+Piece and king counts and the material balance are likewise kept up to date
+by MakeMove and UnmakeMove, so evaluation and game-over checks are O(1).
+
+Square numbering: only the 32 dark squares ((Row + Col) % 2 == 1) are stored.
+Square = Row * 4 + Col // 2, so Black's home rows 0-2 are squares 0-11 and
+White's home rows 5-7 are squares 20-31.
+"""
+
+import random
+
+FULL_MASK = (1 << 32) - 1
+ROW_MASKS = [0xF << (4 * Row) for Row in range(8)]
+EVEN_ROWS = ROW_MASKS[0] | ROW_MASKS[2] | ROW_MASKS[4] | ROW_MASKS[6]
+ODD_ROWS = FULL_MASK ^ EVEN_ROWS
+BLACK_PROMOTION_ROW = ROW_MASKS[7]  # Black moves downward and is crowned on row 7.
+WHITE_PROMOTION_ROW = ROW_MASKS[0]  # White moves upward and is crowned on row 0.
+MAN_VALUE = 1.0
+KING_VALUE = 1.5
+INITIAL_FEN = "W:W21,22,23,24,25,26,27,28,29,30,31,32:B1,2,3,4,5,6,7,8,9,10,11,12"
+
+
+# Zobrist keys indexed [PieceType][Square]; fixed seed so hashes are stable across runs.
+BLACK_MAN, WHITE_MAN, BLACK_KING, WHITE_KING = range(4)
+_ZobristRandom = random.Random(0x5EED)
+ZOBRIST_KEYS = [[_ZobristRandom.getrandbits(64) for _ in range(32)] for _ in range(4)]
+ZOBRIST_SIDE = _ZobristRandom.getrandbits(64)
+
+
+def SquareToRowCol(Square):
+    """Return the (Row, Col) of a square index on the 8x8 board."""
+    Row = Square >> 2
+    return Row, ((Square & 3) << 1) + 1 - (Row & 1)
+
+
+def RowColToSquare(Row, Col):
+    """Return the square index of a dark (Row, Col) cell."""
+    return Row * 4 + Col // 2
+
+
+def _BuildStep(dRow, dCol):
+    """
+    Derive the shift amounts and source masks for one diagonal direction.
+    Returns (EvenShift, EvenMask, OddShift, OddMask): squares on even rows shift by
+    EvenShift, squares on odd rows by OddShift, and only squares in the masks have
+    an on-board neighbour in that direction.
+    """
+    Shifts = {0: None, 1: None}
+    Masks = {0: 0, 1: 0}
+    for Square in range(32):
+        Row, Col = SquareToRowCol(Square)
+        NewRow, NewCol = Row + dRow, Col + dCol
+        if 0 <= NewRow < 8 and 0 <= NewCol < 8:
+            Shifts[Row & 1] = RowColToSquare(NewRow, NewCol) - Square
+            Masks[Row & 1] |= 1 << Square
+    return Shifts[0], Masks[0], Shifts[1], Masks[1]
+
+
+# Directions are indexed 0-3; men of each colour only use their two forward directions.
+DIRECTIONS = [(1, -1), (1, 1), (-1, -1), (-1, 1)]
+STEPS = [_BuildStep(dRow, dCol) for dRow, dCol in DIRECTIONS]
+REVERSE_DIRECTION = [3, 2, 1, 0]
+FORWARD_DIRECTIONS = {'B': (0, 1), 'W': (2, 3)}
+ALL_DIRECTIONS = (0, 1, 2, 3)
+
+
+def Step(Bits, Direction):
+    """Shift every square in Bits one diagonal step in Direction, dropping squares that leave the board."""
+    EvenShift, EvenMask, OddShift, OddMask = STEPS[Direction]
+    Even = Bits & EvenMask
+    Odd = Bits & OddMask
+    Even = Even << EvenShift if EvenShift > 0 else Even >> -EvenShift
+    Odd = Odd << OddShift if OddShift > 0 else Odd >> -OddShift
+    return Even | Odd
+
+
+def IterateSquares(Bits):
+    """Yield the square index of every set bit, lowest first."""
+    while Bits:
+        Low = Bits & -Bits
+        yield Low.bit_length() - 1
+        Bits ^= Low
+
+
+def MoveToRowCol(Move):
+    """
+    Convert a bitboard move to GameBoard coordinates: (StartRow, StartCol, TargetRow, TargetCol)
+    for a single step or jump, followed by one more (Row, Col) pair for every further hop
+    of a multi-jump.
+    """
+    Coordinates = ()
+    for Square in Move[3]:
+        Coordinates += SquareToRowCol(Square)
+    return Coordinates
+
+
+def MoveToNotation(Move):
+    """
+    Return Move in standard numeric notation, squares numbered 1-32 (square index + 1):
+    "9-13" for a quiet move, "22x15x6" for every hop of a capture.
+    """
+    return ("x" if Move[2] else "-").join(str(Square + 1) for Square in Move[3])
+
+
+def _ExtendJump(From, Square, Captured, Path, Directions, Opponent, Empty, StopRow, Moves):
+    """
+    Continue a capture sequence that has reached Square, appending every complete jump path
+    to Moves. Jumped pieces stay on the board until the move ends, so they can neither be
+    jumped twice nor landed on. A man stops on reaching StopRow, since crowning ends the move.
+    """
+    Bit = 1 << Square
+    if Bit & StopRow:
+        Moves.append((From, Square, Captured, Path))
+        return
+    Extended = False
+    Capturable = Opponent & ~Captured
+    for Direction in Directions:
+        Middle = Step(Bit, Direction) & Capturable
+        if Middle:
+            Landing = Step(Middle, Direction) & Empty
+            if Landing:
+                Extended = True
+                Next = Landing.bit_length() - 1
+                _ExtendJump(From, Next, Captured | Middle, Path + (Next,), Directions,
+                            Opponent, Empty, StopRow, Moves)
+    if not Extended:
+        Moves.append((From, Square, Captured, Path))
+
+
+class BitBoard:
+    """
+    A checkers position stored as three 32-bit occupancy masks, with cached counts:
+    BlackPieces/WhitePieces (men and kings), BlackKings/WhiteKings, and Material
+    (Black's material minus White's, men worth MAN_VALUE and kings KING_VALUE).
+    """
+
+    __slots__ = ("Black", "White", "Kings", "Hash",
+                 "BlackPieces", "WhitePieces", "BlackKings", "WhiteKings", "Material")
+
+    def __init__(self, Black=0, White=0, Kings=0, Hash=None):
+        self.Black = Black
+        self.White = White
+        self.Kings = Kings
+        self.Hash = self.ComputeHash() if Hash is None else Hash
+        self.RecountPieces()
+
+    def RecountPieces(self):
+        """Recompute the cached piece counts and material balance from the masks."""
+        self.BlackPieces = self.Black.bit_count()
+        self.WhitePieces = self.White.bit_count()
+        self.BlackKings = (self.Black & self.Kings).bit_count()
+        self.WhiteKings = (self.White & self.Kings).bit_count()
+        self.Material = ((self.BlackPieces - self.BlackKings - self.WhitePieces + self.WhiteKings) * MAN_VALUE
+                         + (self.BlackKings - self.WhiteKings) * KING_VALUE)
+
+    def ComputeHash(self):
+        """Compute the Zobrist hash of the position from scratch."""
+        Hash = 0
+        for Type, Bits in ((BLACK_MAN, self.Black & ~self.Kings), (WHITE_MAN, self.White & ~self.Kings),
+                           (BLACK_KING, self.Black & self.Kings), (WHITE_KING, self.White & self.Kings)):
+            Keys = ZOBRIST_KEYS[Type]
+            for Square in IterateSquares(Bits):
+                Hash ^= Keys[Square]
+        return Hash
+
+    @classmethod
+    def FromBoard(cls, Board):
+        """Build a BitBoard from an 8x8 GameBoard.Board list of strings."""
+        Black = White = Kings = 0
+        for Row in range(8):
+            for Col in range(8):
+                Piece = Board[Row][Col]
+                if Piece == '.':
+                    continue
+                Bit = 1 << RowColToSquare(Row, Col)
+                if Piece[0] == 'B':
+                    Black |= Bit
+                else:
+                    White |= Bit
+                if len(Piece) == 2 and Piece.endswith("K"):
+                    Kings |= Bit
+        return cls(Black, White, Kings)
+
+    def ToBoard(self):
+        """Return the position as an 8x8 GameBoard.Board list of strings."""
+        Board = [['.' for _ in range(8)] for _ in range(8)]
+        for Square in IterateSquares(self.Black | self.White):
+            Row, Col = SquareToRowCol(Square)
+            Bit = 1 << Square
+            Piece = 'B' if self.Black & Bit else 'W'
+            Board[Row][Col] = Piece + 'K' if self.Kings & Bit else Piece
+        return Board
+
+    def Copy(self):
+        """Return an independent copy of this position."""
+        return BitBoard(self.Black, self.White, self.Kings, self.Hash)
+
+    def __eq__(self, Other):
+        return (isinstance(Other, BitBoard) and self.Black == Other.Black
+                and self.White == Other.White and self.Kings == Other.Kings)
+
+    def __hash__(self):
+        return self.Hash
+
+    def __repr__(self):
+        return "BitBoard(Black=%#010x, White=%#010x, Kings=%#010x)" % (self.Black, self.White, self.Kings)
+
+    def GetMoves(self, Player, AllPaths=False):
+        """
+        Generate all legal moves for Player ('B' or 'W') as (From, To, Captured, Path) tuples:
+        Captured is the bitmask of jumped squares (0 for a quiet move) and Path the squares
+        visited, from From to To. A multi-jump is a single move covering the whole capture
+        sequence. Captures are mandatory: if any jump exists only jumps are returned.
+        A king that can capture the same pieces along different paths gets one move for
+        them, unless AllPaths is set (for checking a multi-jump played hop by hop).
+        """
+        if Player == 'B':
+            Own, Opponent, PromotionRow = self.Black, self.White, BLACK_PROMOTION_ROW
+        else:
+            Own, Opponent, PromotionRow = self.White, self.Black, WHITE_PROMOTION_ROW
+        Empty = FULL_MASK & ~(self.Black | self.White)
+        OwnKings = Own & self.Kings
+        Forward = FORWARD_DIRECTIONS[Player]
+
+        JumpMoves = []
+        KingJumps = []
+        for Direction in ALL_DIRECTIONS:
+            Movers = Own if Direction in Forward else OwnKings
+            if not Movers:
+                continue
+            Middles = Step(Movers, Direction) & Opponent
+            Targets = Step(Middles, Direction) & Empty
+            Back = REVERSE_DIRECTION[Direction]
+            for Target in IterateSquares(Targets):
+                Middle = Step(1 << Target, Back)
+                FromBit = Step(Middle, Back)
+                From = FromBit.bit_length() - 1
+                # The jumping piece's own square is free for the rest of the sequence.
+                if FromBit & OwnKings:
+                    _ExtendJump(From, Target, Middle, (From, Target), ALL_DIRECTIONS,
+                                Opponent, Empty | FromBit, 0, KingJumps)
+                else:
+                    _ExtendJump(From, Target, Middle, (From, Target), Forward,
+                                Opponent, Empty | FromBit, PromotionRow, JumpMoves)
+        if KingJumps and AllPaths:
+            JumpMoves += KingJumps
+        elif KingJumps:
+            # A king can reach the same result along different paths; keep one of each.
+            Seen = set()
+            for Move in KingJumps:
+                if Move[:3] not in Seen:
+                    Seen.add(Move[:3])
+                    JumpMoves.append(Move)
+        if JumpMoves:
+            return JumpMoves
+
+        Moves = []
+        for Direction in ALL_DIRECTIONS:
+            Movers = Own if Direction in Forward else OwnKings
+            if not Movers:
+                continue
+            Targets = Step(Movers, Direction) & Empty
+            Back = REVERSE_DIRECTION[Direction]
+            for Target in IterateSquares(Targets):
+                From = Step(1 << Target, Back).bit_length() - 1
+                Moves.append((From, Target, 0, (From, Target)))
+        return Moves
+
+    def HasCapture(self, Player):
+        """Return True if Player ('B' or 'W') has a jump available, without generating the moves."""
+        if Player == 'B':
+            Own, Opponent = self.Black, self.White
+        else:
+            Own, Opponent = self.White, self.Black
+        Empty = FULL_MASK & ~(self.Black | self.White)
+        OwnKings = Own & self.Kings
+        Forward = FORWARD_DIRECTIONS[Player]
+        for Direction in ALL_DIRECTIONS:
+            Movers = Own if Direction in Forward else OwnKings
+            if Movers and Step(Step(Movers, Direction) & Opponent, Direction) & Empty:
+                return True
+        return False
+
+    def FindMove(self, Player, Notation):
+        """
+        Return the legal move of Player written as Notation ("9-13", "22x15" or a full
+        capture path "22x15x6"), or None if no legal move matches. A capture given only
+        by its start and end square matches the first legal sequence between them.
+        """
+        Squares = tuple(int(Square) - 1 for Square in Notation.replace("x", "-").split("-"))
+        for Move in self.GetMoves(Player):
+            if Move[3] == Squares or (len(Squares) == 2 and Move[0] == Squares[0] and Move[1] == Squares[1]):
+                return Move
+        return None
+
+    def ApplyMove(self, Move):
+        """Return a new BitBoard after applying Move, leaving this position unchanged."""
+        Board = BitBoard(self.Black, self.White, self.Kings, self.Hash)
+        Board.MakeMove(Move)
+        return Board
+
+    def MakeMove(self, Move):
+        """
+        Apply Move to this position in place, removing captured pieces and crowning kings.
+        The Zobrist hash is updated incrementally from the squares that changed.
+        Returns an undo entry (Move, CapturedKings, Promoted, PreviousHash) for UnmakeMove.
+        """
+        From, To, Captured, _ = Move
+        FromBit = 1 << From
+        ToBit = 1 << To
+        Kings = self.Kings
+        IsKing = Kings & FromBit
+        CapturedKings = Captured & Kings
+        if self.Black & FromBit:
+            self.Black ^= FromBit ^ ToBit
+            MoverType = BLACK_KING if IsKing else BLACK_MAN
+            OpponentMan, OpponentKing = WHITE_MAN, WHITE_KING
+            Promoted = not IsKing and ToBit & BLACK_PROMOTION_ROW != 0
+            if Captured:
+                self.White &= ~Captured
+                LostPieces, LostKings = Captured.bit_count(), CapturedKings.bit_count()
+                self.WhitePieces -= LostPieces
+                self.WhiteKings -= LostKings
+                self.Material += (LostPieces - LostKings) * MAN_VALUE + LostKings * KING_VALUE
+            if Promoted:
+                self.BlackKings += 1
+                self.Material += KING_VALUE - MAN_VALUE
+        else:
+            self.White ^= FromBit ^ ToBit
+            MoverType = WHITE_KING if IsKing else WHITE_MAN
+            OpponentMan, OpponentKing = BLACK_MAN, BLACK_KING
+            Promoted = not IsKing and ToBit & WHITE_PROMOTION_ROW != 0
+            if Captured:
+                self.Black &= ~Captured
+                LostPieces, LostKings = Captured.bit_count(), CapturedKings.bit_count()
+                self.BlackPieces -= LostPieces
+                self.BlackKings -= LostKings
+                self.Material -= (LostPieces - LostKings) * MAN_VALUE + LostKings * KING_VALUE
+            if Promoted:
+                self.WhiteKings += 1
+                self.Material -= KING_VALUE - MAN_VALUE
+        Undo = (Move, CapturedKings, Promoted, self.Hash)
+        Hash = self.Hash ^ ZOBRIST_KEYS[MoverType][From]
+        Hash ^= ZOBRIST_KEYS[MoverType + 2 if Promoted else MoverType][To]
+        for Square in IterateSquares(Captured):
+            Hash ^= ZOBRIST_KEYS[OpponentKing if CapturedKings >> Square & 1 else OpponentMan][Square]
+        if IsKing:
+            Kings ^= FromBit ^ ToBit
+        elif Promoted:
+            Kings |= ToBit
+        self.Kings = Kings & ~Captured
+        self.Hash = Hash
+        return Undo
+
+    def UnmakeMove(self, Undo):
+        """Take back the move recorded in Undo, restoring captured pieces and uncrowning promotions."""
+        (From, To, Captured, _), CapturedKings, Promoted, Hash = Undo
+        FromBit = 1 << From
+        ToBit = 1 << To
+        if self.Black & ToBit:
+            self.Black ^= FromBit ^ ToBit
+            if Captured:
+                self.White |= Captured
+                LostPieces, LostKings = Captured.bit_count(), CapturedKings.bit_count()
+                self.WhitePieces += LostPieces
+                self.WhiteKings += LostKings
+                self.Material -= (LostPieces - LostKings) * MAN_VALUE + LostKings * KING_VALUE
+            if Promoted:
+                self.BlackKings -= 1
+                self.Material -= KING_VALUE - MAN_VALUE
+        else:
+            self.White ^= FromBit ^ ToBit
+            if Captured:
+                self.Black |= Captured
+                LostPieces, LostKings = Captured.bit_count(), CapturedKings.bit_count()
+                self.BlackPieces += LostPieces
+                self.BlackKings += LostKings
+                self.Material += (LostPieces - LostKings) * MAN_VALUE + LostKings * KING_VALUE
+            if Promoted:
+                self.WhiteKings -= 1
+                self.Material += KING_VALUE - MAN_VALUE
+        Kings = self.Kings
+        if Promoted:
+            Kings &= ~ToBit
+        elif Kings & ToBit:
+            Kings ^= FromBit ^ ToBit
+        self.Kings = Kings | CapturedKings
+        self.Hash = Hash
+
+    def CountPieces(self, Player):
+        """Return the number of pieces (men and kings) Player has on the board."""
+        return self.BlackPieces if Player == 'B' else self.WhitePieces
+
+    def CountKings(self, Player):
+        """Return the number of kings Player has on the board."""
+        return self.BlackKings if Player == 'B' else self.WhiteKings
+
+
+def ParseFEN(Text):
+    """
+    Return (BitBoard, Player) for a PDN FEN string such as "W:W21,K30:B1,2".
+    Square ranges ("B1-12") and a trailing period, both found in PDN files, are accepted.
+    Raises ValueError if a square is given to both colors.
+    """
+    Side, *Parts = Text.strip().rstrip(".").split(":")
+    Black = White = Kings = 0
+    for Part in Parts:
+        Color, Squares = Part[0], Part[1:]
+        for Token in filter(None, Squares.split(",")):
+            First, _, Last = Token.lstrip("K").partition("-")
+            for Square in range(int(First) - 1, int(Last or First)):
+                if Color == "B":
+                    Black |= 1 << Square
+                else:
+                    White |= 1 << Square
+                if Token.startswith("K"):
+                    Kings |= 1 << Square
+    if Black & White:
+        raise ValueError("square %d is both black and white" % ((Black & White).bit_length()))
+    return BitBoard(Black, White, Kings), Side
+
+
+def FormatFEN(Board, Player):
+    """Return the PDN FEN string of Board with Player ('B' or 'W') to move; the inverse of ParseFEN."""
+    Parts = [Player]
+    for Color, Bits in (("W", Board.White), ("B", Board.Black)):
+        Parts.append(Color + ",".join(("K" if Board.Kings >> Square & 1 else "") + str(Square + 1)
+                                      for Square in range(32) if Bits >> Square & 1))
+    return ":".join(Parts)
@@ -4,11 +4,26 @@ Purpose: Implements a Tkinter-based graphical interface for the Checkers game.
          Displays the board, highlights kings with a "K" mark, processes mouse clicks,
          and shows live cumulative analytics including move ordering details.
          Also serves as the main entry point.
+         Canvas items are created once and kept in a square-to-item map; a move only
+         reconfigures the squares it changed. Legal targets of the selected piece are
+         highlighted, and moves are animated with a single floating piece.
 """
 
+import queue
+import threading
+import time
 import tkinter as tk
 from PlayingTheGame import PlayCheckers
 
+POLL_MS = 16  # How often the Tk loop checks on a background AI search
+SPINNER = "|/-\\"
+SQUARE_SIZE = 50
+PIECE_MARGIN = 10
+FRAME_MS = 16  # Target time between animation frames
+HOP_MS = 150  # Animation time of one step or jump
+LIGHT_SQUARE, DARK_SQUARE = "white", "gray"
+SELECTED_SQUARE, TARGET_SQUARE = "gold", "light green"
+
 class CheckersGUI:
     def __init__(self, Master, GameSession):
         self.Master = Master
@@ -18,39 +33,153 @@ class CheckersGUI:
         # A label to display status: piece counts, win messages, live analytics, and move ordering details.
         self.StatusLabel = tk.Label(Master, text="Game in progress", font=("Arial", 14))
         self.StatusLabel.pack(pady=10)
+        self.StatusText = ""
+        self.StopButton = tk.Button(Master, text="Move Now", state=tk.DISABLED, command=self.StopThinking)
+        self.StopButton.pack(pady=5)
         self.SelectedPiece = None
+        # Canvas items, created once by CreateItems:
+        self.SquareItems = {}  # (Row, Col) -> background rectangle
+        self.PieceItems = {}  # (Row, Col) -> (oval, "K" text) of the piece on that dark square
+        self.Shown = {}  # (Row, Col) -> piece string the items currently show
+        self.Highlighted = []  # Squares whose background is highlighted
+        self.Floating = None  # (oval, "K" text) used to animate a moving piece
+        self.Animation = None  # (Path, Piece, Dirty, StartTime) of the running animation
+        # Background AI search state:
+        self.GameSession.AutoReply = False  # The GUI runs the AI reply on its own thread.
+        self.Thinking = False
+        self.ThinkingText = ""
+        self.Spinner = SPINNER[0]
+        self.ProgressQueue = queue.Queue()
+        self.PollCount = 0
+        self.CreateItems()
         self.DrawBoard()
         self.Canvas.bind("<Button-1>", self.OnClick)
+        self.Master.protocol("WM_DELETE_WINDOW", self.OnClose)
 
-    def DrawBoard(self):
-        """Draw the checkers board and pieces, highlighting kings with a red 'K'."""
-        self.Canvas.delete("all")
+    def CreateItems(self):
+        """Create every square and piece item once; later updates only reconfigure them."""
         for Row in range(8):
             for Col in range(8):
-                Color = "white" if (Row + Col) % 2 == 0 else "gray"
-                self.Canvas.create_rectangle(Col * 50, Row * 50, (Col + 1) * 50, (Row + 1) * 50, fill=Color)
-                Piece = self.GameSession.Game.Board[Row][Col]
-                if Piece in ('W', 'B', 'WK', 'BK'):
-                    PieceColor = "white" if Piece[0] == 'W' else "black"
-                    X1 = Col * 50 + 10
-                    Y1 = Row * 50 + 10
-                    X2 = (Col + 1) * 50 - 10
-                    Y2 = (Row + 1) * 50 - 10
-                    self.Canvas.create_oval(X1, Y1, X2, Y2, fill=PieceColor)
-                    # If piece is a king, add a "K" mark.
-                    if len(Piece) == 2 and Piece.endswith("K"):
-                        self.Canvas.create_text((X1 + X2) // 2, (Y1 + Y2) // 2,
-                                                text="K", font=("Arial", 16), fill="red")
+                Color = LIGHT_SQUARE if (Row + Col) % 2 == 0 else DARK_SQUARE
+                self.SquareItems[(Row, Col)] = self.Canvas.create_rectangle(
+                    Col * SQUARE_SIZE, Row * SQUARE_SIZE, (Col + 1) * SQUARE_SIZE, (Row + 1) * SQUARE_SIZE, fill=Color)
+                if (Row + Col) % 2 == 1:
+                    self.PieceItems[(Row, Col)] = self.CreatePiece(Row, Col)
+                    self.Shown[(Row, Col)] = '.'
+        self.Floating = self.CreatePiece(0, 0)
+
+    def CreatePiece(self, Row, Col):
+        """Create a hidden piece (oval and "K" mark) on the square (Row, Col)."""
+        X1, Y1, X2, Y2 = self.PieceBox(Row, Col)
+        Oval = self.Canvas.create_oval(X1, Y1, X2, Y2, state=tk.HIDDEN)
+        King = self.Canvas.create_text((X1 + X2) // 2, (Y1 + Y2) // 2, text="K", font=("Arial", 16),
+                                       fill="red", state=tk.HIDDEN)
+        return Oval, King
+
+    def PieceBox(self, Row, Col):
+        """Return the oval coordinates of a piece on the square (Row, Col); Row and Col may be fractional."""
+        return (Col * SQUARE_SIZE + PIECE_MARGIN, Row * SQUARE_SIZE + PIECE_MARGIN,
+                (Col + 1) * SQUARE_SIZE - PIECE_MARGIN, (Row + 1) * SQUARE_SIZE - PIECE_MARGIN)
+
+    def ShowPiece(self, Items, Piece):
+        """Configure a piece's items to show Piece ('W', 'B', 'WK', 'BK' or '.' for none)."""
+        Oval, King = Items
+        if Piece == '.':
+            self.Canvas.itemconfigure(Oval, state=tk.HIDDEN)
+            self.Canvas.itemconfigure(King, state=tk.HIDDEN)
+            return
+        self.Canvas.itemconfigure(Oval, state=tk.NORMAL, fill="white" if Piece[0] == 'W' else "black")
+        self.Canvas.itemconfigure(King, state=tk.NORMAL if Piece.endswith("K") else tk.HIDDEN)
+
+    def DrawBoard(self, Squares=None):
+        """
+        Bring the pieces on Squares (all dark squares if None) in line with the board,
+        highlighting kings with a red 'K'. Squares that already show the right piece are
+        left alone, so the cost of a move is the handful of squares it changed.
+        """
+        Board = self.GameSession.Game.Board
+        for Square in self.PieceItems if Squares is None else Squares:
+            Piece = Board[Square[0]][Square[1]]
+            if self.Shown.get(Square, Piece) != Piece:
+                self.ShowPiece(self.PieceItems[Square], Piece)
+                self.Shown[Square] = Piece
         self.UpdateStatus()
 
+    def MoveSquares(self, Move):
+        """Return the squares a row/col Move changes: every square on its path and every jumped square."""
+        Squares = []
+        for Index in range(0, len(Move) - 2, 2):
+            FromRow, FromCol, ToRow, ToCol = Move[Index:Index + 4]
+            Squares.append((FromRow, FromCol))
+            if abs(ToRow - FromRow) == 2:
+                Squares.append(((FromRow + ToRow) // 2, (FromCol + ToCol) // 2))
+        Squares.append((Move[-2], Move[-1]))
+        return Squares
+
+    def Highlight(self, Squares):
+        """Highlight the selected piece's square and its legal targets, clearing the previous highlight."""
+        for Square in self.Highlighted:
+            self.Canvas.itemconfigure(self.SquareItems[Square], fill=DARK_SQUARE)
+        self.Highlighted = list(Squares)
+        for Index, Square in enumerate(self.Highlighted):
+            self.Canvas.itemconfigure(self.SquareItems[Square], fill=SELECTED_SQUARE if Index == 0 else TARGET_SQUARE)
+
+    def LegalTargets(self, Row, Col):
+        """Return the squares the human's piece on (Row, Col) can legally move or jump to."""
+        return [Hop[2:] for Hop in self.GameSession.Game.LegalHops('W') if Hop[:2] == (Row, Col)]
+
+    def Animate(self, Move, Piece):
+        """
+        Slide a copy of Piece along the row/col Move path, which has already been played on
+        the board; the changed squares are redrawn when it arrives. Positions follow the
+        clock rather than the frame count, so slow displays drop frames instead of lagging.
+        """
+        self.FinishAnimation()
+        Dirty = self.MoveSquares(Move)
+        Start = (Move[0], Move[1])
+        self.ShowPiece(self.PieceItems[Start], '.')
+        self.Shown[Start] = '.'
+        self.ShowPiece(self.Floating, Piece)
+        for Item in self.Floating:
+            self.Canvas.tag_raise(Item)
+        self.Animation = (Move, Piece, Dirty, time.perf_counter())
+        self.AnimateFrame()
+
+    def AnimateFrame(self):
+        """Place the floating piece for the current time and schedule the next frame."""
+        if self.Animation is None:
+            return
+        Move, _, _, StartTime = self.Animation
+        Hops = len(Move) // 2 - 1
+        Progress = (time.perf_counter() - StartTime) * 1000 / HOP_MS
+        if Progress >= Hops:
+            self.FinishAnimation()
+            return
+        Hop = int(Progress)
+        Fraction = Progress - Hop
+        FromRow, FromCol, ToRow, ToCol = Move[2 * Hop:2 * Hop + 4]
+        X1, Y1, X2, Y2 = self.PieceBox(FromRow + (ToRow - FromRow) * Fraction, FromCol + (ToCol - FromCol) * Fraction)
+        Oval, King = self.Floating
+        self.Canvas.coords(Oval, X1, Y1, X2, Y2)
+        self.Canvas.coords(King, (X1 + X2) / 2, (Y1 + Y2) / 2)
+        self.Master.after(FRAME_MS, self.AnimateFrame)
+
+    def FinishAnimation(self):
+        """End the running animation, if any, and show the final position of its squares."""
+        if self.Animation is None:
+            return
+        _, _, Dirty, _ = self.Animation
+        self.Animation = None
+        self.ShowPiece(self.Floating, '.')
+        self.DrawBoard(Dirty)
+
     def UpdateStatus(self):
         """
         Update the status label to show current piece counts, win messages,
         live cumulative analytics, and the last move ordering details.
         """
-        Board = self.GameSession.Game.Board
-        WhitePieces = sum(Row.count('W') + Row.count('WK') for Row in Board)
-        BlackPieces = sum(Row.count('B') + Row.count('BK') for Row in Board)
+        WhitePieces = self.GameSession.Game.CountPieces('W')
+        BlackPieces = self.GameSession.Game.CountPieces('B')
         StatusText = f"White: {WhitePieces} pieces   Black: {BlackPieces} pieces"
         if WhitePieces == 0:
             StatusText += " | Black wins!"
@@ -58,10 +187,10 @@ class CheckersGUI:
             StatusText += " | White wins!"
         # Retrieve cumulative analytics directly from the game session.
         stats = self.GameSession.GenerateReport()
-        # Compute cumulative ordering gain: percentage of pruned nodes relative to expanded nodes.
+        # Compute cumulative ordering gain: percentage of prunings caused by the first move searched.
         ordering_gain = 0
-        if stats.get("States Explored", 0) > 0:
-            ordering_gain = (stats.get("Pruned States", 0) / stats.get("States Explored", 0)) * 100
+        if stats.get("Pruned States", 0) > 0:
+            ordering_gain = (stats.get("First Move Cutoffs", 0) / stats.get("Pruned States", 0)) * 100
         AnalyticsText = (
             f"\nMoves: {stats['Total Moves']}   "
             f"Expanded: {stats['States Explored']}   "
@@ -69,41 +198,127 @@ class CheckersGUI:
             f"Avg AI Move Time: {stats['Average AI Move Time']:.3f}s   "
             f"Ordering Gain: {ordering_gain:.1f}%"
         )
+        if self.GameSession.Ponderer is not None:
+            AnalyticsText += f"   Ponder Hits: {stats['Ponder Hits']}/{stats['Ponder Hits'] + stats['Ponder Misses']}"
+        # Per-ply statistics of the last AI search, when the session collects them.
+        LastSearch = stats.get("Last Search")
+        if LastSearch:
+            AnalyticsText += (
+                f"\nLast Search → Nodes: {LastSearch['Nodes']}   "
+                f"Branching: {LastSearch['Branching Factor']:.2f}   "
+                f"First-Move Cutoffs: {LastSearch['First Move Cutoff Rate']:.1f}%   "
+                f"TT Hits: {LastSearch['TT Hits']}   "
+                f"Plies: {len(LastSearch['Per Ply'])}"
+            )
         # Retrieve the last move ordering details from the AI.
         last_ordering = getattr(self.GameSession.AI, "LastMoveOrdering", "")
-        self.StatusLabel.config(text=StatusText + AnalyticsText + "\n" + last_ordering)
+        if self.Thinking:
+            last_ordering = self.ThinkingText + " " + self.Spinner
+        Text = StatusText + AnalyticsText + "\n" + last_ordering
+        if Text != self.StatusText:
+            self.StatusText = Text
+            self.StatusLabel.config(text=Text)
 
     def OnClick(self, Event):
         """Handle mouse clicks for piece selection and move execution."""
-        Row = Event.y // 50
-        Col = Event.x // 50
-        if self.SelectedPiece is None:
-            # Select the piece if it belongs to the human (White).
-            if self.GameSession.Game.Board[Row][Col] in ('W', 'WK'):
-                self.SelectedPiece = (Row, Col)
-        else:
+        if self.Thinking:
+            return  # The board belongs to the AI until it has moved.
+        Row = Event.y // SQUARE_SIZE
+        Col = Event.x // SQUARE_SIZE
+        if not (0 <= Row < 8 and 0 <= Col < 8):
+            return
+        if self.GameSession.Game.Board[Row][Col] in ('W', 'WK'):
+            # Select (or switch to) a piece of the human (White) and show where it can go.
+            self.SelectPiece(Row, Col)
+        elif self.SelectedPiece is not None:
             self.MovePiece(Row, Col)
 
+    def SelectPiece(self, Row, Col):
+        """Select the human's piece on (Row, Col), or clear the selection if Row is None."""
+        if Row is None:
+            self.SelectedPiece = None
+            self.Highlight([])
+        else:
+            self.SelectedPiece = (Row, Col)
+            self.Highlight([(Row, Col)] + self.LegalTargets(Row, Col))
+
     def MovePiece(self, NewRow, NewCol):
         """Execute the move from the selected piece to the target square."""
         StartingMoveLocationRow, StartingMoveLocationCol = self.SelectedPiece
+        Piece = self.GameSession.Game.Board[StartingMoveLocationRow][StartingMoveLocationCol]
         if self.GameSession.HumanMove(StartingMoveLocationRow, StartingMoveLocationCol, NewRow, NewCol):
-            self.SelectedPiece = None
-            self.DrawBoard()
-            if "wins" not in self.StatusLabel.cget("text"):
-                self.Master.after(1000, self.AIMove)
+            self.SelectPiece(None, None)
+            self.Animate((StartingMoveLocationRow, StartingMoveLocationCol, NewRow, NewCol), Piece)
+            if self.GameSession.CurrentPlayer == "ai":
+                self.AIMove()
+            elif self.GameSession.Game.ChainPlayer == 'W':
+                self.SelectPiece(NewRow, NewCol)  # The chain jump continues with the same piece.
         else:
             # Invalid move: deselect the piece.
-            self.SelectedPiece = None
+            self.SelectPiece(None, None)
 
     def AIMove(self):
-        """Trigger the AI move and update the board."""
-        self.GameSession.AIMove()
-        self.DrawBoard()
+        """Start the AI move on a background thread, after the session's optional thinking delay."""
+        self.Thinking = True
+        self.ThinkingText = "AI thinking..."
+        self.UpdateStatus()
+        self.Master.after(int(self.GameSession.ThinkDelay * 1000), self.StartThinking)
+
+    def StartThinking(self):
+        """Run the AI search on a worker thread and begin polling it for progress."""
+        self.GameSession.AI.StopRequested = False  # Forget a stop that came too late for the last search.
+        self.StopButton.config(state=tk.NORMAL)
+        threading.Thread(target=self.Think, daemon=True).start()
+        self.Master.after(POLL_MS, self.PollThinking)
+
+    def Think(self):
+        """Worker thread: choose the AI move, posting each finished search depth to the progress queue."""
+        def Progress(Depth, Score, BestMove):
+            self.ProgressQueue.put(("depth", Depth, Score, BestMove))
+        self.ProgressQueue.put(("done", self.GameSession.ChooseAIMove(Progress)))
+
+    def PollThinking(self):
+        """Show the AI's progress and play its move once the worker thread is done."""
+        self.PollCount += 1
+        Finished = False
+        while True:
+            try:
+                Message = self.ProgressQueue.get_nowait()
+            except queue.Empty:
+                break
+            if Message[0] == "depth":
+                _, Depth, Score, BestMove = Message
+                self.ThinkingText = f"AI thinking → Depth: {Depth}, Best: {BestMove}, Score: {Score:.2f}"
+            else:
+                Finished = True
+                self.Thinking = False
+                self.StopButton.config(state=tk.DISABLED)
+                Move = Message[1]
+                Piece = self.GameSession.Game.Board[Move[0]][Move[1]] if Move else None
+                self.GameSession.FinishAIMove(Move)
+                if Move:
+                    self.Animate(Move, Piece)
+                else:
+                    self.UpdateStatus()
+        if not Finished:
+            self.Spinner = SPINNER[self.PollCount // 6 % len(SPINNER)]
+            self.UpdateStatus()
+            self.Master.after(POLL_MS, self.PollThinking)
+
+    def StopThinking(self):
+        """Make the AI play the best move of its deepest finished search depth now."""
+        self.GameSession.AI.RequestStop()
+
+    def OnClose(self):
+        """Stop any running search or pondering before closing the window."""
+        self.GameSession.AI.RequestStop()
+        self.GameSession.StopPondering()
+        self.GameSession.SaveGame()  # An unfinished game is kept with result "*".
+        self.Master.destroy()
 
 if __name__ == "__main__":
     root = tk.Tk()
     root.title("Checkers Game")
-    GameSession = PlayCheckers()
+    GameSession = PlayCheckers(Statistics=True, Ponder=True)
     gui = CheckersGUI(root, GameSession)
     root.mainloop()
@@ -0,0 +1,322 @@
+"""
+Module: EndgameTablebase
+Purpose: Builds and probes win/loss/draw endgame tables with distance to win.
+         The builder solves every position with up to N pieces by retrograde
+         analysis and writes a compact indexed binary file; the engine probes that
+         file through mmap with a small LRU page cache.
+
+Usage:
+    python EndgameTablebase.py build --pieces 3 --output Endgame3.cktb
+    python EndgameTablebase.py info Endgame3.cktb
+
+File format (little-endian):
+    Header      b"CKTB", version (u16), max pieces (u16), slice count (u32)
+    Directory   per slice: BlackMen, BlackKings, WhiteMen, WhiteKings (4 x u8),
+                data offset (u64), entry count (u64)
+    Data        one u16 per index: result in the top 2 bits, distance in plies below.
+
+A slice holds every placement of one material balance, for both sides to move.
+Each piece group (black men, black kings, white men, white kings) is ranked in
+the combinatorial number system over the squares it may occupy (men never stand
+on their crowning row), and the group ranks and side to move are combined in
+mixed radix. Indices whose groups overlap on a square are stored as INVALID.
+"""
+
+import argparse
+import itertools
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from math import comb
+
+from BitBoard import BitBoard, BLACK_PROMOTION_ROW, WHITE_PROMOTION_ROW, IterateSquares
+
+MAGIC = b"CKTB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+DIRECTORY_ENTRY = struct.Struct("<4BQQ")
+ENTRY_BYTES = 2
+PAGE_SIZE = 4096
+
+# Results, from the point of view of the side to move.
+INVALID, WIN, LOSS, DRAW = range(4)
+RESULT_SHIFT = 14
+DISTANCE_MASK = (1 << RESULT_SHIFT) - 1
+
+# Search score of a won position; the distance is subtracted so faster wins score higher.
+TABLEBASE_WIN = 1000
+
+# Men of each colour may not stand on their own crowning row.
+BLACK_MAN_SQUARES = [Square for Square in range(32) if not BLACK_PROMOTION_ROW >> Square & 1]
+WHITE_MAN_SQUARES = [Square for Square in range(32) if not WHITE_PROMOTION_ROW >> Square & 1]
+KING_SQUARES = list(range(32))
+GROUP_SQUARES = (BLACK_MAN_SQUARES, KING_SQUARES, WHITE_MAN_SQUARES, KING_SQUARES)
+# Position of each board square within a group's square list.
+GROUP_POSITIONS = [{Square: Position for Position, Square in enumerate(Squares)} for Squares in GROUP_SQUARES]
+
+
+def SliceSize(Material):
+    """Return the number of indices of the slice for Material (BlackMen, BlackKings, WhiteMen, WhiteKings)."""
+    Size = 2
+    for Count, Squares in zip(Material, GROUP_SQUARES):
+        Size *= comb(len(Squares), Count)
+    return Size
+
+
+def MaterialOf(Board):
+    """Return the (BlackMen, BlackKings, WhiteMen, WhiteKings) counts of a BitBoard."""
+    return (Board.BlackPieces - Board.BlackKings, Board.BlackKings,
+            Board.WhitePieces - Board.WhiteKings, Board.WhiteKings)
+
+
+def _GroupMasks(Board):
+    """Return the occupancy masks of the four piece groups, in slice order."""
+    return (Board.Black & ~Board.Kings, Board.Black & Board.Kings,
+            Board.White & ~Board.Kings, Board.White & Board.Kings)
+
+
+def PositionIndex(Board, Material, Player):
+    """Return the index of Board with Player ('B' or 'W') to move within its material slice."""
+    Index = 0
+    for Mask, Count, Squares, Positions in zip(_GroupMasks(Board), Material, GROUP_SQUARES, GROUP_POSITIONS):
+        Rank = 0
+        for Number, Square in enumerate(IterateSquares(Mask), 1):
+            Rank += comb(Positions[Square], Number)
+        Index = Index * comb(len(Squares), Count) + Rank
+    return Index * 2 + (Player == 'W')
+
+
+def _EnumerateSlice(Material):
+    """Yield (Index, BitBoard, Player) for every valid position of a slice, in index order."""
+    GroupCombinations = []
+    for Count, Squares in zip(Material, GROUP_SQUARES):
+        # Colex order matches the combinatorial ranks used by PositionIndex.
+        Combos = sorted(itertools.combinations(Squares, Count), key=lambda Combo: Combo[::-1])
+        GroupCombinations.append([sum(1 << Square for Square in Combo) for Combo in Combos])
+    Index = 0
+    for BlackMen, BlackKings, WhiteMen, WhiteKings in itertools.product(*GroupCombinations):
+        Black = BlackMen | BlackKings
+        White = WhiteMen | WhiteKings
+        Valid = (not BlackMen & BlackKings and not WhiteMen & WhiteKings and not Black & White)
+        if Valid:
+            Board = BitBoard(Black, White, BlackKings | WhiteKings)
+            yield Index, Board, 'B'
+            yield Index + 1, Board, 'W'
+        Index += 2
+
+
+def SliceOrder(MaxPieces):
+    """
+    Return every material balance with 2..MaxPieces pieces (at least one per side) in an
+    order where captures and promotions always lead to slices that come earlier.
+    """
+    Slices = []
+    for BlackMen, BlackKings, WhiteMen, WhiteKings in itertools.product(range(MaxPieces + 1), repeat=4):
+        Black = BlackMen + BlackKings
+        White = WhiteMen + WhiteKings
+        if Black and White and Black + White <= MaxPieces:
+            Slices.append((BlackMen, BlackKings, WhiteMen, WhiteKings))
+    Slices.sort(key=lambda Material: (sum(Material), Material[0] + Material[2], Material))
+    return Slices
+
+
+def _SolveSlice(Material, Lookup):
+    """
+    Solve one slice by retrograde analysis and return its entries as array('H').
+    Lookup(Board, Material, Player) returns the packed entry of a position in an earlier slice.
+    Positions are resolved in layers: layer n holds the wins and losses in n plies,
+    so every stored distance is exact. Positions never resolved are draws.
+    """
+    Size = SliceSize(Material)
+    Entries = array('H', bytes(Size * ENTRY_BYTES))
+    Successors = {}  # Index -> (indices in this slice, packed entries in earlier slices)
+    for Index, Board, Player in _EnumerateSlice(Material):
+        Moves = Board.GetMoves(Player)
+        if not Moves:
+            Entries[Index] = LOSS << RESULT_SHIFT
+            continue
+        Opponent = 'W' if Player == 'B' else 'B'
+        Local, External = [], []
+        for Move in Moves:
+            Child = Board.ApplyMove(Move)
+            if not (Child.BlackPieces and Child.WhitePieces):
+                External.append(LOSS << RESULT_SHIFT)  # The opponent has no pieces left.
+                continue
+            ChildMaterial = MaterialOf(Child)
+            if ChildMaterial == Material:
+                Local.append(PositionIndex(Child, Material, Opponent))
+            else:
+                External.append(Lookup(Child, ChildMaterial, Opponent))
+        Successors[Index] = (Local, External)
+
+    Layer = 1
+    LastExternal = max((Entry & DISTANCE_MASK for _, External in Successors.values() for Entry in External),
+                       default=0)
+    while Successors:
+        Resolved = []
+        for Index, (Local, External) in Successors.items():
+            Losses = Pending = 0
+            # A successor only counts once the layer has passed its distance, keeping distances exact.
+            for Entry in External:
+                if (Entry & DISTANCE_MASK) >= Layer or Entry >> RESULT_SHIFT == DRAW:
+                    Pending += 1
+                elif Entry >> RESULT_SHIFT == LOSS:
+                    Losses += 1
+            for Child in Local:
+                Result = Entries[Child] >> RESULT_SHIFT
+                if Result == LOSS:
+                    Losses += 1
+                elif Result != WIN:
+                    Pending += 1
+            if Losses:
+                Resolved.append((Index, WIN))
+            elif not Pending:
+                Resolved.append((Index, LOSS))
+        for Index, Result in Resolved:
+            Entries[Index] = Result << RESULT_SHIFT | min(Layer, DISTANCE_MASK)
+            del Successors[Index]
+        if not Resolved and Layer > LastExternal:
+            break
+        Layer += 1
+    for Index in Successors:
+        Entries[Index] = DRAW << RESULT_SHIFT
+    return Entries
+
+
+def BuildTablebase(MaxPieces, OutputPath, Report=print):
+    """
+    Solve every slice with up to MaxPieces pieces and write them to OutputPath.
+    Returns a dictionary with the slice count, position count, file size and build time.
+    """
+    StartTime = time.perf_counter()
+    Solved = {}
+
+    def Lookup(Board, Material, Player):
+        return Solved[Material][PositionIndex(Board, Material, Player)]
+
+    Slices = SliceOrder(MaxPieces)
+    for Material in Slices:
+        SliceStart = time.perf_counter()
+        Solved[Material] = _SolveSlice(Material, Lookup)
+        Report("Slice BM=%d BK=%d WM=%d WK=%d: %d entries in %.2fs"
+               % (Material + (len(Solved[Material]), time.perf_counter() - SliceStart)))
+
+    Offset = HEADER.size + DIRECTORY_ENTRY.size * len(Slices)
+    Directory = []
+    for Material in Slices:
+        Directory.append(DIRECTORY_ENTRY.pack(*Material, Offset, len(Solved[Material])))
+        Offset += len(Solved[Material]) * ENTRY_BYTES
+    with open(OutputPath, "wb") as File:
+        File.write(HEADER.pack(MAGIC, VERSION, MaxPieces, len(Slices)))
+        File.write(b"".join(Directory))
+        for Material in Slices:
+            Entries = Solved[Material]
+            if sys.byteorder == "big":
+                Entries.byteswap()
+            File.write(Entries.tobytes())
+    Stats = {
+        "Slices": len(Slices),
+        "Positions": sum(len(Entries) for Entries in Solved.values()),
+        "File Size": os.path.getsize(OutputPath),
+        "Build Time": time.perf_counter() - StartTime,
+    }
+    Report("Built %s: %d slices, %d positions, %d bytes in %.2fs"
+           % (OutputPath, Stats["Slices"], Stats["Positions"], Stats["File Size"], Stats["Build Time"]))
+    return Stats
+
+
+class EndgameTablebase:
+    def __init__(self, Path, CachePages=64):
+        """Open a tablebase file; at most CachePages pages of PAGE_SIZE bytes are kept decoded."""
+        self.Path = Path
+        self.File = open(Path, "rb")
+        self.Map = mmap.mmap(self.File.fileno(), 0, access=mmap.ACCESS_READ)
+        Magic, Version, self.MaxPieces, SliceCount = HEADER.unpack_from(self.Map, 0)
+        if Magic != MAGIC or Version != VERSION:
+            raise ValueError("%s is not a version %d checkers tablebase" % (Path, VERSION))
+        self.Slices = {}  # Material -> (data offset, entry count)
+        for Number in range(SliceCount):
+            *Material, Offset, Count = DIRECTORY_ENTRY.unpack_from(self.Map, HEADER.size + Number * DIRECTORY_ENTRY.size)
+            self.Slices[tuple(Material)] = (Offset, Count)
+        self.CachePages = CachePages
+        self.Cache = OrderedDict()  # Page number -> page bytes, least recently used first
+        self.Probes = 0
+        self.CacheHits = 0
+
+    def Close(self):
+        """Release the memory map and the file."""
+        self.Cache.clear()
+        self.Map.close()
+        self.File.close()
+
+    def _ReadEntry(self, Position):
+        """Return the u16 entry at byte Position, going through the LRU page cache."""
+        Page = Position // PAGE_SIZE
+        Data = self.Cache.get(Page)
+        if Data is None:
+            Data = self.Map[Page * PAGE_SIZE:(Page + 1) * PAGE_SIZE]
+            self.Cache[Page] = Data
+            if len(self.Cache) > self.CachePages:
+                self.Cache.popitem(last=False)
+        else:
+            self.CacheHits += 1
+            self.Cache.move_to_end(Page)
+        Offset = Position - Page * PAGE_SIZE
+        return Data[Offset] | Data[Offset + 1] << 8
+
+    def Probe(self, Board, Player):
+        """
+        Look up Board with Player to move.
+        Returns (Result, Distance) with Result WIN, LOSS or DRAW for the side to move,
+        or None if the material is not covered by the file.
+        """
+        if not (Board.BlackPieces and Board.WhitePieces):
+            return (LOSS, 0) if not Board.CountPieces(Player) else (WIN, 0)
+        Material = MaterialOf(Board)
+        Slice = self.Slices.get(Material)
+        if Slice is None:
+            return None
+        self.Probes += 1
+        Entry = self._ReadEntry(Slice[0] + PositionIndex(Board, Material, Player) * ENTRY_BYTES)
+        return Entry >> RESULT_SHIFT, Entry & DISTANCE_MASK
+
+    def Score(self, Board, IsMaximizing):
+        """Return the search score (from Black's point of view) of Board, or None if not covered."""
+        Probe = self.Probe(Board, 'B' if IsMaximizing else 'W')
+        if Probe is None:
+            return None
+        Result, Distance = Probe
+        if Result == DRAW:
+            return 0
+        Score = TABLEBASE_WIN - Distance
+        return Score if (Result == WIN) == IsMaximizing else -Score
+
+
+def Main(Arguments=None):
+    """Command-line entry point for building and inspecting tablebase files."""
+    Parser = argparse.ArgumentParser(description="Build or inspect checkers endgame tablebases.")
+    Commands = Parser.add_subparsers(dest="Command", required=True)
+    Build = Commands.add_parser("build", help="solve every position with up to N pieces")
+    Build.add_argument("--pieces", type=int, default=3, help="maximum number of pieces (default 3)")
+    Build.add_argument("--output", default="Endgame.cktb", help="output file")
+    Info = Commands.add_parser("info", help="list the slices of a tablebase file")
+    Info.add_argument("path")
+    Options = Parser.parse_args(Arguments)
+
+    if Options.Command == "build":
+        BuildTablebase(Options.pieces, Options.output)
+    else:
+        Tablebase = EndgameTablebase(Options.path)
+        print("%s: up to %d pieces, %d slices, %d bytes"
+              % (Options.path, Tablebase.MaxPieces, len(Tablebase.Slices), os.path.getsize(Options.path)))
+        for Material, (Offset, Count) in Tablebase.Slices.items():
+            print("  BM=%d BK=%d WM=%d WK=%d: %d entries at offset %d" % (Material + (Count, Offset)))
+        Tablebase.Close()
+
+
+if __name__ == "__main__":
+    Main()
@@ -0,0 +1,200 @@
+"""
+Module: Evaluation
+Purpose: Positional evaluation of BitBoard positions for the Minimax search.
+         The score, from Black's (the maximizing side's) point of view, adds up
+         material, a piece-square table for men, a back-rank guard bonus, mobility
+         (simple moves available to each side) and king centralization. Weights come
+         from a JSON config file (see EvaluationWeights.json) or DEFAULT_WEIGHTS.
+
+Evaluate scores one position with bit operations. EvaluateChildren scores every child
+of a frontier node at once: with NumPy installed and enough children, the positions are
+stacked as an (N, 32) int8 array (0 empty, 1/2 black man/king, -1/-2 white man/king) and
+scored in one vectorized call; otherwise each child is scored with Evaluate. Both paths
+use integer arithmetic in thousandths of a man, so they return exactly the same scores.
+"""
+
+import json
+
+from BitBoard import ROW_MASKS, STEPS, SquareToRowCol, Step
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional; batches are then scored one position at a time.
+    numpy = None
+
+SCALE = 1000  # Weights are applied in thousandths of a man.
+NUMPY_MIN_BATCH = 16  # Measured break-even; smaller batches are faster in pure Python than through NumPy.
+
+DEFAULT_WEIGHTS = {
+    "Man": 1.0,
+    "King": 1.5,
+    # Bonus for a black man on each square 0-31; white men use the table rotated by 180 degrees.
+    "ManTable": [0.0, 0.0, 0.0, 0.0,
+                 0.0, 0.01, 0.01, 0.0,
+                 0.02, 0.03, 0.03, 0.02,
+                 0.04, 0.05, 0.05, 0.04,
+                 0.06, 0.07, 0.07, 0.06,
+                 0.08, 0.09, 0.09, 0.08,
+                 0.1, 0.1, 0.1, 0.1,
+                 0.0, 0.0, 0.0, 0.0],
+    "BackRankGuard": 0.04,  # Per man still guarding its own back row
+    "Mobility": 0.02,  # Per simple move available
+    "KingCentralization": 0.05,  # For a king in the four centre squares, less towards the edges
+}
+
+_BLACK_BACK_ROW = ROW_MASKS[0]
+_WHITE_BACK_ROW = ROW_MASKS[7]
+# Step() unrolled for the mobility term: directions 0 and 1 shift up, 2 and 3 shift down.
+(_SHIFT0_EVEN, _MASK0_EVEN, _SHIFT0_ODD, _MASK0_ODD), (_SHIFT1_EVEN, _MASK1_EVEN, _SHIFT1_ODD, _MASK1_ODD) = STEPS[:2]
+(_SHIFT2_EVEN, _MASK2_EVEN, _SHIFT2_ODD, _MASK2_ODD), (_SHIFT3_EVEN, _MASK3_EVEN, _SHIFT3_ODD, _MASK3_ODD) = (
+    (-EvenShift, EvenMask, -OddShift, OddMask) for EvenShift, EvenMask, OddShift, OddMask in STEPS[2:])
+
+
+def LoadWeights(Path):
+    """Return DEFAULT_WEIGHTS updated with the weights in the JSON file at Path."""
+    with open(Path) as File:
+        Weights = json.load(File)
+    Unknown = set(Weights) - set(DEFAULT_WEIGHTS)
+    if Unknown:
+        raise ValueError("%s: unknown evaluation weights %s" % (Path, ", ".join(sorted(Unknown))))
+    if len(Weights.get("ManTable", DEFAULT_WEIGHTS["ManTable"])) != 32:
+        raise ValueError("%s: ManTable needs one entry per square (32)" % Path)
+    return dict(DEFAULT_WEIGHTS, **Weights)
+
+
+def _Centralization(Square):
+    """Return 1.0 for the centre squares down to 0.0 for the corners."""
+    Row, Col = SquareToRowCol(Square)
+    return (6 - (abs(2 * Row - 7) + abs(2 * Col - 7) - 2) / 2) / 6
+
+
+def _ByteTables(Table):
+    """Split a 32-entry square table into four 256-entry tables, one per byte of a bitboard."""
+    return [[sum(Table[8 * Byte + Bit] for Bit in range(8) if Value >> Bit & 1) for Value in range(256)]
+            for Byte in range(4)]
+
+
+def _TableSum(Tables, Bits):
+    return (Tables[0][Bits & 255] + Tables[1][Bits >> 8 & 255] +
+            Tables[2][Bits >> 16 & 255] + Tables[3][Bits >> 24])
+
+
+class Evaluator:
+    def __init__(self, Weights=None):
+        """Build the lookup tables for Weights (a dictionary like DEFAULT_WEIGHTS; defaults if None)."""
+        self.Weights = dict(DEFAULT_WEIGHTS, **(Weights or {}))
+        Weights = self.Weights
+        self.Man = round(Weights["Man"] * SCALE)
+        self.King = round(Weights["King"] * SCALE)
+        self.BackRankGuard = round(Weights["BackRankGuard"] * SCALE)
+        self.Mobility = round(Weights["Mobility"] * SCALE)
+        self.BlackManTable = [round(Value * SCALE) for Value in Weights["ManTable"]]
+        self.WhiteManTable = self.BlackManTable[::-1]
+        self.KingTable = [round(Weights["KingCentralization"] * _Centralization(Square) * SCALE)
+                          for Square in range(32)]
+        self.BlackManBytes = _ByteTables(self.BlackManTable)
+        self.WhiteManBytes = _ByteTables(self.WhiteManTable)
+        self.KingBytes = _ByteTables(self.KingTable)
+        if numpy is not None:
+            self.Bits = numpy.arange(32, dtype=numpy.uint32)
+            # Row Square * 5 + Piece + 2 of the flattened tables holds the terms of Piece (-2..2) on
+            # Square: PieceTerms the material, table and back-rank score, MobilityTerms the
+            # mobility score per direction (zero where the piece cannot move or the edge is).
+            PieceTerms = numpy.zeros((32, 5), dtype=numpy.int64)
+            MobilityTerms = numpy.zeros((32, 5, 4), dtype=numpy.int64)
+            # Neighbour square in each direction, 32 (an always-occupied pad column) off the board.
+            Neighbours = numpy.full((32, 4), 32)
+            for Square in range(32):
+                PieceTerms[Square] = (-self.King - self.KingTable[Square],
+                                      -self.Man - self.WhiteManTable[Square] - self.BackRankGuard * (Square >= 28),
+                                      0,
+                                      self.Man + self.BlackManTable[Square] + self.BackRankGuard * (Square < 4),
+                                      self.King + self.KingTable[Square])
+                for Direction in range(4):
+                    Target = Step(1 << Square, Direction)
+                    if Target:
+                        Neighbours[Square, Direction] = Target.bit_length() - 1
+                        Man = 3 if Direction < 2 else 1
+                        MobilityTerms[Square, Man, Direction] = self.Mobility if Man == 3 else -self.Mobility
+                        MobilityTerms[Square, 0, Direction] = -self.Mobility
+                        MobilityTerms[Square, 4, Direction] = self.Mobility
+            self.PieceTerms = PieceTerms.ravel()
+            self.MobilityTerms = MobilityTerms.reshape(160, 4)
+            self.Neighbours = Neighbours
+            self.SquareRows = numpy.arange(32) * 5 + 2
+
+    @classmethod
+    def FromFile(cls, Path):
+        """Create an Evaluator with the weights of the JSON config file at Path."""
+        return cls(LoadWeights(Path))
+
+    def Evaluate(self, Board):
+        """Return the score of a BitBoard position, positive when Black stands better."""
+        Black, White, Kings = Board.Black, Board.White, Board.Kings
+        BlackKings = Black & Kings
+        WhiteKings = White & Kings
+        BlackMen = Black ^ BlackKings
+        WhiteMen = White ^ WhiteKings
+        Empty = ~(Black | White)
+        Score = (self.Man * (Board.BlackPieces - Board.BlackKings - Board.WhitePieces + Board.WhiteKings) +
+                 self.King * (Board.BlackKings - Board.WhiteKings))
+        Score += _TableSum(self.BlackManBytes, BlackMen) - _TableSum(self.WhiteManBytes, WhiteMen)
+        if Kings:
+            Score += _TableSum(self.KingBytes, BlackKings) - _TableSum(self.KingBytes, WhiteKings)
+        Score += self.BackRankGuard * ((BlackMen & _BLACK_BACK_ROW).bit_count() -
+                                       (WhiteMen & _WHITE_BACK_ROW).bit_count())
+        if self.Mobility:
+            Moves = ((((Black & _MASK0_EVEN) << _SHIFT0_EVEN | (Black & _MASK0_ODD) << _SHIFT0_ODD) & Empty).bit_count() +
+                     (((Black & _MASK1_EVEN) << _SHIFT1_EVEN | (Black & _MASK1_ODD) << _SHIFT1_ODD) & Empty).bit_count() -
+                     (((White & _MASK2_EVEN) >> _SHIFT2_EVEN | (White & _MASK2_ODD) >> _SHIFT2_ODD) & Empty).bit_count() -
+                     (((White & _MASK3_EVEN) >> _SHIFT3_EVEN | (White & _MASK3_ODD) >> _SHIFT3_ODD) & Empty).bit_count())
+            if Kings:
+                Moves += ((Step(BlackKings, 2) & Empty).bit_count() + (Step(BlackKings, 3) & Empty).bit_count() -
+                          (Step(WhiteKings, 0) & Empty).bit_count() - (Step(WhiteKings, 1) & Empty).bit_count())
+            Score += self.Mobility * Moves
+        return Score / SCALE
+
+    def StackBoards(self, Positions):
+        """Return (Black, White, Kings) bitboard triples as an (N, 32) int8 array of signed pieces."""
+        Bitboards = numpy.array(Positions, dtype=numpy.uint32)
+        Unpacked = ((Bitboards[:, :, None] >> self.Bits) & 1).astype(numpy.int8)
+        return (Unpacked[:, 0] - Unpacked[:, 1]) * (1 + Unpacked[:, 2])
+
+    def PrefersBatch(self, Count):
+        """Return True if EvaluateChildren scores Count children faster than Evaluate one at a time."""
+        return numpy is not None and Count >= NUMPY_MIN_BATCH
+
+    def EvaluateChildren(self, Board, Moves, Player=None):
+        """
+        Return the score of the position after each of Moves on Board, which is left unchanged.
+        With Player given, children in which Player has a capture to make are left unscored
+        (None), because a capture search has to play the jump out before they can be scored.
+        """
+        Batch = self.PrefersBatch(len(Moves))
+        Scores = [None] * len(Moves)
+        Scored = []
+        Positions = []
+        for Index, Move in enumerate(Moves):
+            Undo = Board.MakeMove(Move)
+            if Player is None or not Board.HasCapture(Player):
+                if Batch:
+                    Scored.append(Index)
+                    Positions.append((Board.Black, Board.White, Board.Kings))
+                else:
+                    Scores[Index] = self.Evaluate(Board)
+            Board.UnmakeMove(Undo)
+        if Positions:
+            for Index, Score in zip(Scored, self.EvaluateStacked(self.StackBoards(Positions))):
+                Scores[Index] = Score
+        return Scores
+
+    def EvaluateStacked(self, Stacked):
+        """Score an (N, 32) int8 array from StackBoards in one vectorized pass; returns a list of floats."""
+        Rows = Stacked + self.SquareRows
+        Score = self.PieceTerms[Rows].sum(1)
+        if self.Mobility:
+            # Pad column 32 is never empty, so off-board neighbours never count as moves.
+            Empty = numpy.zeros((len(Stacked), 33), dtype=numpy.int64)
+            Empty[:, :32] = Stacked == 0
+            Score += (self.MobilityTerms[Rows] * Empty[:, self.Neighbours]).sum((1, 2))
+        return (Score / SCALE).tolist()
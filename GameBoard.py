@@ -1,12 +1,26 @@
 """
 Module: GameBoard
 Purpose: Provides the board setup and methods for validating and executing moves in American Checkers.
+         The rules live in BitBoard, shared with the AI: a turn's legal moves, multi-jump
+         paths included, are generated once and cached, so validating a hop is a lookup.
 """
 
+from BitBoard import BitBoard, MoveToRowCol
+
 class GameBoard:
     def __init__(self):
         """Initialize the checkers board with 12 pieces per side placed on dark squares."""
         self.Board = self.CreateInitialBoard()
+        # Number of pieces of each kind on the board, kept up to date by MovePiece.
+        self.PieceCounts = self.CountBoardPieces()
+        self.ResetTurn()
+
+    def ResetTurn(self):
+        """Rebuild the rules engine's position from self.Board and forget the cached legal moves."""
+        self.Position = BitBoard.FromBoard(self.Board)  # The position at the start of the turn
+        self.Hops = {}  # Player -> cached LegalHops
+        self.ChainPlayer = None  # Player in the middle of a multi-jump, if any
+        self.ChainHops = 0  # Hops of that multi-jump played so far
 
     def CreateInitialBoard(self):
         """Create an 8x8 board and place pieces on dark squares.
@@ -25,133 +39,89 @@ class GameBoard:
                     Board[Row][Col] = 'W'
         return Board
 
+    def CountBoardPieces(self):
+        """Count the pieces of each kind ('B', 'W', 'BK', 'WK') on the board."""
+        Counts = {'B': 0, 'W': 0, 'BK': 0, 'WK': 0}
+        for Row in self.Board:
+            for Cell in Row:
+                if Cell != '.':
+                    Counts[Cell] += 1
+        return Counts
+
+    def RecountPieces(self):
+        """Resynchronize PieceCounts and the rules engine after self.Board was changed directly."""
+        self.PieceCounts = self.CountBoardPieces()
+        self.ResetTurn()
+
+    def CountPieces(self, Player):
+        """Return the number of pieces (men and kings) Player has on the board."""
+        return self.PieceCounts[Player] + self.PieceCounts[Player + 'K']
+
+    def LegalHops(self, Player):
+        """
+        Return the hops Player may play next as {(StartingMoveLocationRow, StartingMoveLocationCol,
+        TargetingMoveLocationRow, TargetingMoveLocationCol): legal moves through that hop}.
+        The legal moves are generated by BitBoard once per turn and cached; during a
+        multi-jump only the moves continuing the hops already played remain.
+        """
+        Hops = self.Hops.get(Player)
+        if Hops is None:
+            if self.ChainPlayer is not None:
+                return {}  # The other side is in the middle of a multi-jump.
+            Hops = self.Hops[Player] = self.GroupHops(self.Position.GetMoves(Player, AllPaths=True))
+        return Hops
+
+    def GroupHops(self, Moves):
+        """Group Moves by their next hop, the one after the ChainHops hops already played."""
+        Index = 2 * self.ChainHops
+        Hops = {}
+        for Move in Moves:
+            Hops.setdefault(MoveToRowCol(Move)[Index:Index + 4], []).append(Move)
+        return Hops
+
+    def LegalMoves(self, Player):
+        """
+        Return Player's legal moves this turn as BitBoard (From, To, Captured, Path) tuples,
+        one per result as BitBoard.GetMoves gives them.
+        """
+        Moves = {}
+        for HopMoves in self.LegalHops(Player).values():
+            for Move in HopMoves:
+                Moves.setdefault(Move[:3], Move)
+        return list(Moves.values())
+
     def AnyCaptureAvailable(self, Player):
         """
         Return True if any capture (jump) move is available for the specified Player.
         """
-        for Row in range(8):
-            for Col in range(8):
-                Piece = self.Board[Row][Col]
-                if Piece != '.' and Piece[0] == Player:
-                    if len(Piece) == 2 and Piece.endswith("K"):
-                        Directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-                    else:
-                        # For non-kings: Black moves downward; White moves upward.
-                        Directions = [(1, -1), (1, 1)] if Player == 'B' else [(-1, -1), (-1, 1)]
-                    for dR, dC in Directions:
-                        TargetingMoveLocationRow = Row + 2 * dR
-                        TargetingMoveLocationCol = Col + 2 * dC
-                        MidRow = Row + dR
-                        MidCol = Col + dC
-                        if 0 <= TargetingMoveLocationRow < 8 and 0 <= TargetingMoveLocationCol < 8:
-                            if self.Board[TargetingMoveLocationRow][TargetingMoveLocationCol] == '.':
-                                MidPiece = self.Board[MidRow][MidCol]
-                                if MidPiece != '.' and MidPiece[0] != Player:
-                                    return True
-        return False
+        return any(abs(Hop[2] - Hop[0]) == 2 for Hop in self.LegalHops(Player))
 
     def CanCaptureFrom(self, CurrentRow, CurrentCol, Player):
         """
         Return True if the piece at (CurrentRow, CurrentCol) can perform a jump (capture).
         This helps implement chain captures.
         """
-        Piece = self.Board[CurrentRow][CurrentCol]
-        if Piece == '.' or Piece[0] != Player:
-            return False
-        if len(Piece) == 2 and Piece.endswith("K"):
-            JumpDirs = [(-2, -2), (-2, 2), (2, -2), (2, 2)]
-        else:
-            # For non-king pieces: Black moves downward; White moves upward.
-            JumpDirs = [(2, -2), (2, 2)] if Player == 'W' else [(-2, -2), (-2, 2)]
-        for dR, dC in JumpDirs:
-            NewRow = CurrentRow + dR
-            NewCol = CurrentCol + dC
-            MidRow = CurrentRow + dR // 2
-            MidCol = CurrentCol + dC // 2
-            if 0 <= NewRow < 8 and 0 <= NewCol < 8:
-                if self.Board[NewRow][NewCol] == '.':
-                    MidPiece = self.Board[MidRow][MidCol]
-                    if MidPiece != '.' and MidPiece[0] != Player:
-                        return True
-        return False
+        return any(Hop[:2] == (CurrentRow, CurrentCol) and abs(Hop[2] - Hop[0]) == 2
+                   for Hop in self.LegalHops(Player))
 
     def IsValidMove(self, StartingMoveLocationRow, StartingMoveLocationCol,
                     TargetingMoveLocationRow, TargetingMoveLocationCol, Player):
         """
-        Check if a move is valid based on American Checkers rules.
-        Debug prints are included to trace the validation process.
+        Check if a move (one hop of a multi-jump) is valid based on American Checkers rules:
+        a lookup in the turn's cached legal hops.
         """
-        Debug = False  # Set to True for verbose debugging.
-
-        # Check if target is within bounds.
-        if not (0 <= TargetingMoveLocationRow < 8 and 0 <= TargetingMoveLocationCol < 8):
-            if Debug: print("Move rejected: destination out of bounds.")
-            return False
-
-        # Destination must be empty.
-        if self.Board[TargetingMoveLocationRow][TargetingMoveLocationCol] != '.':
-            if Debug: print("Move rejected: destination square is occupied.")
-            return False
-
-        Piece = self.Board[StartingMoveLocationRow][StartingMoveLocationCol]
-        if Piece == '.':
-            if Debug: print("Move rejected: no piece at StartingMoveLocation(%d,%d)." % (StartingMoveLocationRow, StartingMoveLocationCol))
-            return False
-
-        # Ensure the piece belongs to the Player.
-        if Piece[0] != Player:
-            if Debug: print("Move rejected: piece does not belong to %s." % Player)
-            return False
-
-        # Check if the piece is a king.
-        IsKing = (len(Piece) == 2 and Piece.endswith("K"))
-        if IsKing:
-            AllowedDirs = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-            if Debug: print("Piece is a king. Allowed directions:", AllowedDirs)
-        else:
-            AllowedDirs = [(1, -1), (1, 1)] if Player == 'B' else [(-1, -1), (-1, 1)]
-            if Debug: print("Piece is not a king. Allowed directions:", AllowedDirs)
-
-        dRow = TargetingMoveLocationRow - StartingMoveLocationRow
-        dCol = TargetingMoveLocationCol - StartingMoveLocationCol
-        MoveVector = (dRow, dCol)
-        if Debug: print("Attempting move:", MoveVector)
-
-        # Normal (non-capturing) move.
-        if MoveVector in AllowedDirs:
-            if self.AnyCaptureAvailable(Player):
-                if Debug: print("Move rejected: a capture is available; non-capturing moves are not allowed.")
-                return False
-            if Debug: print("Non-capturing move accepted.")
-            return True
-
-        # Jump (capture) move: must move two squares diagonally.
-        if (abs(dRow), abs(dCol)) == (2, 2):
-            if not IsKing:
-                AllowedJump = [(dr * 2, dc * 2) for dr, dc in AllowedDirs]
-                if MoveVector not in AllowedJump:
-                    if Debug: print("Move rejected: jump direction not allowed for non-king piece.")
-                    return False
-            MidRow = StartingMoveLocationRow + dRow // 2
-            MidCol = StartingMoveLocationCol + dCol // 2
-            MidPiece = self.Board[MidRow][MidCol]
-            if MidPiece == '.' or MidPiece[0] == Player:
-                if Debug: print("Move rejected: no opponent piece to capture.")
-                return False
-            if Debug: print("Capture move accepted.")
-            return True
-
-        if Debug: print("Move rejected: move pattern not recognized.")
-        return False
+        return (StartingMoveLocationRow, StartingMoveLocationCol,
+                TargetingMoveLocationRow, TargetingMoveLocationCol) in self.LegalHops(Player)
 
     def MovePiece(self, StartingMoveLocationRow, StartingMoveLocationCol,
                   TargetingMoveLocationRow, TargetingMoveLocationCol, Player):
         """
-        Execute a move if valid, remove any captured piece, and promote to king when needed.
-        Returns True if the move is executed.
+        Execute a move (one hop of a multi-jump) if valid, remove any captured piece, and
+        promote to king when needed. Returns True if the move is executed.
         """
-        if self.IsValidMove(StartingMoveLocationRow, StartingMoveLocationCol,
-                            TargetingMoveLocationRow, TargetingMoveLocationCol, Player):
+        Moves = self.LegalHops(Player).get((StartingMoveLocationRow, StartingMoveLocationCol,
+                                            TargetingMoveLocationRow, TargetingMoveLocationCol))
+        if Moves:
             Piece = self.Board[StartingMoveLocationRow][StartingMoveLocationCol]
             self.Board[TargetingMoveLocationRow][TargetingMoveLocationCol] = Piece
             self.Board[StartingMoveLocationRow][StartingMoveLocationCol] = '.'
@@ -159,13 +129,29 @@ class GameBoard:
             if abs(TargetingMoveLocationRow - StartingMoveLocationRow) == 2:
                 MidRow = (StartingMoveLocationRow + TargetingMoveLocationRow) // 2
                 MidCol = (StartingMoveLocationCol + TargetingMoveLocationCol) // 2
+                self.PieceCounts[self.Board[MidRow][MidCol]] -= 1
                 self.Board[MidRow][MidCol] = '.'
             # Promote to king if the piece reaches the far side.
             if Piece == 'B' and TargetingMoveLocationRow == 7:
                 self.Board[TargetingMoveLocationRow][TargetingMoveLocationCol] = 'BK'
+                self.PieceCounts['B'] -= 1
+                self.PieceCounts['BK'] += 1
                 print("Black piece promoted to King at (%d,%d)" % (TargetingMoveLocationRow, TargetingMoveLocationCol))
             elif Piece == 'W' and TargetingMoveLocationRow == 0:
                 self.Board[TargetingMoveLocationRow][TargetingMoveLocationCol] = 'WK'
+                self.PieceCounts['W'] -= 1
+                self.PieceCounts['WK'] += 1
                 print("White piece promoted to King at (%d,%d)" % (TargetingMoveLocationRow, TargetingMoveLocationCol))
+            self.ChainHops += 1
+            Finished = [Move for Move in Moves if len(Move[3]) == self.ChainHops + 1]
+            if Finished:
+                # The whole move has been played: the next turn starts from the new position.
+                self.Position.MakeMove(Finished[0])
+                self.Hops = {}
+                self.ChainPlayer = None
+                self.ChainHops = 0
+            else:
+                self.ChainPlayer = Player
+                self.Hops = {Player: self.GroupHops(Moves)}
             return True
         return False
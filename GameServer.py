@@ -0,0 +1,655 @@
+"""
+Module: GameServer
+Purpose: Hosts many concurrent checkers games over a local socket with asyncio.
+         Each game is a compact GameSession (the three bitboards and a few fields). AI
+         moves are searched on a bounded process pool whose workers keep one CheckersAI
+         and transposition table between requests, so the sessions served by a worker
+         share its cache. The opening book is loaded once, in the server, and answers
+         book positions without using the pool. AI requests wait in a fair queue that
+         serves connections round-robin; when it is full a move is refused with "busy"
+         instead of queueing without bound, and a request's time budget includes its
+         time in the queue. Move throughput and latency percentiles are served as metrics.
+         With a PDN path, every game is appended to it as a PDN record when it ends or
+         its session is closed or dropped.
+
+Protocol: one JSON object per line in each direction. A request's "id", if given, is
+copied into its reply, so a connection may have several requests in flight. Squares are
+numbered as in BitBoard and positions are PDN FEN strings (see BitBoard.ParseFEN).
+    {"op": "new", "ai": "B"}                  -> {"session": 1, "fen": "W:...", "moves": ["22-18", ...]}
+    {"op": "move", "session": 1, "move": "22-18", "budget_ms": 200}
+                                              -> {"ai_move": "9-14", "fen": ..., "moves": [...], "result": null}
+    {"op": "state", "session": 1}             -> {"fen": ..., "moves": [...], "result": null}
+    {"op": "close", "session": 1}             -> {}
+    {"op": "metrics"}                         -> {"Sessions": ..., "Moves Per Second": ..., "P99 Move Latency Ms": ...}
+Every reply has "ok"; a failed request has "ok": false and an "error" message, and a
+move refused because the server is busy also has "retry": true. "result" is null while
+the game goes on, then "white", "black" or "draw". The human moves first, as White,
+unless the AI is given "W".
+
+Usage:
+    python GameServer.py serve --port 8765 --workers 4 --book Opening.ckob --pdn Games.pdn
+    python GameServer.py load --port 8765 --clients 200 --games 5
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from BitBoard import INITIAL_FEN, BitBoard, FormatFEN, MoveToNotation, ParseFEN
+
+MIN_SEARCH_MS = 10  # Search time given to a request whose budget was used up in the queue
+LATENCY_WINDOW = 10000  # AI moves kept for the latency percentiles
+THROUGHPUT_WINDOW = 60  # Seconds of AI moves counted for the throughput
+
+# Per-process engine of a pool worker, set up by _InitWorker.
+_WorkerAI = None
+
+
+class RequestError(Exception):
+    """Raised while handling a request; the message is sent back to the client."""
+
+
+class ServerBusy(RequestError):
+    """Raised when the AI queue is full; the client should retry later."""
+
+
+class GameSession:
+    __slots__ = ("Id", "Black", "White", "Kings", "Hash", "Player", "AIColor", "Plies", "Result",
+                 "Busy", "LastActive", "StartFEN", "Moves")
+
+    def __init__(self, Id, Board, Player, AIColor, StartFEN=INITIAL_FEN):
+        """One hosted game: the position, the side to move and the AI's color ('B' or 'W')."""
+        self.Id = Id
+        self.Player = Player
+        self.AIColor = AIColor
+        self.Plies = 0
+        self.StartFEN = StartFEN  # FEN the game started from, for its PDN record
+        self.Moves = bytearray()  # Index of each move played in the mover's GetMoves list
+        self.Result = None  # "white", "black" or "draw" once the game is over
+        self.Busy = False  # An AI move is being searched for this session
+        self.LastActive = time.monotonic()
+        self.Store(Board)
+
+    def Board(self):
+        """Return the position as a new BitBoard."""
+        return BitBoard(self.Black, self.White, self.Kings, self.Hash)
+
+    def Store(self, Board):
+        """Keep the masks and hash of the BitBoard Board as the session's position."""
+        self.Black, self.White, self.Kings, self.Hash = Board.Black, Board.White, Board.Kings, Board.Hash
+
+    def Play(self, Board, Move, MaxPlies):
+        """Play Move on Board (the session's position), store the result and settle the game if it ended."""
+        self.Moves.append(Board.GetMoves(self.Player).index(Move))
+        Board.MakeMove(Move)
+        self.Store(Board)
+        self.Player = 'B' if self.Player == 'W' else 'W'
+        self.Plies += 1
+        self.Settle(Board, MaxPlies)
+
+    def Settle(self, Board, MaxPlies):
+        """Set the result if the game on Board (the session's position) is over."""
+        if not Board.GetMoves(self.Player):
+            self.Result = "black" if self.Player == 'W' else "white"  # No move left loses.
+        elif self.Plies >= MaxPlies:
+            self.Result = "draw"
+
+    def Describe(self, Board=None):
+        """Return the session's public state as a reply dictionary."""
+        Board = Board or self.Board()
+        return {"session": self.Id, "fen": FormatFEN(Board, self.Player), "result": self.Result,
+                "moves": [] if self.Result else [MoveToNotation(Move) for Move in Board.GetMoves(self.Player)]}
+
+    def Record(self):
+        """Return the game as a PDNGame, replaying the recorded move indices from its start."""
+        from PDN import PDNGame, GameTags
+        Board, Player = ParseFEN(self.StartFEN)
+        Moves = []
+        for Index in self.Moves:
+            Move = Board.GetMoves(Player)[Index]
+            Moves.append(MoveToNotation(Move))
+            Board.MakeMove(Move)
+            Player = 'B' if Player == 'W' else 'W'
+        Black, White = ("CheckersAI", "Client") if self.AIColor == 'B' else ("Client", "CheckersAI")
+        Result = {"black": "1-0", "white": "0-1", "draw": "1/2-1/2"}.get(self.Result, "*")
+        return PDNGame(GameTags(Black, White, FormatFEN(*ParseFEN(self.StartFEN)), Session=self.Id), Moves, Result)
+
+
+class FairQueue:
+    def __init__(self, Capacity):
+        """A bounded queue that hands out items round-robin over the clients that queued them."""
+        self.Capacity = Capacity
+        self.Queues = {}  # Client -> deque of its items
+        self.Order = deque()  # Clients with queued items, next to be served first
+        self.Count = 0
+        self.Available = asyncio.Semaphore(0)
+
+    def __len__(self):
+        return self.Count
+
+    def Put(self, Client, Item):
+        """Queue Item for Client; returns False, without queueing it, if the queue is full."""
+        if self.Count >= self.Capacity:
+            return False
+        if Client not in self.Queues:
+            self.Queues[Client] = deque()
+            self.Order.append(Client)
+        self.Queues[Client].append(Item)
+        self.Count += 1
+        self.Available.release()
+        return True
+
+    async def Get(self):
+        """Wait for and return the next item, taking one item per client in turn."""
+        await self.Available.acquire()
+        Client = self.Order.popleft()
+        Queue = self.Queues[Client]
+        Item = Queue.popleft()
+        if Queue:
+            self.Order.append(Client)
+        else:
+            del self.Queues[Client]
+        self.Count -= 1
+        return Item
+
+
+class ServerMetrics:
+    def __init__(self):
+        """Counters and recent AI move latencies of a GameServer."""
+        self.StartTime = time.monotonic()
+        self.Requests = 0
+        self.MovesServed = 0  # AI moves, from the book or searched
+        self.BookMoves = 0
+        self.BusyRejections = 0
+        self.SearchNodes = 0
+        self.Latencies = deque(maxlen=LATENCY_WINDOW)  # Seconds from move request to AI reply
+        self.Completions = deque()  # time.monotonic() of the AI moves in the throughput window
+
+    def RecordMove(self, Latency, Nodes=0, Book=False):
+        """Record an AI move that took Latency seconds to answer."""
+        Now = time.monotonic()
+        self.MovesServed += 1
+        self.BookMoves += Book
+        self.SearchNodes += Nodes
+        self.Latencies.append(Latency)
+        self.Completions.append(Now)
+        while self.Completions[0] < Now - THROUGHPUT_WINDOW:
+            self.Completions.popleft()
+
+    def Snapshot(self, Sessions, Queued):
+        """Return the metrics as a plain dictionary, latencies in milliseconds."""
+        Now = time.monotonic()
+        while self.Completions and self.Completions[0] < Now - THROUGHPUT_WINDOW:
+            self.Completions.popleft()
+        Window = min(THROUGHPUT_WINDOW, Now - self.StartTime)
+        Latencies = sorted(self.Latencies)
+        return {
+            "Uptime": Now - self.StartTime,
+            "Sessions": Sessions,
+            "Queued": Queued,
+            "Requests": self.Requests,
+            "Moves Served": self.MovesServed,
+            "Book Moves": self.BookMoves,
+            "Busy Rejections": self.BusyRejections,
+            "Search Nodes": self.SearchNodes,
+            "Moves Per Second": len(self.Completions) / Window if Window > 0 else 0,
+            "P50 Move Latency Ms": 1000 * Percentile(Latencies, 0.5),
+            "P99 Move Latency Ms": 1000 * Percentile(Latencies, 0.99),
+            "Max Move Latency Ms": 1000 * Latencies[-1] if Latencies else 0,
+        }
+
+
+def Percentile(Sorted, Fraction):
+    """Return the Fraction percentile (nearest rank) of a sorted list, or 0 if it is empty."""
+    if not Sorted:
+        return 0
+    return Sorted[max(0, math.ceil(Fraction * len(Sorted)) - 1)]
+
+
+def _InitWorker(TableMemoryBytes, EvaluationPath):
+    """Create the worker's CheckersAI, whose transposition table serves every session."""
+    global _WorkerAI
+    from GameBoard import GameBoard
+    from SearchToolBox import CheckersAI
+    _WorkerAI = CheckersAI(GameBoard(), TableMemoryBytes)
+    if EvaluationPath is not None:
+        _WorkerAI.LoadEvaluation(EvaluationPath)
+
+
+def _SearchMove(Position, Player, TimeLimitMs):
+    """Worker entry point: return (Move, Nodes) for Player to move on Position, a (Black, White, Kings, Hash) tuple."""
+    _, Move = _WorkerAI.IterativeDeepening(BitBoard(*Position), TimeLimitMs=TimeLimitMs, IsMaximizing=Player == 'B')
+    return Move, _WorkerAI.SearchNodes
+
+
+class GameServer:
+    def __init__(self, Workers=None, BookPath=None, MaxSessions=10000, MaxQueued=1000, DefaultBudgetMs=200,
+                 MaxBudgetMs=5000, MaxPlies=200, SessionTimeout=600, MaxInFlight=64,
+                 TableMemoryBytes=16 * 1024 * 1024, EvaluationPath=None, PDNPath=None):
+        """
+        Settings of a game server. Workers processes search AI moves (default: CPU count),
+        each with a transposition table of TableMemoryBytes. At most MaxQueued AI moves
+        wait for a worker and at most MaxSessions games are hosted; sessions idle for
+        SessionTimeout seconds are dropped. A move's budget_ms defaults to DefaultBudgetMs
+        and is capped at MaxBudgetMs. A connection reads no further requests while
+        MaxInFlight of its requests are unanswered. Games are appended to the PDN file
+        PDNPath, if given.
+        """
+        self.Workers = Workers
+        self.BookPath = BookPath
+        self.MaxSessions = MaxSessions
+        self.MaxQueued = MaxQueued
+        self.DefaultBudgetMs = DefaultBudgetMs
+        self.MaxBudgetMs = MaxBudgetMs
+        self.MaxPlies = MaxPlies
+        self.SessionTimeout = SessionTimeout
+        self.MaxInFlight = MaxInFlight
+        self.TableMemoryBytes = TableMemoryBytes
+        self.EvaluationPath = EvaluationPath
+        self.PDNPath = PDNPath
+        self.Sessions = {}
+        self.SessionIds = itertools.count(1)
+        self.ClientIds = itertools.count(1)
+        self.Metrics = ServerMetrics()
+        self.Book = None
+        self.Pool = None
+        self.Queue = None
+        self.Tasks = []
+
+    async def Start(self):
+        """Load the book and start the worker pool, the dispatchers and the idle-session sweeper."""
+        if self.BookPath is not None:
+            from OpeningBook import OpeningBook
+            self.Book = OpeningBook(self.BookPath)
+        Workers = self.Workers or os.cpu_count() or 1
+        self.Pool = ProcessPoolExecutor(max_workers=Workers, initializer=_InitWorker,
+                                        initargs=(self.TableMemoryBytes, self.EvaluationPath))
+        self.Queue = FairQueue(self.MaxQueued)
+        # One dispatcher per worker keeps the pool busy without queueing work inside it,
+        # so the fair queue decides the order of every search.
+        self.Tasks = [asyncio.create_task(self.Dispatch()) for _ in range(Workers)]
+        self.Tasks.append(asyncio.create_task(self.SweepSessions()))
+
+    async def Stop(self):
+        """Stop the background tasks and the worker pool, saving the games still being played."""
+        for Task in self.Tasks:
+            Task.cancel()
+        await asyncio.gather(*self.Tasks, return_exceptions=True)
+        self.Pool.shutdown(wait=True, cancel_futures=True)
+        for Id in list(self.Sessions):
+            self.EndSession(Id)
+
+    async def Serve(self, Host="127.0.0.1", Port=8765, UnixPath=None, MetricsInterval=None, Report=print):
+        """Accept connections on Host:Port (or the Unix socket UnixPath) until cancelled."""
+        await self.Start()
+        if UnixPath is not None:
+            Server = await asyncio.start_unix_server(self.HandleConnection, UnixPath)
+        else:
+            Server = await asyncio.start_server(self.HandleConnection, Host, Port)
+        Report("serving on %s" % (UnixPath or "%s:%d" % (Host, Port)))
+        try:
+            async with Server:
+                if MetricsInterval:
+                    while True:
+                        await asyncio.sleep(MetricsInterval)
+                        Report(json.dumps(self.Snapshot()))
+                else:
+                    await Server.serve_forever()
+        finally:
+            await self.Stop()
+
+    def Snapshot(self):
+        """Return the server metrics (see ServerMetrics.Snapshot)."""
+        return self.Metrics.Snapshot(len(self.Sessions), len(self.Queue) if self.Queue is not None else 0)
+
+    async def HandleConnection(self, Reader, Writer):
+        """Answer the requests of one connection, several at a time, in the order they finish."""
+        Client = next(self.ClientIds)
+        InFlight = asyncio.Semaphore(self.MaxInFlight)
+        Pending = set()
+
+        async def Answer(Line):
+            try:
+                Reply = await self.HandleRequest(Client, Line)
+                if not Writer.is_closing():
+                    Writer.write(json.dumps(Reply).encode() + b"\n")
+                    await Writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                InFlight.release()
+
+        try:
+            while True:
+                # Waiting here once MaxInFlight requests are unanswered stops reading, so
+                # a client that sends faster than it is served is slowed down by TCP.
+                await InFlight.acquire()
+                Line = await Reader.readline()
+                if not Line:
+                    InFlight.release()
+                    break
+                Task = asyncio.create_task(Answer(Line))
+                Pending.add(Task)
+                Task.add_done_callback(Pending.discard)
+        except ConnectionError:
+            pass
+        finally:
+            if Pending:
+                await asyncio.gather(*Pending, return_exceptions=True)
+            Writer.close()
+
+    async def HandleRequest(self, Client, Line):
+        """Return the reply dictionary for one request line from Client."""
+        self.Metrics.Requests += 1
+        Id = None
+        try:
+            try:
+                Request = json.loads(Line)
+            except ValueError:
+                raise RequestError("request is not valid JSON")
+            if not isinstance(Request, dict):
+                raise RequestError("request must be a JSON object")
+            Id = Request.get("id")
+            Operation = Request.get("op")
+            if Operation == "new":
+                Reply = await self.NewSession(Client, Request)
+            elif Operation == "move":
+                Reply = await self.HumanMove(Client, Request)
+            elif Operation == "state":
+                Reply = self.GetSession(Request).Describe()
+            elif Operation == "close":
+                self.EndSession(self.GetSession(Request).Id)
+                Reply = {}
+            elif Operation == "metrics":
+                Reply = self.Snapshot()
+            else:
+                raise RequestError("unknown op %r" % Operation)
+            Reply["ok"] = True
+        except RequestError as Error:
+            Reply = {"ok": False, "error": str(Error)}
+            if isinstance(Error, ServerBusy):
+                Reply["retry"] = True
+        except Exception as Error:
+            # A request that breaks the server still gets an answer.
+            Reply = {"ok": False, "error": "internal error: %s: %s" % (type(Error).__name__, Error)}
+        if Id is not None:
+            Reply["id"] = Id
+        return Reply
+
+    def GetSession(self, Request):
+        """Return the session named by Request["session"]."""
+        Id = Request.get("session")
+        if not isinstance(Id, int) or isinstance(Id, bool):
+            raise RequestError("session must be an integer")
+        Session = self.Sessions.get(Id)
+        if Session is None:
+            raise RequestError("no session %r" % Id)
+        Session.LastActive = time.monotonic()
+        return Session
+
+    async def NewSession(self, Client, Request):
+        """Create a session from the initial position (or Request["fen"]); the AI moves first if it is to move."""
+        if len(self.Sessions) >= self.MaxSessions:
+            raise ServerBusy("too many sessions")
+        AIColor = Request.get("ai", 'B')
+        if AIColor not in ('B', 'W'):
+            raise RequestError("ai must be 'B' or 'W'")
+        FEN = Request.get("fen", INITIAL_FEN)
+        if not isinstance(FEN, str):
+            raise RequestError("bad fen %r" % FEN)
+        try:
+            Board, Player = ParseFEN(FEN)
+        except (ValueError, IndexError):
+            raise RequestError("bad fen %r" % FEN)
+        if Player not in ('B', 'W'):
+            raise RequestError("bad fen %r" % FEN)
+        Session = GameSession(next(self.SessionIds), Board, Player, AIColor, FEN)
+        Session.Settle(Board, self.MaxPlies)  # A position without moves is over before it starts.
+        self.Sessions[Session.Id] = Session
+        if Session.Result is None and Player == AIColor:
+            try:
+                await self.AIMove(Client, Session, Board, self.BudgetMs(Request))
+            except Exception:
+                del self.Sessions[Session.Id]
+                raise
+        return Session.Describe()
+
+    def BudgetMs(self, Request):
+        """Return the AI time budget asked for by Request, within the server's limits."""
+        Budget = Request.get("budget_ms", self.DefaultBudgetMs)
+        if not isinstance(Budget, (int, float)) or Budget <= 0:
+            raise RequestError("budget_ms must be a positive number")
+        return min(Budget, self.MaxBudgetMs)
+
+    async def HumanMove(self, Client, Request):
+        """Play the client's move in a session and answer with the AI's reply."""
+        Arrival = time.perf_counter()
+        Session = self.GetSession(Request)
+        if Session.Busy:
+            raise RequestError("the AI is still moving in session %d" % Session.Id)
+        if Session.Result is not None:
+            raise RequestError("session %d is over" % Session.Id)
+        if Session.Player == Session.AIColor:
+            raise RequestError("it is not the human's turn in session %d" % Session.Id)
+        Board = Session.Board()
+        Notation = Request.get("move")
+        if not isinstance(Notation, str):
+            raise RequestError("bad move %r" % Notation)
+        try:
+            Move = Board.FindMove(Session.Player, Notation)
+        except ValueError:
+            raise RequestError("bad move %r" % Notation)
+        if Move is None:
+            raise RequestError("illegal move %r" % Request.get("move"))
+        Budget = self.BudgetMs(Request)
+        # Refuse before touching the session, so a busy server leaves the game unchanged.
+        if len(self.Queue) >= self.MaxQueued:
+            self.Metrics.BusyRejections += 1
+            raise ServerBusy("server busy, %d AI moves queued" % len(self.Queue))
+        Session.Play(Board, Move, self.MaxPlies)
+        if Session.Result is not None:
+            self.SaveGame(Session)
+        AIMove = None
+        if Session.Result is None:
+            AIMove = await self.AIMove(Client, Session, Board, Budget, Arrival)
+        Reply = Session.Describe(Board)
+        Reply["ai_move"] = MoveToNotation(AIMove) if AIMove else None
+        return Reply
+
+    async def AIMove(self, Client, Session, Board, BudgetMs, Arrival=None):
+        """Find and play the AI's move in Session (whose position is Board); returns the move."""
+        Arrival = Arrival or time.perf_counter()
+        Move = self.Book.Lookup(Board, Session.AIColor) if self.Book is not None else None
+        Book = Move is not None
+        Nodes = 0
+        if not Book:
+            Future = asyncio.get_running_loop().create_future()
+            Position = (Board.Black, Board.White, Board.Kings, Board.Hash)
+            if not self.Queue.Put(Client, (Position, Session.AIColor, Arrival + BudgetMs / 1000, Future)):
+                self.Metrics.BusyRejections += 1
+                raise ServerBusy("server busy, %d AI moves queued" % len(self.Queue))
+            Session.Busy = True
+            try:
+                Move, Nodes = await Future
+            finally:
+                Session.Busy = False
+        if Move is None:
+            # The AI has no legal move, so the game is already lost for it.
+            Session.Settle(Board, self.MaxPlies)
+            if Session.Result is not None:
+                self.SaveGame(Session)
+            return None
+        Session.Play(Board, Move, self.MaxPlies)
+        if Session.Result is not None:
+            self.SaveGame(Session)
+        Session.LastActive = time.monotonic()
+        self.Metrics.RecordMove(time.perf_counter() - Arrival, Nodes, Book)
+        return Move
+
+    async def Dispatch(self):
+        """Hand queued AI moves to the worker pool, one at a time, for as long as the server runs."""
+        Loop = asyncio.get_running_loop()
+        while True:
+            Position, Player, Deadline, Future = await self.Queue.Get()
+            if Future.done():
+                continue
+            TimeLimitMs = max(MIN_SEARCH_MS, 1000 * (Deadline - time.perf_counter()))
+            try:
+                Result = await Loop.run_in_executor(self.Pool, _SearchMove, Position, Player, TimeLimitMs)
+            except Exception as Error:
+                if not Future.done():
+                    Future.set_exception(RequestError("search failed: %s" % Error))
+            else:
+                if not Future.done():
+                    Future.set_result(Result)
+
+    async def SweepSessions(self):
+        """Drop sessions that have been idle for SessionTimeout seconds."""
+        while True:
+            await asyncio.sleep(min(60, self.SessionTimeout))
+            Cutoff = time.monotonic() - self.SessionTimeout
+            for Id in [Id for Id, Session in self.Sessions.items()
+                       if Session.LastActive < Cutoff and not Session.Busy]:
+                self.EndSession(Id)
+
+    def EndSession(self, Id):
+        """Drop session Id, saving its game if it is unfinished (a finished game was saved when it ended)."""
+        Session = self.Sessions.pop(Id, None)
+        if Session is not None and Session.Result is None:
+            self.SaveGame(Session)
+
+    def SaveGame(self, Session):
+        """Append Session's game to the PDN file, if the server keeps one and a move was played."""
+        if self.PDNPath is not None and Session.Moves:
+            from PDN import AppendGame
+            AppendGame(self.PDNPath, Session.Record())
+
+
+async def Request(Reader, Writer, Message):
+    """Send one request and return its reply (for clients with one request in flight)."""
+    Writer.write(json.dumps(Message).encode() + b"\n")
+    await Writer.drain()
+    Line = await Reader.readline()
+    if not Line:
+        raise ConnectionError("server closed the connection")
+    return json.loads(Line)
+
+
+async def RunLoad(Host="127.0.0.1", Port=8765, UnixPath=None, Clients=100, Games=1, BudgetMs=100,
+                  MaxPlies=200, Seed=0, Report=print):
+    """
+    Play Games random-move games per client on Clients concurrent connections and
+    report the latency seen by the clients and the server's metrics. Busy replies are
+    retried after a short back-off. Returns the summary dictionary.
+    """
+    Latencies = []
+    Counts = {"Games": 0, "Moves": 0, "Busy Retries": 0, "Errors": 0}
+
+    async def Connect():
+        if UnixPath is not None:
+            return await asyncio.open_unix_connection(UnixPath)
+        return await asyncio.open_connection(Host, Port)
+
+    async def Client(Number):
+        Rng = random.Random(Seed * 100003 + Number)
+        Reader, Writer = await Connect()
+        try:
+            for _ in range(Games):
+                State = await Request(Reader, Writer, {"op": "new"})
+                while not State["ok"]:
+                    if not State.get("retry"):
+                        raise RuntimeError(State["error"])
+                    Counts["Busy Retries"] += 1
+                    await asyncio.sleep(0.05 + Rng.random() * 0.05)
+                    State = await Request(Reader, Writer, {"op": "new"})
+                Session = State["session"]
+                Plies = 0
+                while State["moves"] and Plies < MaxPlies:
+                    Message = {"op": "move", "session": Session, "move": Rng.choice(State["moves"]),
+                               "budget_ms": BudgetMs}
+                    StartTime = time.perf_counter()
+                    Reply = await Request(Reader, Writer, Message)
+                    if not Reply["ok"]:
+                        if Reply.get("retry"):
+                            Counts["Busy Retries"] += 1
+                            await asyncio.sleep(0.05 + Rng.random() * 0.05)
+                            continue
+                        Counts["Errors"] += 1
+                        break
+                    Latencies.append(time.perf_counter() - StartTime)
+                    Counts["Moves"] += 1
+                    Plies += 2
+                    State = Reply
+                await Request(Reader, Writer, {"op": "close", "session": Session})
+                Counts["Games"] += 1
+        finally:
+            Writer.close()
+
+    StartTime = time.perf_counter()
+    await asyncio.gather(*(Client(Number) for Number in range(Clients)))
+    Seconds = time.perf_counter() - StartTime
+    Reader, Writer = await Connect()
+    ServerSnapshot = await Request(Reader, Writer, {"op": "metrics"})
+    Writer.close()
+    Latencies.sort()
+    Summary = dict(Counts)
+    Summary.update({
+        "Wall Time": Seconds,
+        "Moves Per Second": Counts["Moves"] / Seconds if Seconds else 0,
+        "Client P50 Move Latency Ms": 1000 * Percentile(Latencies, 0.5),
+        "Client P99 Move Latency Ms": 1000 * Percentile(Latencies, 0.99),
+        "Server": ServerSnapshot,
+    })
+    for Name, Value in Summary.items():
+        if Name != "Server":
+            Report("%s: %s" % (Name, "%.1f" % Value if isinstance(Value, float) else Value))
+    Report("Server: %s" % json.dumps(ServerSnapshot))
+    return Summary
+
+
+def Main(Arguments=None):
+    """Command-line entry point for the game server and its load generator."""
+    Parser = argparse.ArgumentParser(description="Host concurrent checkers games, or load-test a server.")
+    Commands = Parser.add_subparsers(dest="Command", required=True)
+    Serve = Commands.add_parser("serve", help="run the game server")
+    Load = Commands.add_parser("load", help="play random games against a running server")
+    for Command in (Serve, Load):
+        Command.add_argument("--host", default="127.0.0.1")
+        Command.add_argument("--port", type=int, default=8765)
+        Command.add_argument("--unix", default=None, help="Unix socket path instead of TCP")
+    Serve.add_argument("--workers", type=int, default=None, help="search processes (default: CPU count)")
+    Serve.add_argument("--book", default=None, help="opening book file")
+    Serve.add_argument("--eval", default=None, help="evaluation weights file")
+    Serve.add_argument("--max-sessions", type=int, default=10000)
+    Serve.add_argument("--max-queued", type=int, default=1000, help="AI moves queued before refusing (default 1000)")
+    Serve.add_argument("--budget", type=int, default=200, help="default AI ms per move (default 200)")
+    Serve.add_argument("--pdn", default=None, help="PDN file every game is appended to")
+    Serve.add_argument("--metrics-interval", type=float, default=None, help="print metrics every this many seconds")
+    Load.add_argument("--clients", type=int, default=100, help="concurrent connections (default 100)")
+    Load.add_argument("--games", type=int, default=1, help="games per client (default 1)")
+    Load.add_argument("--budget", type=int, default=100, help="AI ms per move asked for (default 100)")
+    Load.add_argument("--max-plies", type=int, default=200)
+    Load.add_argument("--seed", type=int, default=0)
+    Options = Parser.parse_args(Arguments)
+
+    if Options.Command == "serve":
+        Server = GameServer(Options.workers, Options.book, Options.max_sessions, Options.max_queued,
+                            Options.budget, EvaluationPath=Options.eval, PDNPath=Options.pdn)
+        try:
+            asyncio.run(Server.Serve(Options.host, Options.port, Options.unix, Options.metrics_interval))
+        except KeyboardInterrupt:
+            pass
+    else:
+        asyncio.run(RunLoad(Options.host, Options.port, Options.unix, Options.clients, Options.games,
+                            Options.budget, Options.max_plies, Options.seed))
+
+
+if __name__ == "__main__":
+    Main()
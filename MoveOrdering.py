@@ -0,0 +1,86 @@
+"""
+Module: MoveOrdering
+Purpose: Orders moves for the Minimax search without building child boards.
+         Moves are scored from the move tuple and the parent BitBoard alone:
+         the transposition-table / principal-variation move first, then captures
+         (more and king captures first), promotions, killer moves for the ply and
+         finally the history heuristic.
+"""
+
+from BitBoard import BLACK_PROMOTION_ROW, WHITE_PROMOTION_ROW
+
+MAX_PLY = 128
+HASH_MOVE_SCORE = 1 << 40
+CAPTURE_SCORE = 1 << 36
+PROMOTION_SCORE = 1 << 34
+KILLER_SCORES = (1 << 33, 1 << 32)  # First and second killer of the ply
+HISTORY_LIMIT = 1 << 30  # Keep history below the killer scores
+
+
+class MoveOrderer:
+    def __init__(self):
+        """Initialize empty killer and history tables."""
+        self.Killers = [[None, None] for _ in range(MAX_PLY)]
+        self.History = {'B': [0] * 1024, 'W': [0] * 1024}  # Indexed From * 32 + To
+        # Ordering quality for the current search:
+        self.Cutoffs = 0
+        self.FirstMoveCutoffs = 0
+
+    def NewSearch(self):
+        """Forget killers and age the history table before a new root search."""
+        self.Killers = [[None, None] for _ in range(MAX_PLY)]
+        for Table in self.History.values():
+            for Index, Value in enumerate(Table):
+                if Value:
+                    Table[Index] = Value >> 1
+        self.Cutoffs = 0
+        self.FirstMoveCutoffs = 0
+
+    def OrderMoves(self, Board, Moves, Player, Ply, HashMove=None):
+        """Return Moves sorted best-first for Player at search ply Ply."""
+        if len(Moves) < 2:
+            return Moves
+        Kings = Board.Kings
+        PromotionRow = BLACK_PROMOTION_ROW if Player == 'B' else WHITE_PROMOTION_ROW
+        Killer1, Killer2 = self.Killers[Ply] if Ply < MAX_PLY else (None, None)
+        History = self.History[Player]
+
+        def Score(Move):
+            if Move == HashMove:
+                return HASH_MOVE_SCORE
+            From, To, Captured, _ = Move
+            Value = 0
+            if Captured:
+                Value += CAPTURE_SCORE + (Captured.bit_count() << 8) + (Captured & Kings).bit_count()
+            if not Kings >> From & 1 and PromotionRow >> To & 1:
+                Value += PROMOTION_SCORE
+            if Move == Killer1:
+                Value += KILLER_SCORES[0]
+            elif Move == Killer2:
+                Value += KILLER_SCORES[1]
+            return Value + History[From * 32 + To]
+
+        return sorted(Moves, key=Score, reverse=True)
+
+    def RecordCutoff(self, Move, Player, Ply, Depth, MoveIndex):
+        """
+        Update the killer and history tables after Move caused a beta cutoff.
+        MoveIndex is the move's position in the ordered list (0 = first searched).
+        """
+        self.Cutoffs += 1
+        if MoveIndex == 0:
+            self.FirstMoveCutoffs += 1
+        if Move[2]:
+            return  # Captures are already ordered first.
+        if Ply < MAX_PLY:
+            Killers = self.Killers[Ply]
+            if Killers[0] != Move:
+                Killers[1] = Killers[0]
+                Killers[0] = Move
+        History = self.History[Player]
+        Index = Move[0] * 32 + Move[1]
+        History[Index] = min(History[Index] + Depth * Depth, HISTORY_LIMIT)
+
+    def FirstMoveCutoffRate(self):
+        """Return the percentage of cutoffs in this search that came from the first move searched."""
+        return 100 * self.FirstMoveCutoffs / self.Cutoffs if self.Cutoffs else 0
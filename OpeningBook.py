@@ -0,0 +1,245 @@
+"""
+Module: OpeningBook
+Purpose: Builds and reads an opening book of good moves for the positions near the start
+         of the game, so the AI can answer them without searching.
+
+Usage:
+    python OpeningBook.py build --plies 4 --depth 6 --output Opening.ckob
+    python OpeningBook.py import Lines.txt --output Opening.ckob
+    python OpeningBook.py import Archive.pdn --output Opening.ckob
+    python OpeningBook.py info Opening.ckob
+
+The builder searches every book position with CheckersAI; the importer reads one game
+line per text line in numeric notation ("22-18 9-14 18x9 5x14 ...", squares numbered
+as in BitBoard with White moving first as in PlayCheckers), weighting each move by how
+often it was played. A file ending in .pdn is read as a PDN archive instead (see PDN.py).
+
+File format (little-endian):
+    Header      b"CKOB", version (u16), record count (u32)
+    Records     key (u64), move (u16), weight (u16), sorted by key
+The key is the position's Zobrist hash, XORed with ZOBRIST_SIDE when White is to move.
+The move stores From in bits 0-4, To in bits 5-9, and whether it captures in bit 10.
+"""
+
+import argparse
+import math
+import random
+import struct
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from BitBoard import BitBoard, MoveToNotation, ZOBRIST_SIDE
+
+MAGIC = b"CKOB"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")
+RECORD = struct.Struct("<QHH")
+
+
+def PositionKey(Board, Player):
+    """Return the book key of Board with Player ('B' or 'W') to move."""
+    return Board.Hash if Player == 'B' else Board.Hash ^ ZOBRIST_SIDE
+
+
+def EncodeMove(Move):
+    """Pack a BitBoard move into the 16-bit book format."""
+    return Move[0] | Move[1] << 5 | (1 << 10 if Move[2] else 0)
+
+
+def DecodeMove(Board, Player, Code):
+    """Return Player's legal move on Board matching a 16-bit book move, or None."""
+    From, To, IsCapture = Code & 31, Code >> 5 & 31, Code >> 10 & 1
+    for Move in Board.GetMoves(Player):
+        if Move[0] == From and Move[1] == To and bool(Move[2]) == bool(IsCapture):
+            return Move
+    return None
+
+
+def WriteBook(Entries, OutputPath):
+    """Write {Key: {MoveCode: Weight}} to OutputPath as a sorted book file; returns the record count."""
+    Records = sorted((Key, Code, min(Weight, 0xFFFF))
+                     for Key, Moves in Entries.items() for Code, Weight in Moves.items())
+    with open(OutputPath, "wb") as File:
+        File.write(HEADER.pack(MAGIC, VERSION, len(Records)))
+        File.write(b"".join(RECORD.pack(*Record) for Record in Records))
+    return len(Records)
+
+
+def BuildBook(Plies, SearchDepth, OutputPath, Side='B', Margin=0.25, MaxMoves=3, Report=print):
+    """
+    Search every position up to Plies plies from the initial position and write a book.
+    At positions where Side ('B', 'W' or 'both') is to move, each move is searched to
+    SearchDepth plies, the best MaxMoves moves within Margin of the best score are stored
+    (weighted by rank) and only those are followed; every reply of the other side is followed.
+    """
+    from GameBoard import GameBoard
+    from SearchToolBox import CheckersAI
+    StartTime = time.perf_counter()
+    AI = CheckersAI(GameBoard())
+    Entries = {}
+    Frontier = {PositionKey(BitBoard.FromBoard(GameBoard().Board), 'W'):
+                (BitBoard.FromBoard(GameBoard().Board), 'W')}  # Human (White) moves first.
+    for Ply in range(Plies):
+        NextFrontier = {}
+        for Key, (Board, Player) in Frontier.items():
+            Opponent = 'B' if Player == 'W' else 'W'
+            Moves = Board.GetMoves(Player)
+            if Side in (Player, 'both') and len(Moves) > 1:
+                IsMaximizing = Player == 'B'
+                Scored = []
+                for Move in Moves:
+                    Score, _ = AI.Minimax(Board.ApplyMove(Move), SearchDepth - 1, -math.inf, math.inf,
+                                          not IsMaximizing, 1)
+                    Scored.append((Score if IsMaximizing else -Score, Move))
+                Scored.sort(key=lambda Pair: -Pair[0])
+                Candidates = [Move for Score, Move in Scored[:MaxMoves] if Score >= Scored[0][0] - Margin]
+                Entries[Key] = {EncodeMove(Move): 100 // (Rank + 1) for Rank, Move in enumerate(Candidates)}
+                Moves = Candidates
+            for Move in Moves:
+                Child = Board.ApplyMove(Move)
+                NextFrontier[PositionKey(Child, Opponent)] = (Child, Opponent)
+        Report("Ply %d: %d positions, %d book positions so far" % (Ply + 1, len(NextFrontier), len(Entries)))
+        Frontier = NextFrontier
+    Count = WriteBook(Entries, OutputPath)
+    Report("Built %s: %d positions, %d moves in %.2fs"
+           % (OutputPath, len(Entries), Count, time.perf_counter() - StartTime))
+    return Count
+
+
+def ImportLines(Lines, OutputPath, Plies=None, Report=print):
+    """
+    Build a book from game lines in numeric notation, one game per line, stopping each
+    line after Plies moves if given. A move's weight is the number of lines playing it.
+    Returns the record count.
+    """
+    from GameBoard import GameBoard
+    from PDN import RESULTS
+    Entries = {}
+    for Number, Line in enumerate(Lines, 1):
+        Board = BitBoard.FromBoard(GameBoard().Board)
+        Player = 'W'
+        # Move numbers ("1.") and a game result ("1-0", "*") are not plies.
+        Texts = [Text for Text in Line.split()
+                 if not (Text[0].isdigit() and Text.endswith(".")) and Text not in RESULTS]
+        for Ply, Text in enumerate(Texts):
+            if Plies is not None and Ply >= Plies:
+                break
+            try:
+                Move = Board.FindMove(Player, Text)
+            except ValueError:
+                Move = None
+            if Move is None:
+                Report("Line %d: %s is not legal here; rest of line skipped" % (Number, Text))
+                break
+            Moves = Entries.setdefault(PositionKey(Board, Player), {})
+            Moves[EncodeMove(Move)] = Moves.get(EncodeMove(Move), 0) + 1
+            Board.MakeMove(Move)
+            Player = 'B' if Player == 'W' else 'W'
+    Count = WriteBook(Entries, OutputPath)
+    Report("Imported %s: %d positions, %d moves" % (OutputPath, len(Entries), Count))
+    return Count
+
+
+def ImportGames(Games, OutputPath, Plies=None, Report=print):
+    """
+    Build a book from PDNGame records (such as PDN.ReadGames of an archive), stopping each
+    game after Plies moves if given. A move's weight is the number of games playing it.
+    Returns the record count.
+    """
+    from PDN import ReplayGame
+    Entries = {}
+    for Number, Game in enumerate(Games, 1):
+        try:
+            for Ply, (Board, Player, Move) in enumerate(ReplayGame(Game)):
+                if Plies is not None and Ply >= Plies:
+                    break
+                Moves = Entries.setdefault(PositionKey(Board, Player), {})
+                Moves[EncodeMove(Move)] = Moves.get(EncodeMove(Move), 0) + 1
+        except ValueError as Problem:
+            Report("Game %d: %s; rest of game skipped" % (Number, Problem))
+    Count = WriteBook(Entries, OutputPath)
+    Report("Imported %s: %d positions, %d moves" % (OutputPath, len(Entries), Count))
+    return Count
+
+
+class OpeningBook:
+    def __init__(self, Path, Seed=None):
+        """Load a book file; Seed fixes the weighted random choice between book moves."""
+        self.Path = Path
+        with open(Path, "rb") as File:
+            Data = File.read()
+        Magic, Version, Count = HEADER.unpack_from(Data, 0)
+        if Magic != MAGIC or Version != VERSION:
+            raise ValueError("%s is not a version %d checkers opening book" % (Path, VERSION))
+        self.Keys = array('Q')
+        self.Moves = array('H')
+        self.Weights = array('H')
+        for Key, Code, Weight in RECORD.iter_unpack(Data[HEADER.size:HEADER.size + Count * RECORD.size]):
+            self.Keys.append(Key)
+            self.Moves.append(Code)
+            self.Weights.append(Weight)
+        self.Random = random.Random(Seed)
+
+    def __len__(self):
+        return len(self.Keys)
+
+    def Candidates(self, Board, Player):
+        """Return [(Move, Weight), ...] stored for Board with Player to move."""
+        Key = PositionKey(Board, Player)
+        Start = bisect_left(self.Keys, Key)
+        End = bisect_right(self.Keys, Key, Start)
+        Candidates = []
+        for Index in range(Start, End):
+            Move = DecodeMove(Board, Player, self.Moves[Index])
+            if Move is not None:
+                Candidates.append((Move, self.Weights[Index]))
+        return Candidates
+
+    def Lookup(self, Board, Player):
+        """Return a book move for Board with Player to move, chosen at random by weight, or None."""
+        Candidates = self.Candidates(Board, Player)
+        if not Candidates:
+            return None
+        return self.Random.choices([Move for Move, _ in Candidates],
+                                   weights=[Weight for _, Weight in Candidates])[0]
+
+
+def Main(Arguments=None):
+    """Command-line entry point for building and inspecting opening books."""
+    Parser = argparse.ArgumentParser(description="Build or inspect checkers opening books.")
+    Commands = Parser.add_subparsers(dest="Command", required=True)
+    Build = Commands.add_parser("build", help="search the opening tree and store the best moves")
+    Build.add_argument("--plies", type=int, default=4, help="plies from the initial position (default 4)")
+    Build.add_argument("--depth", type=int, default=6, help="search depth per move (default 6)")
+    Build.add_argument("--side", choices=("B", "W", "both"), default="B", help="side the book plays (default B)")
+    Build.add_argument("--output", default="Opening.ckob", help="output file")
+    Import = Commands.add_parser("import", help="build a book from game lines in numeric notation or a PDN file")
+    Import.add_argument("lines", help="text file with one game line per line, or a .pdn archive")
+    Import.add_argument("--plies", type=int, default=None, help="only use the first N plies of each line")
+    Import.add_argument("--output", default="Opening.ckob", help="output file")
+    Info = Commands.add_parser("info", help="summarize a book file")
+    Info.add_argument("path")
+    Options = Parser.parse_args(Arguments)
+
+    if Options.Command == "build":
+        BuildBook(Options.plies, Options.depth, Options.output, Options.side)
+    elif Options.Command == "import" and Options.lines.lower().endswith(".pdn"):
+        from PDN import ReadGames
+        with open(Options.lines, errors="replace") as File:
+            ImportGames(ReadGames(File), Options.output, Options.plies)
+    elif Options.Command == "import":
+        with open(Options.lines) as File:
+            ImportLines(File, Options.output, Options.plies)
+    else:
+        Book = OpeningBook(Options.path)
+        print("%s: %d moves in %d positions" % (Options.path, len(Book), len(set(Book.Keys))))
+        from GameBoard import GameBoard
+        Board = BitBoard.FromBoard(GameBoard().Board)
+        for Player in ('W', 'B'):
+            for Move, Weight in Book.Candidates(Board, Player):
+                print("  Initial position, %s to move: %s (weight %d)" % (Player, MoveToNotation(Move), Weight))
+
+
+if __name__ == "__main__":
+    Main()
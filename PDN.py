@@ -0,0 +1,302 @@
+"""
+Module: PDN
+Purpose: Reads and writes game records in PDN (Portable Draughts Notation) and annotates
+         whole archives with CheckersAI. ReadGames is a generator that parses one game at
+         a time from any iterable of lines, so archives of any size are read in constant
+         memory; comments, variations and NAGs are skipped. AnalyzeArchive searches every
+         position of every game on a process pool, keeping only a bounded number of games
+         in flight, and writes each game back with the engine's best move and score after
+         every move.
+
+Usage:
+    python PDN.py info Archive.pdn
+    python PDN.py analyze Archive.pdn --output Annotated.pdn --time 100 --workers 4
+
+Squares are numbered 1-32 as in BitBoard (square index + 1). As in American checkers
+PDN, a game without a FEN tag starts from the initial position with Black to move, and
+results are given from Black's side: "1-0" Black won, "0-1" White won, "1/2-1/2" a draw.
+Games played here start with White to move, so they are written with a FEN tag.
+"""
+
+import argparse
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from BitBoard import INITIAL_FEN, MoveToNotation, ParseFEN
+
+RESULTS = {"1-0", "0-1", "1/2-1/2", "2-0", "0-2", "1-1", "*"}
+TAG = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+TOKEN = re.compile(r'[{}();]|[^\s{}();]+')
+MOVE_NUMBER = re.compile(r'^\d+\.+')
+MOVE = re.compile(r'\d+(?:[-x:]\d+)+')
+LINE_WIDTH = 79
+
+# Per-process engine of an analysis worker, set up by _InitWorker.
+_WorkerAI = None
+
+
+class PDNGame:
+    def __init__(self, Tags=None, Moves=None, Result="*"):
+        """A game record: its tags (name -> value, in order), its moves as notation strings and its result."""
+        self.Tags = Tags if Tags is not None else {}
+        self.Moves = Moves if Moves is not None else []
+        self.Result = Result
+
+
+def ResultFor(Winner):
+    """Return the PDN result for Winner ('B', 'W', or None for a draw)."""
+    return {'B': "1-0", 'W': "0-1"}.get(Winner, "1/2-1/2")
+
+
+def ReadGames(Lines):
+    """Yield each PDNGame in an iterable of PDN text lines (such as an open file), one at a time."""
+    Game = PDNGame()
+    InComment = False
+    Variation = 0
+    for Line in Lines:
+        Stripped = Line.strip()
+        if Stripped.startswith("[") and not InComment and not Variation:
+            Match = TAG.match(Stripped)
+            if Match:
+                if Game.Moves:  # A tag after moves starts the next game.
+                    yield Game
+                    Game = PDNGame()
+                Game.Tags[Match[1]] = Match[2].replace('\\"', '"').replace('\\\\', '\\')
+                if Match[1] == "Result":
+                    Game.Result = Game.Tags["Result"]
+                continue
+        for Token in TOKEN.findall(Line):
+            if InComment:
+                InComment = Token != "}"
+            elif Token == "{":
+                InComment = True
+            elif Token == ";":
+                break  # Comment to the end of the line
+            elif Token == "(":
+                Variation += 1
+            elif Token == ")":
+                Variation = max(0, Variation - 1)
+            elif Variation:
+                continue
+            elif Token in RESULTS:
+                if Game.Moves or Game.Tags:
+                    Game.Result = Token
+                    yield Game
+                Game = PDNGame()
+            else:
+                Token = MOVE_NUMBER.sub("", Token).rstrip("!?")
+                if MOVE.fullmatch(Token):
+                    Game.Moves.append(Token.replace(":", "x"))
+    if Game.Moves or Game.Tags:
+        yield Game
+
+
+def StartPosition(Game):
+    """
+    Return (BitBoard, Player) where Game starts: its FEN tag, or the initial position with
+    Black to move. A game from the initial position whose first move only White can play
+    (as written by PlayCheckers) starts with White to move. Raises ValueError for a
+    malformed FEN tag.
+    """
+    if "FEN" in Game.Tags:
+        try:
+            Board, Player = ParseFEN(Game.Tags["FEN"])
+        except (ValueError, IndexError, AttributeError):
+            Player = None
+        if Player not in ('B', 'W'):
+            raise ValueError("bad FEN tag %r" % Game.Tags["FEN"])
+        return Board, Player
+    Board, _ = ParseFEN(INITIAL_FEN)
+    if Game.Moves and Board.FindMove('B', Game.Moves[0]) is None and Board.FindMove('W', Game.Moves[0]):
+        return Board, 'W'
+    return Board, 'B'
+
+
+def ReplayGame(Game):
+    """
+    Yield (Board, Player, Move) before each move of Game; Board is changed in place after
+    each yield, so copy it to keep it. Raises ValueError for a malformed FEN tag and at
+    the first illegal move.
+    """
+    Board, Player = StartPosition(Game)
+    for Number, Text in enumerate(Game.Moves, 1):
+        Move = Board.FindMove(Player, Text)
+        if Move is None:
+            raise ValueError("move %d (%s) is not legal" % (Number, Text))
+        yield Board, Player, Move
+        Board.MakeMove(Move)
+        Player = 'B' if Player == 'W' else 'W'
+
+
+def FormatGame(Game, Comments=None):
+    """
+    Return Game as PDN text: its tags, then its numbered moves wrapped to LINE_WIDTH and
+    its result. Comments, if given, holds a comment (or None) for each move.
+    """
+    Lines = ['[%s "%s"]' % (Name, str(Value).replace('\\', '\\\\').replace('"', '\\"'))
+             for Name, Value in Game.Tags.items() if Name != "Result"]
+    Lines.append('[Result "%s"]' % Game.Result)
+    Tokens = []
+    for Index, Text in enumerate(Game.Moves):
+        if Index % 2 == 0:
+            Tokens.append("%d." % (Index // 2 + 1))
+        Tokens.append(Text)
+        if Comments is not None and Comments[Index]:
+            Tokens.append("{%s}" % Comments[Index].replace("}", ")"))
+    Tokens.append(Game.Result)
+    Line = ""
+    Lines.append("")
+    for Token in Tokens:
+        if Line and len(Line) + 1 + len(Token) > LINE_WIDTH:
+            Lines.append(Line)
+            Line = Token
+        else:
+            Line = Line + " " + Token if Line else Token
+    Lines.append(Line)
+    return "\n".join(Lines) + "\n\n"
+
+
+def GameTags(Black, White, StartFEN=None, **Tags):
+    """Return the usual tags of a game played here, with FEN StartFEN if it is not the PDN initial position."""
+    Result = {"Event": "CheckersBot", "Date": time.strftime("%Y.%m.%d"), "Black": Black, "White": White}
+    if StartFEN is not None:
+        Result["FEN"] = StartFEN
+    Result.update(Tags)
+    return Result
+
+
+def AppendGame(Path, Game):
+    """Append Game to the PDN file at Path."""
+    with open(Path, "a") as File:
+        File.write(FormatGame(Game))
+
+
+def _InitWorker(TableMemoryBytes, EvaluationPath):
+    """Create the worker's CheckersAI, kept for every game it analyzes."""
+    global _WorkerAI
+    from GameBoard import GameBoard
+    from SearchToolBox import CheckersAI
+    _WorkerAI = CheckersAI(GameBoard(), TableMemoryBytes)
+    if EvaluationPath is not None:
+        _WorkerAI.LoadEvaluation(EvaluationPath)
+
+
+def AnalyzeGame(AI, Game, TimeLimitMs=None, MaxDepth=64):
+    """
+    Search every position of Game with AI. Returns (PDN text annotated with the best move,
+    score from Black's side and depth after each move, positions searched, error or None).
+    """
+    Comments = []
+    Error = None
+    try:
+        for Board, Player, Move in ReplayGame(Game):
+            Score, BestMove = AI.IterativeDeepening(Board, TimeLimitMs=TimeLimitMs, MaxDepth=MaxDepth,
+                                                    IsMaximizing=Player == 'B')
+            Comment = "Best %s, score %+.3f, depth %d" % (MoveToNotation(BestMove), Score, AI.CompletedDepth)
+            Comments.append(Comment if BestMove != Move else Comment + ", played")
+    except ValueError as Problem:
+        Error = str(Problem)
+    Comments += [None] * (len(Game.Moves) - len(Comments))
+    Tags = dict(Game.Tags)
+    Tags["Annotator"] = "CheckersAI %s" % ("%d ms" % TimeLimitMs if TimeLimitMs is not None else "depth %d" % MaxDepth)
+    if Error is not None:
+        Tags["AnalysisError"] = Error
+    return FormatGame(PDNGame(Tags, Game.Moves, Game.Result), Comments), len(Comments) - Comments.count(None), Error
+
+
+def _AnalyzeGame(Game, TimeLimitMs, MaxDepth):
+    """Worker entry point: analyze one game with this process's engine."""
+    return AnalyzeGame(_WorkerAI, Game, TimeLimitMs, MaxDepth)
+
+
+def AnalyzeArchive(InputPath, OutputPath, Workers=None, TimeLimitMs=None, MaxDepth=64,
+                   TableMemoryBytes=16 * 1024 * 1024, EvaluationPath=None, Report=print):
+    """
+    Annotate every game of the PDN archive at InputPath into OutputPath, in archive order,
+    on Workers processes. Only a few games per worker are read ahead, so memory use does
+    not grow with the archive. Returns the summary dictionary that is also reported.
+    """
+    Games = Positions = Errors = 0
+    Workers = Workers or os.cpu_count() or 1
+    StartTime = time.perf_counter()
+    with open(InputPath, errors="replace") as Input, open(OutputPath, "w") as Output, \
+            ProcessPoolExecutor(max_workers=Workers, initializer=_InitWorker,
+                                initargs=(TableMemoryBytes, EvaluationPath)) as Pool:
+        MaxInFlight = 4 * Workers
+        Pending = deque()
+
+        def WriteOldest():
+            nonlocal Games, Positions, Errors
+            Text, Count, Error = Pending.popleft().result()
+            Output.write(Text)
+            Games += 1
+            Positions += Count
+            Errors += Error is not None
+            if Games % 100 == 0:
+                Report("%d games, %d positions, %.0f positions/s"
+                       % (Games, Positions, Positions / (time.perf_counter() - StartTime)))
+
+        for Game in ReadGames(Input):
+            Pending.append(Pool.submit(_AnalyzeGame, Game, TimeLimitMs, MaxDepth))
+            if len(Pending) >= MaxInFlight:
+                WriteOldest()
+        while Pending:
+            WriteOldest()
+    Seconds = time.perf_counter() - StartTime
+    Summary = {"Games": Games, "Positions": Positions, "Games With Errors": Errors, "Wall Time": Seconds,
+               "Positions Per Second": Positions / Seconds if Seconds else 0}
+    for Name, Value in Summary.items():
+        Report("%s: %s" % (Name, "%.1f" % Value if isinstance(Value, float) else Value))
+    return Summary
+
+
+def ArchiveInfo(InputPath, Report=print):
+    """Count the games, moves, results and unplayable games of a PDN archive, reading it once."""
+    Games = Moves = Unplayable = 0
+    Results = {}
+    with open(InputPath, errors="replace") as Input:
+        for Game in ReadGames(Input):
+            Games += 1
+            Moves += len(Game.Moves)
+            Results[Game.Result] = Results.get(Game.Result, 0) + 1
+            try:
+                for _ in ReplayGame(Game):
+                    pass
+            except ValueError:
+                Unplayable += 1
+    Summary = {"Games": Games, "Moves": Moves, "Results": Results, "Unplayable Games": Unplayable}
+    for Name, Value in Summary.items():
+        Report("%s: %s" % (Name, Value))
+    return Summary
+
+
+def Main(Arguments=None):
+    """Command-line entry point for PDN archive statistics and batch analysis."""
+    Parser = argparse.ArgumentParser(description="Inspect or annotate PDN game archives.")
+    Commands = Parser.add_subparsers(dest="Command", required=True)
+    Info = Commands.add_parser("info", help="count the games of an archive")
+    Info.add_argument("input")
+    Analyze = Commands.add_parser("analyze", help="annotate every position with CheckersAI")
+    Analyze.add_argument("input")
+    Analyze.add_argument("--output", required=True, help="annotated PDN file")
+    Analyze.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    Analyze.add_argument("--time", type=int, default=None, help="ms per position")
+    Analyze.add_argument("--depth", type=int, default=None, help="search depth per position")
+    Analyze.add_argument("--eval", default=None, help="evaluation weights file")
+    Options = Parser.parse_args(Arguments)
+
+    if Options.Command == "info":
+        ArchiveInfo(Options.input)
+        return
+    TimeLimitMs, MaxDepth = Options.time, Options.depth or 64
+    if Options.depth is None and TimeLimitMs is None:
+        TimeLimitMs = 100  # Some limit is needed; default to a fast time control.
+    AnalyzeArchive(Options.input, Options.output, Options.workers, TimeLimitMs, MaxDepth,
+                   EvaluationPath=Options.eval)
+
+
+if __name__ == "__main__":
+    Main()
@@ -0,0 +1,158 @@
+"""
+Module: ParallelSearch
+Purpose: Spreads the root moves of a Minimax search across a process pool.
+         The first (best-ordered) root move is searched in the calling process to
+         establish a bound ("young brothers wait"); the remaining root moves are then
+         searched by worker processes that share the best score found so far, so
+         every worker can still prune. Worker node counters are merged back into the
+         calling CheckersAI, and ties are resolved in root order so the chosen move
+         is the same as a serial search would pick for a fixed depth.
+"""
+
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from BitBoard import BitBoard, ZOBRIST_SIDE
+from TranspositionTable import EXACT
+
+# Per-process state of a pool worker, set up by _InitWorker.
+_WorkerAI = None
+_SharedBound = None
+_WorkerSearchId = None
+
+
+def _InitWorker(SharedBound, TableMemoryBytes, TablebasePath, EvaluationPath):
+    """Create the worker's own CheckersAI and keep a handle on the shared root bound."""
+    global _WorkerAI, _SharedBound
+    from GameBoard import GameBoard
+    from SearchToolBox import CheckersAI
+    _WorkerAI = CheckersAI(GameBoard(), TableMemoryBytes)
+    _WorkerAI.ExactDepthCutoffs = True
+    if TablebasePath is not None:
+        _WorkerAI.LoadTablebase(TablebasePath)
+    if EvaluationPath is not None:
+        _WorkerAI.LoadEvaluation(EvaluationPath)
+    _SharedBound = SharedBound
+
+
+def _SearchRootMove(SearchId, Position, Move, Depth, IsMaximizing, WallDeadline, QuiescenceDepth):
+    """
+    Search one root move in a worker process.
+    Returns (Score, Bound, Counters): Bound is the root bound the child was searched
+    against, and Score is None if the deadline passed before the search finished.
+    QuiescenceDepth is the calling CheckersAI's capture search cap.
+    """
+    global _WorkerSearchId
+    from SearchToolBox import SearchTimeout
+    AI = _WorkerAI
+    AI.QuiescenceDepth = QuiescenceDepth
+    if SearchId != _WorkerSearchId:
+        _WorkerSearchId = SearchId
+        AI.Table.NewSearch()
+        AI.Orderer.NewSearch()
+    Before = AI.SearchCounters()
+    Board = BitBoard(*Position)
+    Board.MakeMove(Move)
+    Bound = _SharedBound.value
+    if WallDeadline is not None:
+        AI.Deadline = time.perf_counter() + (WallDeadline - time.time())
+        AI.NextBudgetCheck = AI.SearchNodes
+    try:
+        if IsMaximizing:
+            Score, _ = AI.Minimax(Board, Depth - 1, Bound, math.inf, False, 1)
+        else:
+            Score, _ = AI.Minimax(Board, Depth - 1, -math.inf, Bound, True, 1)
+    except SearchTimeout:
+        Score = None
+    finally:
+        AI.Deadline = None
+        AI.NextBudgetCheck = math.inf
+    if Score is not None:
+        with _SharedBound.get_lock():
+            if (Score > _SharedBound.value) if IsMaximizing else (Score < _SharedBound.value):
+                _SharedBound.value = Score
+    return Score, Bound, tuple(After - Before for After, Before in zip(AI.SearchCounters(), Before))
+
+
+class ParallelSearcher:
+    def __init__(self, Workers, TableMemoryBytes=16 * 1024 * 1024, TablebasePath=None, EvaluationPath=None):
+        """
+        Start a pool of Workers processes, each with its own transposition table of
+        TableMemoryBytes and, if TablebasePath is given, its own mapping of that tablebase.
+        EvaluationPath names the evaluation weights file of the calling CheckersAI, if any.
+        """
+        self.Workers = Workers
+        self.TableMemoryBytes = TableMemoryBytes
+        self.SharedBound = multiprocessing.Value('d', 0.0)
+        self.Pool = ProcessPoolExecutor(max_workers=Workers, initializer=_InitWorker,
+                                        initargs=(self.SharedBound, TableMemoryBytes, TablebasePath, EvaluationPath))
+        self.SearchId = 0
+
+    def Shutdown(self):
+        """Stop the worker processes."""
+        self.Pool.shutdown(wait=True, cancel_futures=True)
+
+    def SearchRoot(self, AI, Board, Depth, IsMaximizing, RootMoves):
+        """
+        Search RootMoves (already ordered best-first) of Board to Depth plies.
+        Returns (EvaluationScore, BestMove, Scores), where Scores holds one score or
+        bound per root move in RootMoves order. The result only depends on the order of
+        RootMoves as long as AI.ExactDepthCutoffs is set. Raises SearchTimeout if AI's deadline
+        passes before every root move is finished.
+        """
+        from SearchToolBox import SearchTimeout
+        self.SearchId += 1
+        Sign = 1 if IsMaximizing else -1
+
+        # Young brothers wait: the eldest root move is searched here with a full window.
+        Undo = Board.MakeMove(RootMoves[0])
+        AI.NumberNodesExpanded += 1
+        FirstScore, _ = AI.Minimax(Board, Depth - 1, -math.inf, math.inf, not IsMaximizing, 1)
+        Board.UnmakeMove(Undo)
+        Scores = [FirstScore]
+        Exact = [True]
+        if len(RootMoves) > 1:
+            self.SharedBound.value = FirstScore
+            WallDeadline = None
+            if AI.Deadline is not None:
+                WallDeadline = time.time() + (AI.Deadline - time.perf_counter())
+            Position = (Board.Black, Board.White, Board.Kings, Board.Hash)
+            Futures = [self.Pool.submit(_SearchRootMove, self.SearchId, Position, Move, Depth,
+                                        IsMaximizing, WallDeadline, AI.QuiescenceDepth)
+                       for Move in RootMoves[1:]]
+            TimedOut = False
+            for Future in Futures:
+                Score, Bound, Counters = Future.result()
+                AI.NumberNodesExpanded += 1
+                AI.AddSearchCounters(Counters)
+                if Score is None:
+                    TimedOut = True
+                    continue
+                Scores.append(Score)
+                Exact.append(Sign * Score > Sign * Bound)
+            if TimedOut:
+                raise SearchTimeout()
+
+        # The best exact score wins; an earlier move that failed low against exactly that
+        # score may be a tie, so verify it in root order to match the serial choice.
+        BestIndex = max(range(len(Scores)), key=lambda Index: (Sign * Scores[Index] if Exact[Index]
+                                                               else -math.inf, -Index))
+        Best = Scores[BestIndex]
+        for Index in range(1, BestIndex):
+            if Exact[Index] or Scores[Index] != Best or abs(Best) == math.inf:
+                continue
+            Undo = Board.MakeMove(RootMoves[Index])
+            if IsMaximizing:
+                Score, _ = AI.Minimax(Board, Depth - 1, math.nextafter(Best, -math.inf), math.inf, False, 1)
+            else:
+                Score, _ = AI.Minimax(Board, Depth - 1, -math.inf, math.nextafter(Best, math.inf), True, 1)
+            Board.UnmakeMove(Undo)
+            if Score == Best:
+                BestIndex = Index
+                break
+        # Store the root so the principal variation can be read back from the table.
+        Key = Board.Hash if IsMaximizing else Board.Hash ^ ZOBRIST_SIDE
+        AI.Table.Store(Key, Depth, Best, EXACT, RootMoves[BestIndex])
+        return Best, RootMoves[BestIndex], Scores
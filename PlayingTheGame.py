@@ -8,17 +8,62 @@ Purpose: Controls the game flow between the human user and the AI agent.
 import time
 from GameBoard import GameBoard
 from SearchToolBox import CheckersAI
+from BitBoard import FormatFEN, MoveToRowCol, RowColToSquare
 
 class PlayCheckers:
-    def __init__(self):
-        """Initialize the game session with integrated analytics tracking."""
+    def __init__(self, Workers=1, TablebasePath=None, BookPath=None, Statistics=False, EvaluationPath=None,
+                 Ponder=False, PDNPath=None):
+        """
+        Initialize the game session with integrated analytics tracking.
+        Workers > 1 spreads the AI's root moves over that many processes.
+        TablebasePath names an endgame tablebase built by EndgameTablebase.py.
+        BookPath names an opening book built by OpeningBook.py.
+        Statistics collects per-ply search statistics for the report.
+        EvaluationPath names a JSON file of evaluation weights (see EvaluationWeights.json).
+        Ponder lets the AI search the human's possible replies while the human is thinking.
+        PDNPath names a PDN file every game is appended to when it ends (see PDN.py).
+        """
         self.Game = GameBoard()
         self.AI = CheckersAI(self.Game)
+        if EvaluationPath is not None:
+            self.AI.LoadEvaluation(EvaluationPath)
+        if Statistics:
+            self.AI.EnableStatistics()
+        self.Book = None
+        if BookPath is not None:
+            from OpeningBook import OpeningBook
+            self.Book = OpeningBook(BookPath)
+        if TablebasePath is not None:
+            self.AI.LoadTablebase(TablebasePath)
+        if Workers > 1:
+            self.AI.EnableParallelSearch(Workers)
+        self.Ponderer = None
+        if Ponder:
+            from Pondering import Ponderer
+            self.Ponderer = Ponderer(self.AI)
+        self.PredictedReply = None  # Human reply expected by the AI's last search, pondered first
+        # Game record for PDN export:
+        self.PDNPath = PDNPath
+        self.StartFEN = FormatFEN(self.Game.Position, 'W')  # Human (White) moves first.
+        self.Record = []  # Moves played so far, in numeric notation
+        self.ChainJump = False  # The human's last hop was a jump that must go on
+        self.Saved = False
         self.CurrentPlayer = "human"  # Human (White) moves first.
+        self.SearchDepth = 64  # Deepest iterative deepening iteration the AI may reach.
+        self.TimeLimitMs = 1000  # Per-move thinking time for the AI, in milliseconds.
+        self.NodeLimit = None  # Optional per-move cap on searched nodes.
+        self.ThinkDelay = 1.0  # Seconds HumanMove pauses before the AI replies; 0 disables the pause.
+        self.AutoReply = True  # HumanMove plays the AI reply itself; a GUI running the AI elsewhere turns this off.
         # Integrated analytics tracking variables:
         self.MovesMade = 0
         self.StatesExplored = 0
         self.PrunedStates = 0
+        self.FirstMoveCutoffs = 0
+        self.TTHits = 0
+        self.TTMisses = 0
+        self.TTCollisions = 0
+        self.BookHits = 0
+        self.LastSearchStatistics = None  # Per-ply statistics snapshot of the last AI search
         self.TimeTaken = []  # List of time durations for AI moves
 
     # Analytics tracking methods:
@@ -26,10 +71,24 @@ class PlayCheckers:
         """Increment the count of moves made."""
         self.MovesMade += 1
 
-    def TrackSearch(self, Expanded, Pruned):
-        """Record the number of search states expanded and pruned for an AI move."""
+    def TrackSearch(self, Expanded, Pruned, FirstMoveCutoffs=0):
+        """
+        Record the number of search states expanded and pruned for an AI move,
+        and how many of the prunings were caused by the first move searched.
+        """
         self.StatesExplored += Expanded
         self.PrunedStates += Pruned
+        self.FirstMoveCutoffs += FirstMoveCutoffs
+
+    def TrackTranspositions(self, Hits, Misses, Collisions):
+        """Record the transposition table probe results for an AI move."""
+        self.TTHits += Hits
+        self.TTMisses += Misses
+        self.TTCollisions += Collisions
+
+    def TrackBookHit(self):
+        """Record an AI move answered from the opening book."""
+        self.BookHits += 1
 
     def TrackTime(self, StartTime, EndTime):
         """Record the time taken for an AI move."""
@@ -42,7 +101,15 @@ class PlayCheckers:
             "Total Moves": self.MovesMade,
             "States Explored": self.StatesExplored,
             "Pruned States": self.PrunedStates,
-            "Average AI Move Time": AverageTime
+            "First Move Cutoffs": self.FirstMoveCutoffs,
+            "TT Hits": self.TTHits,
+            "TT Misses": self.TTMisses,
+            "TT Collisions": self.TTCollisions,
+            "Book Hits": self.BookHits,
+            "Ponder Hits": self.Ponderer.Hits if self.Ponderer is not None else 0,
+            "Ponder Misses": self.Ponderer.Misses if self.Ponderer is not None else 0,
+            "Average AI Move Time": AverageTime,
+            "Last Search": self.LastSearchStatistics
         }
 
     # Game flow methods:
@@ -56,16 +123,20 @@ class PlayCheckers:
         if self.Game.MovePiece(StartingMoveLocationRow, StartingMoveLocationCol,
                                TargetingMoveLocationRow, TargetingMoveLocationCol, 'W'):
             self.TrackMove()  # Track human move
+            self.RecordHop(StartingMoveLocationRow, StartingMoveLocationCol,
+                           TargetingMoveLocationRow, TargetingMoveLocationCol)
             # Check for chain jump; if available, do not switch turn.
-            if abs(TargetingMoveLocationRow - StartingMoveLocationRow) == 2 and \
-               self.Game.CanCaptureFrom(TargetingMoveLocationRow, TargetingMoveLocationCol, 'W'):
+            self.ChainJump = self.Game.ChainPlayer == 'W'  # The multi-jump is not finished yet.
+            if self.ChainJump:
                 print("Chain jump available. Continue moving the same piece.")
                 return True  # Remain on human turn.
             if self.CheckWinner():
                 return True
             self.CurrentPlayer = "ai"
-            time.sleep(1)  # Simulate AI thinking delay.
-            self.AIMove()
+            if self.AutoReply:
+                if self.ThinkDelay > 0:
+                    time.sleep(self.ThinkDelay)  # Simulate AI thinking delay.
+                self.AIMove()
             return True
         else:
             print("Invalid human move. Please try again.")
@@ -74,49 +145,140 @@ class PlayCheckers:
     def AIMove(self):
         """Have the AI select and execute its move, updating analytics and reporting move ordering gain."""
         if self.CurrentPlayer == "ai":
+            self.FinishAIMove(self.ChooseAIMove())
+
+    def ChooseAIMove(self, Progress=None):
+        """
+        Select the AI's move from the opening book or by searching, updating analytics,
+        without playing it. Returns the move as row/col coordinates, or None.
+        May run on a worker thread as long as the board is left alone until it returns;
+        Progress is passed on to CheckersAI.IterativeDeepening.
+        """
+        PonderResult = None
+        if self.Ponderer is not None:
+            PonderResult = self.Ponderer.Take(self.Game.Position)
+        self.PredictedReply = None
+        if self.Book is not None:
             start_time = time.time()
-            _, BestMove = self.AI.Minimax(self.Game.Board, Depth=3, 
-                                          Alpha=-float("inf"), Beta=float("inf"), 
-                                          IsMaximizing=True)
-            end_time = time.time()
-            self.TrackMove()  # Count the AI move
-            self.TrackSearch(self.AI.NumberNodesExpanded, self.AI.NumberNodesPruned)
-            self.TrackTime(start_time, end_time)
-            
-            # Compute ordering gain: percentage of nodes pruned out of nodes expanded.
-            ordering_gain = 0
-            if self.AI.NumberNodesExpanded > 0:
-                ordering_gain = (self.AI.NumberNodesPruned / self.AI.NumberNodesExpanded) * 100
-            
-            print(f"AI Move Analytics → Expanded: {self.AI.NumberNodesExpanded}, "
-                  f"Pruned: {self.AI.NumberNodesPruned}, "
-                  f"Time: {end_time - start_time:.3f} sec, "
-                  f"MaxRecursionDepth: {self.AI.MaxRecursionDepth}, "
-                  f"Ordering Gain: {ordering_gain:.1f}%")
-            print("Move ordering used:", self.AI.LastMoveOrdering)
-            
-            if BestMove:
-                (StartingMoveLocationRow, StartingMoveLocationCol,
-                 TargetingMoveLocationRow, TargetingMoveLocationCol) = BestMove
-                self.Game.MovePiece(StartingMoveLocationRow, StartingMoveLocationCol,
-                                    TargetingMoveLocationRow, TargetingMoveLocationCol, 'B')
-            if self.CheckWinner():
-                return
-            self.CurrentPlayer = "human"
+            BookMove = self.Book.Lookup(self.Game.Position, 'B')
+            if BookMove is not None:
+                end_time = time.time()
+                self.TrackMove()
+                self.TrackBookHit()
+                self.TrackTime(start_time, end_time)
+                print(f"AI Move Analytics → Book move, Time: {end_time - start_time:.6f} sec")
+                return MoveToRowCol(BookMove)
+        if PonderResult is not None:
+            return self.PonderedAIMove(PonderResult)
+        start_time = time.time()
+        _, BestMove = self.AI.IterativeDeepening(self.Game.Board, TimeLimitMs=self.TimeLimitMs,
+                                                 NodeLimit=self.NodeLimit, MaxDepth=self.SearchDepth,
+                                                 Progress=Progress)
+        end_time = time.time()
+        self.TrackMove()  # Count the AI move
+        # The AI's counters cover this search only.
+        self.TrackSearch(self.AI.NumberNodesExpanded, self.AI.NumberNodesPruned, self.AI.FirstMoveCutoffs)
+        self.TrackTranspositions(self.AI.TTHits, self.AI.TTMisses, self.AI.TTCollisions)
+        self.TrackTime(start_time, end_time)
+        self.LastSearchStatistics = self.AI.StatisticsSnapshot()
+        if len(self.AI.PrincipalVariation) > 1:
+            self.PredictedReply = self.AI.PrincipalVariation[1]
+
+        # Compute ordering gain: percentage of prunings caused by the first move searched.
+        ordering_gain = 0
+        if self.AI.NumberNodesPruned > 0:
+            ordering_gain = (self.AI.FirstMoveCutoffs / self.AI.NumberNodesPruned) * 100
+
+        print(f"AI Move Analytics → Expanded: {self.AI.NumberNodesExpanded}, "
+              f"Pruned: {self.AI.NumberNodesPruned}, "
+              f"Time: {end_time - start_time:.3f} sec, "
+              f"Depth Reached: {self.AI.CompletedDepth}, "
+              f"MaxRecursionDepth: {self.AI.MaxRecursionDepth}, "
+              f"Quiescence Nodes: {self.AI.QuiescenceNodes}, "
+              f"Ordering Gain: {ordering_gain:.1f}%, "
+              f"TT Hits/Misses/Collisions: {self.AI.TTHits}/{self.AI.TTMisses}/{self.AI.TTCollisions}")
+        print("Move ordering used:", self.AI.LastMoveOrdering)
+        return BestMove
+
+    def PonderedAIMove(self, Result):
+        """Answer with a Pondering.PonderResult for the current position, tracking its search as if it ran now."""
+        start_time = time.time()
+        Expanded, Pruned, FirstMoveCutoffs, TTHits, TTMisses, TTCollisions = Result.Counters[:6]
+        self.TrackMove()
+        self.TrackSearch(Expanded, Pruned, FirstMoveCutoffs)
+        self.TrackTranspositions(TTHits, TTMisses, TTCollisions)
+        self.LastSearchStatistics = Result.Statistics
+        if len(Result.PrincipalVariation) > 1:
+            self.PredictedReply = Result.PrincipalVariation[1]
+        end_time = time.time()
+        self.TrackTime(start_time, end_time)
+        print(f"AI Move Analytics → Ponder hit, Expanded: {Expanded}, Pruned: {Pruned}, "
+              f"Pondered: {Result.Seconds:.3f} sec, Time: {end_time - start_time:.6f} sec, "
+              f"Depth Reached: {Result.CompletedDepth}")
+        return MoveToRowCol(Result.BestMove) if Result.BestMove else None
+
+    def FinishAIMove(self, Move):
+        """Play the move returned by ChooseAIMove, check for a winner and hand the turn back to the human."""
+        if Move:
+            self.PlayMove(Move)
+        if self.CheckWinner():
+            return
+        self.CurrentPlayer = "human"
+        if self.Ponderer is not None:
+            self.Ponderer.Start(self.Game.Position, self.TimeLimitMs, self.NodeLimit,
+                                self.SearchDepth, self.PredictedReply)
+
+    def StopPondering(self):
+        """Stop searching on the human's time, e.g. before the session is closed."""
+        if self.Ponderer is not None:
+            self.Ponderer.Stop()
+
+    def PlayMove(self, Move):
+        """Play the AI's row/col Move; a multi-jump is played hop by hop along its path in the same turn."""
+        self.ChainJump = False
+        for Index in range(0, len(Move) - 2, 2):
+            (StartingMoveLocationRow, StartingMoveLocationCol,
+             TargetingMoveLocationRow, TargetingMoveLocationCol) = Move[Index:Index + 4]
+            self.Game.MovePiece(StartingMoveLocationRow, StartingMoveLocationCol,
+                                TargetingMoveLocationRow, TargetingMoveLocationCol, 'B')
+            self.RecordHop(StartingMoveLocationRow, StartingMoveLocationCol,
+                           TargetingMoveLocationRow, TargetingMoveLocationCol)
+            self.ChainJump = True  # Later hops extend the same move in the record.
+        self.ChainJump = False
+
+    def RecordHop(self, StartingMoveLocationRow, StartingMoveLocationCol,
+                  TargetingMoveLocationRow, TargetingMoveLocationCol):
+        """Add a step or jump to the game record; further jumps of a chain extend the same move."""
+        Target = str(RowColToSquare(TargetingMoveLocationRow, TargetingMoveLocationCol) + 1)
+        if abs(TargetingMoveLocationRow - StartingMoveLocationRow) != 2:
+            self.Record.append("%d-%s" % (RowColToSquare(StartingMoveLocationRow, StartingMoveLocationCol) + 1, Target))
+        elif self.ChainJump:
+            self.Record[-1] += "x" + Target
+        else:
+            self.Record.append("%dx%s" % (RowColToSquare(StartingMoveLocationRow, StartingMoveLocationCol) + 1, Target))
+
+    def SaveGame(self, Result="*"):
+        """Append the game record to PDNPath, once per game; Result "*" marks an unfinished game."""
+        if self.PDNPath is None or self.Saved or not self.Record:
+            return
+        from PDN import PDNGame, GameTags, AppendGame
+        AppendGame(self.PDNPath, PDNGame(GameTags("CheckersAI", "Human", self.StartFEN), list(self.Record), Result))
+        self.Saved = True
 
     def CheckWinner(self):
         """
         Check if the game is over.
         Returns True if one side has no pieces left.
         """
-        Board = self.Game.Board
-        WhiteExists = any(Cell in ('W', 'WK') for Row in Board for Cell in Row)
-        BlackExists = any(Cell in ('B', 'BK') for Row in Board for Cell in Row)
+        WhiteExists = self.Game.CountPieces('W') > 0
+        BlackExists = self.Game.CountPieces('B') > 0
         if not WhiteExists:
             print("Black wins!")
+            self.SaveGame("1-0")
             return True
         elif not BlackExists:
             print("White wins!")
+            self.SaveGame("0-1")
             return True
         return False
 
@@ -0,0 +1,99 @@
+"""
+Module: Pondering
+Purpose: Lets the AI search on the human's time. After the AI moves, a background thread
+         searches the position after each possible human reply, the predicted reply (the
+         second move of the AI's principal variation) first, with the same limits as a
+         normal AI move. When the human plays a reply that was fully pondered, the stored
+         result is the AI's answer and no search is needed; otherwise pondering is stopped
+         and the normal search starts from a transposition table warmed by the pondering.
+"""
+
+import threading
+import time
+
+
+class PonderResult:
+    def __init__(self, Score, BestMove, CompletedDepth, PrincipalVariation, Counters, Statistics, Seconds):
+        """The outcome of one pondered search, with the CheckersAI counters it would have reported."""
+        self.Score = Score
+        self.BestMove = BestMove
+        self.CompletedDepth = CompletedDepth
+        self.PrincipalVariation = PrincipalVariation
+        self.Counters = Counters  # CheckersAI.SearchCounters() of the search
+        self.Statistics = Statistics  # CheckersAI.StatisticsSnapshot() of the search
+        self.Seconds = Seconds
+
+
+class Ponderer:
+    def __init__(self, AI):
+        """Ponder with the CheckersAI AI, which must not be used by anyone else while pondering."""
+        self.AI = AI
+        self.Thread = None
+        self.Stopping = threading.Event()
+        self.Results = {}  # PonderResult per pondered position (Black to move), keyed by Zobrist hash
+        self.Hits = 0  # AI moves answered from a pondered search
+        self.Misses = 0  # AI moves that needed a search after pondering
+
+    def Start(self, Board, TimeLimitMs=None, NodeLimit=None, MaxDepth=64, PredictedReply=None):
+        """
+        Start pondering the replies of White (to move on the BitBoard Board), searching
+        each resulting position as CheckersAI.IterativeDeepening(TimeLimitMs, NodeLimit,
+        MaxDepth) would. PredictedReply, if it is one of the replies, is searched first.
+        """
+        self.Stop()
+        self.Results = {}
+        Replies = Board.GetMoves('W')
+        if PredictedReply in Replies:
+            Replies.remove(PredictedReply)
+            Replies.insert(0, PredictedReply)
+        self.Stopping.clear()
+        self.Thread = threading.Thread(target=self.Run, args=(Board.Copy(), Replies, TimeLimitMs, NodeLimit, MaxDepth),
+                                       daemon=True)
+        self.Thread.start()
+
+    def Run(self, Board, Replies, TimeLimitMs, NodeLimit, MaxDepth):
+        """Pondering thread: search the position after each reply until all are done or Stop is called."""
+        AI = self.AI
+        for Reply in Replies:
+            if self.Stopping.is_set():
+                return
+            Child = Board.ApplyMove(Reply)
+            StartTime = time.perf_counter()
+            Score, BestMove = AI.IterativeDeepening(Child, TimeLimitMs=TimeLimitMs, NodeLimit=NodeLimit,
+                                                    MaxDepth=MaxDepth, IsMaximizing=True)
+            if self.Stopping.is_set():
+                return  # Cut short; only the warmed transposition table is left of it.
+            self.Results[Child.Hash] = PonderResult(Score, BestMove, AI.CompletedDepth, AI.PrincipalVariation,
+                                                    AI.SearchCounters(), AI.StatisticsSnapshot(),
+                                                    time.perf_counter() - StartTime)
+
+    def Stop(self):
+        """Stop the pondering thread, if any, and wait for it; AI is free to search again afterwards."""
+        Thread = self.Thread
+        if Thread is None:
+            return
+        self.Stopping.set()
+        self.AI.RequestStop()
+        Thread.join()
+        self.Thread = None
+        self.AI.StopRequested = False  # The stop may have landed between two pondered searches.
+
+    def Take(self, Board):
+        """
+        Stop pondering and return the PonderResult for the BitBoard Board (Black to move),
+        or None if that position was not fully pondered. Counts the hit or miss.
+        """
+        Pondered = self.Thread is not None or bool(self.Results)
+        self.Stop()
+        Result = self.Results.get(Board.Hash)
+        self.Results = {}
+        if Result is not None:
+            self.Hits += 1
+        elif Pondered:
+            self.Misses += 1
+        return Result
+
+    def HitRate(self):
+        """Percentage of pondered AI moves answered without searching."""
+        Total = self.Hits + self.Misses
+        return 100 * self.Hits / Total if Total else 0
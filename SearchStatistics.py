@@ -0,0 +1,87 @@
+"""
+Module: SearchStatistics
+Purpose: Optional per-ply instrumentation for CheckersAI searches.
+         Minimax only touches these counters when statistics are enabled, and then only
+         increments list entries; totals, rates and text are built by Snapshot after the
+         search. With Timing on, move generation and evaluation are also timed, and every
+         finished iterative deepening iteration can be reported to hook functions.
+"""
+
+import time
+
+from MoveOrdering import MAX_PLY
+
+
+class SearchStatistics:
+    def __init__(self, Timing=False):
+        """Create empty counters; Timing also measures move generation and evaluation time."""
+        self.Timing = Timing
+        self.IterationHooks = []  # Functions called as Hook(Depth, Seconds, Nodes) after each iteration
+        self.NewSearch()
+
+    def NewSearch(self):
+        """Reset every counter before a new root search."""
+        self.Nodes = [0] * MAX_PLY  # Minimax calls per ply
+        self.Expanded = [0] * MAX_PLY  # Nodes whose moves were generated and searched
+        self.Children = [0] * MAX_PLY  # Moves searched from expanded nodes
+        self.Cutoffs = [0] * MAX_PLY
+        self.FirstMoveCutoffs = [0] * MAX_PLY
+        self.TTHits = [0] * MAX_PLY
+        self.MoveGenerationSeconds = 0.0
+        self.EvaluationSeconds = 0.0
+        self.Iterations = []  # (Depth, Seconds, Nodes) per finished iteration
+        self.StartTime = time.perf_counter()
+
+    def RecordExpansion(self, Ply, Searched, Cutoff):
+        """Record an expanded node at Ply that searched Searched moves; Cutoff tells if it failed high."""
+        self.Expanded[Ply] += 1
+        self.Children[Ply] += Searched
+        if Cutoff:
+            self.Cutoffs[Ply] += 1
+            if Searched == 1:
+                self.FirstMoveCutoffs[Ply] += 1
+
+    def RecordIteration(self, Depth):
+        """Record a finished iterative deepening iteration and call the iteration hooks."""
+        Seconds = time.perf_counter() - self.StartTime
+        Nodes = sum(self.Nodes)
+        self.Iterations.append((Depth, Seconds, Nodes))
+        for Hook in self.IterationHooks:
+            Hook(Depth, Seconds, Nodes)
+
+    def Snapshot(self):
+        """
+        Return the statistics of the last search as a plain dictionary: totals, the
+        first-move cutoff rate and average branching factor, one entry per ply reached
+        and, with Timing, the time spent generating moves and evaluating.
+        """
+        PerPly = []
+        for Ply in range(MAX_PLY):
+            if not self.Nodes[Ply]:
+                break
+            PerPly.append({
+                "Ply": Ply,
+                "Nodes": self.Nodes[Ply],
+                "Cutoffs": self.Cutoffs[Ply],
+                "First Move Cutoff Rate": _Percent(self.FirstMoveCutoffs[Ply], self.Cutoffs[Ply]),
+                "Branching Factor": self.Children[Ply] / self.Expanded[Ply] if self.Expanded[Ply] else 0,
+                "TT Hits": self.TTHits[Ply],
+            })
+        Expanded, Cutoffs = sum(self.Expanded), sum(self.Cutoffs)
+        Snapshot = {
+            "Nodes": sum(self.Nodes),
+            "Cutoffs": Cutoffs,
+            "First Move Cutoff Rate": _Percent(sum(self.FirstMoveCutoffs), Cutoffs),
+            "Branching Factor": sum(self.Children) / Expanded if Expanded else 0,
+            "TT Hits": sum(self.TTHits),
+            "Iterations": list(self.Iterations),
+            "Per Ply": PerPly,
+        }
+        if self.Timing:
+            Snapshot["Move Generation Time"] = self.MoveGenerationSeconds
+            Snapshot["Evaluation Time"] = self.EvaluationSeconds
+        return Snapshot
+
+
+def _Percent(Part, Whole):
+    return 100 * Part / Whole if Whole else 0
@@ -1,161 +1,710 @@
 """
 Module: SearchToolBox
 Purpose: Implements the AI agent for Checkers using the Minimax algorithm with Alpha-Beta Pruning.
+         The search runs on BitBoard positions; list-of-lists boards from GameBoard are
+         converted once at the root. Iterative deepening can instead use principal-variation
+         search (PVS), a negamax search with null-window re-searches, aspiration windows and
+         late-move reductions, so the two algorithms can be compared on the same positions.
 """
 
 import math
+import time
 from GameBoard import GameBoard
+from BitBoard import BitBoard, MoveToRowCol, ZOBRIST_SIDE, BLACK_PROMOTION_ROW, WHITE_PROMOTION_ROW
+from MoveOrdering import MoveOrderer
+from Evaluation import Evaluator
+from TranspositionTable import (TranspositionTable, DEPTH_PREFERRED, EXACT,
+                                LOWER_BOUND, UPPER_BOUND)
+
+# Search algorithms of IterativeDeepening:
+MINIMAX = "minimax"  # Full-window alpha-beta with separate maximizing and minimizing branches
+PVS = "pvs"  # Principal-variation search: negamax with null windows, aspiration windows and reductions
+SEARCH_ALGORITHMS = (MINIMAX, PVS)
+
+NULL_WINDOW = 1e-6  # Width of a PVS null window; scores are multiples of 1 / Evaluation.SCALE
+
+class SearchTimeout(Exception):
+    """Raised inside Minimax when the iterative deepening time or node budget is spent."""
+
 
 class CheckersAI:
-    def __init__(self, GameInstance):
-        """Initialize the AI agent with the given GameBoard instance."""
+    def __init__(self, GameInstance, TableMemoryBytes=16 * 1024 * 1024,
+                 ReplacementPolicy=DEPTH_PREFERRED):
+        """
+        Initialize the AI agent with the given GameBoard instance.
+        The transposition table is capped at TableMemoryBytes and kept between searches.
+        """
         self.GameInstance = GameInstance
-        # Counters for analytics:
+        self.Table = TranspositionTable(TableMemoryBytes, ReplacementPolicy)
+        self.Orderer = MoveOrderer()
+        self.Evaluator = Evaluator()
+        self.EvaluationPath = None  # Weights file of self.Evaluator, if not the defaults
+        # Counters for analytics, reset at the start of every search:
         self.NumberNodesExpanded = 0
         self.NumberNodesPruned = 0
+        self.FirstMoveCutoffs = 0  # Cutoffs produced by the first move searched
+        self.TTHits = 0  # Probes that found the position
+        self.TTMisses = 0  # Probes that found an empty slot
+        self.TTCollisions = 0  # Probes that found a different position in the slot
+        self.TablebaseHits = 0  # Nodes scored by the endgame tablebase
+        self.QuiescenceNodes = 0  # Capture moves searched past the depth horizon
+        self.QuiescenceCutoffs = 0  # Alpha-beta cutoffs in the capture search
+        self.BatchedEvaluations = 0  # Frontier children scored in vectorized batches
         self.MaxRecursionDepth = 0  # Track maximum recursion depth reached
         self.LastMoveOrdering = ""  # Store summary of last move ordering
+        self.RootOrdering = []  # Root moves in the order they were last searched
+        # Iterative deepening state:
+        self.SearchNodes = 0  # Minimax calls in the current iterative deepening search
+        self.NextBudgetCheck = math.inf  # SearchNodes value at which the budget is checked next
+        self.Deadline = None  # time.perf_counter() value after which the search aborts
+        self.NodeLimit = None  # SearchNodes value after which the search aborts
+        self.StopRequested = False  # Set from another thread to end the search early
+        self.PVMoves = {}  # Principal variation of the last iteration, keyed like the table
+        self.PrincipalVariation = []
+        self.CompletedDepth = 0  # Depth of the deepest finished iteration
+        self.Parallel = None  # ParallelSearcher used for root moves, if enabled
+        self.ExactDepthCutoffs = False  # Only cut off on table entries of exactly the searched depth
+        self.Tablebase = None  # EndgameTablebase probed during search, if loaded
+        self.Stats = None  # SearchStatistics with per-ply counters, if enabled
+        self.QuiescenceDepth = 8  # Capture plies searched past the depth horizon; 0 disables the extension
+        # Principal-variation search settings and counters (root-parallel search always uses Minimax):
+        self.Algorithm = MINIMAX  # MINIMAX or PVS
+        self.AspirationWindow = 0.25  # Half-width, in men, of the first window around the previous score
+        self.ReductionMoveIndex = 2  # Quiet moves ordered from this index on are searched a ply shallower
+        self.ReductionDepth = 3  # Remaining depth from which late moves are reduced
+        self.AspirationResearches = 0  # Root searches repeated because the score fell outside the window
+        self.ReductionResearches = 0  # Reduced moves searched again at full depth because they beat alpha
 
     def Minimax(self, State, Depth, Alpha, Beta, IsMaximizing, CurrentDepth=0):
         """
         Minimax algorithm with Alpha-Beta Pruning.
         Returns a tuple: (EvaluationScore, BestMove)
         Also updates self.MaxRecursionDepth with the maximum recursion depth reached.
+        State may be a GameBoard.Board list or a BitBoard. A list is converted to a
+        BitBoard once and the returned BestMove is converted back to
+        (StartRow, StartCol, TargetRow, TargetCol).
+        A BitBoard State is searched with in-place make/unmake moves and is restored
+        before returning (but not when SearchTimeout is raised).
+        Results are cached in the transposition table, keyed by the position's
+        Zobrist hash and the side to move.
         """
+        if isinstance(State, list):
+            self.Table.NewSearch()
+            self.Orderer.NewSearch()
+            self.ResetSearchCounters()
+            Score, BestMove = self.Minimax(BitBoard.FromBoard(State), Depth, Alpha, Beta,
+                                           IsMaximizing, CurrentDepth)
+            self.LastMoveOrdering = self.DescribeOrdering()
+            return Score, (MoveToRowCol(BestMove) if BestMove else None)
+
         # Update maximum recursion depth (proxy for space complexity)
         self.MaxRecursionDepth = max(self.MaxRecursionDepth, CurrentDepth)
+        self.SearchNodes += 1
+        if self.SearchNodes >= self.NextBudgetCheck:
+            self.CheckBudget()
+        Stats = self.Stats
+        if Stats is not None:
+            Stats.Nodes[CurrentDepth] += 1
+
+        # Positions covered by the endgame tablebase are scored exactly, without searching.
+        if (self.Tablebase is not None and CurrentDepth > 0
+                and State.BlackPieces + State.WhitePieces <= self.Tablebase.MaxPieces):
+            Score = self.Tablebase.Score(State, IsMaximizing)
+            if Score is not None:
+                self.TablebaseHits += 1
+                return Score, None
 
+        if Depth == 0 and self.QuiescenceDepth > 0:
+            return self.Quiescence(State, Alpha, Beta, IsMaximizing, CurrentDepth, self.QuiescenceDepth), None
         if Depth == 0 or self.IsTerminal(State):
+            if Stats is not None and Stats.Timing:
+                StartTime = time.perf_counter()
+                Score = self.Evaluate(State)
+                Stats.EvaluationSeconds += time.perf_counter() - StartTime
+                return Score, None
             return self.Evaluate(State), None
 
-        BestMove = None
+        # Probe the transposition table; the root always searches so it has a move to return.
+        Key = State.Hash if IsMaximizing else State.Hash ^ ZOBRIST_SIDE
+        OriginalAlpha, OriginalBeta = Alpha, Beta
+        HashMove = None
+        Entry = self.Table.Probe(Key)
+        if Entry is None:
+            self.TTMisses += 1
+        elif Entry[0] != Key:
+            self.TTCollisions += 1
+        else:
+            self.TTHits += 1
+            if Stats is not None:
+                Stats.TTHits[CurrentDepth] += 1
+            HashMove = Entry[4]
+            # Deeper entries change fixed-depth scores, so deterministic mode only trusts exact depths.
+            if CurrentDepth > 0 and (Entry[1] == Depth or (Entry[1] > Depth and not self.ExactDepthCutoffs)):
+                Score, Bound = Entry[2], Entry[3]
+                if Bound == EXACT:
+                    return Score, HashMove
+                if Bound == LOWER_BOUND:
+                    Alpha = max(Alpha, Score)
+                else:
+                    Beta = min(Beta, Score)
+                if Beta <= Alpha:
+                    return Score, HashMove
+        # The previous iteration's principal variation takes priority over the table move.
+        HashMove = self.PVMoves.get(Key, HashMove)
+
+        # Order moves from the move tuples alone: hash/PV move, captures, promotions, killers, history.
+        Player = 'B' if IsMaximizing else 'W'
+        if Stats is not None and Stats.Timing:
+            StartTime = time.perf_counter()
+            Moves = self.Orderer.OrderMoves(State, self.GetPossibleMoves(State, Player), Player,
+                                            CurrentDepth, HashMove)
+            Stats.MoveGenerationSeconds += time.perf_counter() - StartTime
+        else:
+            Moves = self.Orderer.OrderMoves(State, self.GetPossibleMoves(State, Player), Player,
+                                            CurrentDepth, HashMove)
+        if CurrentDepth == 0:
+            self.RootOrdering = Moves
+
+        # Frontier nodes score their children directly instead of calling Minimax on each leaf,
+        # all at once when a vectorized batch is worth it. With the capture search on, only the
+        # children where the opponent has no jump are batched; the others go through Quiescence.
+        # Timed searches and tablebase probes at the leaves need the full leaf visits.
+        Frontier = Depth == 1 and self.Tablebase is None and (Stats is None or not Stats.Timing)
+        Quiescence = self.QuiescenceDepth
+        Scores = None
+        if Frontier and self.Evaluator.PrefersBatch(len(Moves)):
+            Opponent = 'W' if IsMaximizing else 'B'
+            Scores = self.Evaluator.EvaluateChildren(State, Moves, Opponent if Quiescence else None)
+            self.BatchedEvaluations += len(Scores) - Scores.count(None)
+
+        BestMove = Moves[0] if Moves else None  # Kept even when every move loses outright
+        Index = -1
         if IsMaximizing:
-            MaxEval = -math.inf
-            Moves = self.GetPossibleMoves(State, 'B')
-            # Order moves: for maximizing, sort by heuristic descending.
-            if Moves:
-                Moves = sorted(Moves, key=lambda move: self.Evaluate(self.ApplyMove(State, move)), reverse=True)
-                # Store ordering summary (first 3 moves) as a string.
-                self.LastMoveOrdering = "Max Order (first 3): " + ", ".join(str(move) for move in Moves[:3])
-                print("Maximizing move ordering (first 3):", Moves[:3])
-            else:
-                Moves = []
-            for Move in Moves:
+            BestEval = -math.inf
+            for Index, Move in enumerate(Moves):
                 self.NumberNodesExpanded += 1
-                Eval, _ = self.Minimax(self.ApplyMove(State, Move), Depth - 1, Alpha, Beta, False, CurrentDepth + 1)
-                if Eval > MaxEval:
-                    MaxEval = Eval
+                if Scores is not None and Scores[Index] is not None:
+                    Eval = Scores[Index]
+                else:
+                    Undo = State.MakeMove(Move)
+                    if Frontier and Quiescence:
+                        Eval = self.Quiescence(State, Alpha, Beta, False, CurrentDepth + 1, Quiescence)
+                    elif Frontier:
+                        Eval = self.Evaluator.Evaluate(State)
+                    else:
+                        Eval, _ = self.Minimax(State, Depth - 1, Alpha, Beta, False, CurrentDepth + 1)
+                    State.UnmakeMove(Undo)
+                if Eval > BestEval:
+                    BestEval = Eval
                     BestMove = Move
                 Alpha = max(Alpha, Eval)
                 if Beta <= Alpha:
                     self.NumberNodesPruned += 1
+                    self.FirstMoveCutoffs += Index == 0
+                    self.Orderer.RecordCutoff(Move, 'B', CurrentDepth, Depth, Index)
                     break
-            return MaxEval, BestMove
         else:
-            MinEval = math.inf
-            Moves = self.GetPossibleMoves(State, 'W')
-            # Order moves: for minimizing, sort by heuristic ascending.
-            if Moves:
-                Moves = sorted(Moves, key=lambda move: self.Evaluate(self.ApplyMove(State, move)))
-                self.LastMoveOrdering = "Min Order (first 3): " + ", ".join(str(move) for move in Moves[:3])
-                print("Minimizing move ordering (first 3):", Moves[:3])
-            else:
-                Moves = []
-            for Move in Moves:
+            BestEval = math.inf
+            for Index, Move in enumerate(Moves):
                 self.NumberNodesExpanded += 1
-                Eval, _ = self.Minimax(self.ApplyMove(State, Move), Depth - 1, Alpha, Beta, True, CurrentDepth + 1)
-                if Eval < MinEval:
-                    MinEval = Eval
+                if Scores is not None and Scores[Index] is not None:
+                    Eval = Scores[Index]
+                else:
+                    Undo = State.MakeMove(Move)
+                    if Frontier and Quiescence:
+                        Eval = self.Quiescence(State, Alpha, Beta, True, CurrentDepth + 1, Quiescence)
+                    elif Frontier:
+                        Eval = self.Evaluator.Evaluate(State)
+                    else:
+                        Eval, _ = self.Minimax(State, Depth - 1, Alpha, Beta, True, CurrentDepth + 1)
+                    State.UnmakeMove(Undo)
+                if Eval < BestEval:
+                    BestEval = Eval
                     BestMove = Move
                 Beta = min(Beta, Eval)
                 if Beta <= Alpha:
                     self.NumberNodesPruned += 1
+                    self.FirstMoveCutoffs += Index == 0
+                    self.Orderer.RecordCutoff(Move, 'W', CurrentDepth, Depth, Index)
                     break
-            return MinEval, BestMove
+        if Frontier and Moves:
+            # Count the leaves scored here as visited nodes, as if Minimax had been called on them.
+            self.SearchNodes += Index + 1
+            self.MaxRecursionDepth = max(self.MaxRecursionDepth, CurrentDepth + 1)
+            if Stats is not None:
+                Stats.Nodes[CurrentDepth + 1] += Index + 1
+        if Stats is not None:
+            Stats.RecordExpansion(CurrentDepth, Index + 1, Beta <= Alpha)
+
+        if BestEval <= OriginalAlpha:
+            Bound = UPPER_BOUND
+        elif BestEval >= OriginalBeta:
+            Bound = LOWER_BOUND
+        else:
+            Bound = EXACT
+        self.Table.Store(Key, Depth, BestEval, Bound, BestMove)
+        return BestEval, BestMove
+
+    def Quiescence(self, State, Alpha, Beta, IsMaximizing, CurrentDepth, Remaining):
+        """
+        Capture search past the depth horizon, so a pending jump is played out instead of
+        being scored by the static evaluation. Captures are mandatory, so the side to move
+        stands pat (is scored by Evaluate) only when it has no jump; otherwise it gets the
+        best of its captures. After Remaining capture plies the position is scored as it stands.
+        Returns the score of State, which is restored before returning.
+        """
+        Stats = self.Stats
+        Player = 'B' if IsMaximizing else 'W'
+        if Remaining == 0 or not State.HasCapture(Player):
+            if Stats is not None and Stats.Timing:
+                StartTime = time.perf_counter()
+                Score = self.Evaluator.Evaluate(State)
+                Stats.EvaluationSeconds += time.perf_counter() - StartTime
+                return Score
+            return self.Evaluator.Evaluate(State)
+
+        Moves = self.Orderer.OrderMoves(State, State.GetMoves(Player), Player, CurrentDepth)
+        self.MaxRecursionDepth = max(self.MaxRecursionDepth, CurrentDepth + 1)
+        BestEval = -math.inf if IsMaximizing else math.inf
+        for Move in Moves:
+            self.SearchNodes += 1
+            self.QuiescenceNodes += 1
+            if self.SearchNodes >= self.NextBudgetCheck:
+                self.CheckBudget()
+            if Stats is not None:
+                Stats.Nodes[CurrentDepth + 1] += 1
+            Undo = State.MakeMove(Move)
+            Eval = self.Quiescence(State, Alpha, Beta, not IsMaximizing, CurrentDepth + 1, Remaining - 1)
+            State.UnmakeMove(Undo)
+            if IsMaximizing:
+                BestEval = max(BestEval, Eval)
+                Alpha = max(Alpha, Eval)
+            else:
+                BestEval = min(BestEval, Eval)
+                Beta = min(Beta, Eval)
+            if Beta <= Alpha:
+                self.QuiescenceCutoffs += 1
+                break
+        return BestEval
+
+    def AspirationSearch(self, State, Depth, IsMaximizing, PreviousScore=None):
+        """
+        Search State to Depth with PrincipalVariationSearch, first within AspirationWindow of
+        PreviousScore (the last iteration's score, from Black's side); a score outside the
+        window is searched again with that side of the window opened fully. A won or lost
+        score (+-inf) is exact even outside the window.
+        Returns (EvaluationScore, BestMove) with the score from Black's side, like Minimax.
+        """
+        Sign = 1 if IsMaximizing else -1
+        if PreviousScore is None or abs(PreviousScore) == math.inf or self.AspirationWindow <= 0:
+            Alpha, Beta = -math.inf, math.inf
+        else:
+            Alpha = Sign * PreviousScore - self.AspirationWindow
+            Beta = Sign * PreviousScore + self.AspirationWindow
+        while True:
+            Score, BestMove = self.PrincipalVariationSearch(State, Depth, Alpha, Beta, IsMaximizing)
+            if Alpha < Score < Beta or abs(Score) == math.inf:
+                return Sign * Score, BestMove
+            # A failing bound is finite here: an infinite one can only fail on a +-inf score.
+            self.AspirationResearches += 1
+            if Score <= Alpha:
+                Alpha = -math.inf
+            else:
+                Beta = math.inf
+
+    def PrincipalVariationSearch(self, State, Depth, Alpha, Beta, IsMaximizing, CurrentDepth=0):
+        """
+        Negamax principal-variation search of the BitBoard State. Scores, Alpha and Beta are
+        from the side to move's point of view. The first move gets the full window; later
+        moves are searched with a null window around Alpha and again with the full window
+        only if they beat it. Quiet late moves (from index ReductionMoveIndex on, when at
+        least ReductionDepth plies remain) are searched a ply shallower, and at full depth
+        again if they beat Alpha. Returns (EvaluationScore, BestMove); the transposition
+        table is shared with Minimax and keeps its scores from Black's side.
+        """
+        self.MaxRecursionDepth = max(self.MaxRecursionDepth, CurrentDepth)
+        self.SearchNodes += 1
+        if self.SearchNodes >= self.NextBudgetCheck:
+            self.CheckBudget()
+        Stats = self.Stats
+        if Stats is not None:
+            Stats.Nodes[CurrentDepth] += 1
+        Sign = 1 if IsMaximizing else -1
+
+        if (self.Tablebase is not None and CurrentDepth > 0
+                and State.BlackPieces + State.WhitePieces <= self.Tablebase.MaxPieces):
+            Score = self.Tablebase.Score(State, IsMaximizing)
+            if Score is not None:
+                self.TablebaseHits += 1
+                return Sign * Score, None
+
+        if Depth <= 0 and self.QuiescenceDepth > 0:
+            Low, High = (Alpha, Beta) if IsMaximizing else (-Beta, -Alpha)
+            return Sign * self.Quiescence(State, Low, High, IsMaximizing, CurrentDepth, self.QuiescenceDepth), None
+        if Depth <= 0 or self.IsTerminal(State):
+            return Sign * self.Evaluate(State), None
+
+        Key = State.Hash if IsMaximizing else State.Hash ^ ZOBRIST_SIDE
+        OriginalAlpha = Alpha
+        HashMove = None
+        Entry = self.Table.Probe(Key)
+        if Entry is None:
+            self.TTMisses += 1
+        elif Entry[0] != Key:
+            self.TTCollisions += 1
+        else:
+            self.TTHits += 1
+            if Stats is not None:
+                Stats.TTHits[CurrentDepth] += 1
+            HashMove = Entry[4]
+            if CurrentDepth > 0 and (Entry[1] == Depth or (Entry[1] > Depth and not self.ExactDepthCutoffs)):
+                Score, Bound = Sign * Entry[2], Entry[3]
+                if Bound != EXACT and Sign < 0:
+                    Bound = LOWER_BOUND if Bound == UPPER_BOUND else UPPER_BOUND
+                if Bound == EXACT or (Bound == LOWER_BOUND and Score >= Beta) or \
+                        (Bound == UPPER_BOUND and Score <= Alpha):
+                    return Score, HashMove
+        HashMove = self.PVMoves.get(Key, HashMove)
+
+        Player = 'B' if IsMaximizing else 'W'
+        Moves = self.Orderer.OrderMoves(State, State.GetMoves(Player), Player, CurrentDepth, HashMove)
+        if CurrentDepth == 0:
+            self.RootOrdering = Moves
+        Opponent = 'W' if IsMaximizing else 'B'
+        PromotionRow = BLACK_PROMOTION_ROW if IsMaximizing else WHITE_PROMOTION_ROW
+        Reduce = self.ReductionMoveIndex > 0 and Depth >= self.ReductionDepth
+
+        BestMove = Moves[0] if Moves else None
+        BestScore = -math.inf
+        Index = -1
+        for Index, Move in enumerate(Moves):
+            self.NumberNodesExpanded += 1
+            # Men crowned by Move are read before it is made.
+            Quiet = not Move[2] and not (1 << Move[1] & PromotionRow and not 1 << Move[0] & State.Kings)
+            Undo = State.MakeMove(Move)
+            if Index == 0 or Alpha == -math.inf:
+                Score = -self.PrincipalVariationSearch(State, Depth - 1, -Beta, -Alpha, not IsMaximizing,
+                                                       CurrentDepth + 1)[0]
+            else:
+                Reduction = 1 if (Reduce and Quiet and Index >= self.ReductionMoveIndex
+                                  and not State.HasCapture(Opponent)) else 0
+                Score = -self.PrincipalVariationSearch(State, Depth - 1 - Reduction, -Alpha - NULL_WINDOW, -Alpha,
+                                                       not IsMaximizing, CurrentDepth + 1)[0]
+                if Reduction and Score > Alpha:
+                    self.ReductionResearches += 1
+                    Score = -self.PrincipalVariationSearch(State, Depth - 1, -Alpha - NULL_WINDOW, -Alpha,
+                                                           not IsMaximizing, CurrentDepth + 1)[0]
+                if Alpha < Score < Beta:
+                    Score = -self.PrincipalVariationSearch(State, Depth - 1, -Beta, -Alpha, not IsMaximizing,
+                                                           CurrentDepth + 1)[0]
+            State.UnmakeMove(Undo)
+            if Score > BestScore:
+                BestScore = Score
+                BestMove = Move
+            Alpha = max(Alpha, Score)
+            if Alpha >= Beta:
+                self.NumberNodesPruned += 1
+                self.FirstMoveCutoffs += Index == 0
+                self.Orderer.RecordCutoff(Move, Player, CurrentDepth, Depth, Index)
+                break
+        if Stats is not None:
+            Stats.RecordExpansion(CurrentDepth, Index + 1, Alpha >= Beta)
+
+        if BestScore <= OriginalAlpha:
+            Bound = UPPER_BOUND if Sign > 0 else LOWER_BOUND
+        elif BestScore >= Beta:
+            Bound = LOWER_BOUND if Sign > 0 else UPPER_BOUND
+        else:
+            Bound = EXACT
+        self.Table.Store(Key, Depth, Sign * BestScore, Bound, BestMove)
+        return BestScore, BestMove
+
+    def LoadTablebase(self, Path, CachePages=64):
+        """Probe the endgame tablebase file at Path during search and at the root."""
+        from EndgameTablebase import EndgameTablebase
+        if self.Tablebase is not None:
+            self.Tablebase.Close()
+        self.Tablebase = EndgameTablebase(Path, CachePages)
+        if self.Parallel is not None:
+            # Restart the workers so they probe the same tablebase.
+            self.EnableParallelSearch(self.Parallel.Workers, self.Parallel.TableMemoryBytes)
+
+    def TablebaseMove(self, Board, IsMaximizing):
+        """
+        Return (EvaluationScore, BestMove) chosen from the endgame tablebase, or None if Board
+        is not covered: the fastest win, else a draw, else the slowest loss.
+        """
+        if self.Tablebase is None or Board.BlackPieces + Board.WhitePieces > self.Tablebase.MaxPieces:
+            return None
+        Sign = 1 if IsMaximizing else -1
+        Best = None
+        for Move in self.GetPossibleMoves(Board, 'B' if IsMaximizing else 'W'):
+            Score = self.Tablebase.Score(Board.ApplyMove(Move), not IsMaximizing)
+            if Score is None:
+                return None
+            if Best is None or Sign * Score > Sign * Best[0]:
+                Best = (Score, Move)
+        return Best
+
+    def LoadEvaluation(self, Path):
+        """Evaluate positions with the weights in the JSON config file at Path (see EvaluationWeights.json)."""
+        self.Evaluator = Evaluator.FromFile(Path)
+        self.EvaluationPath = Path
+        if self.Parallel is not None:
+            # Restart the workers so they evaluate with the same weights.
+            self.EnableParallelSearch(self.Parallel.Workers, self.Parallel.TableMemoryBytes)
+
+    def EnableParallelSearch(self, Workers, TableMemoryBytes=16 * 1024 * 1024):
+        """
+        Search the root moves of IterativeDeepening on a pool of Workers processes.
+        Workers <= 1 switches back to the single-process search.
+        """
+        from ParallelSearch import ParallelSearcher
+        self.DisableParallelSearch()
+        if Workers > 1:
+            self.Parallel = ParallelSearcher(Workers, TableMemoryBytes,
+                                             self.Tablebase.Path if self.Tablebase is not None else None,
+                                             self.EvaluationPath)
+            self.ExactDepthCutoffs = True
+
+    def DisableParallelSearch(self):
+        """Shut down the worker pool, if any, and search in this process only."""
+        if self.Parallel is not None:
+            self.Parallel.Shutdown()
+            self.Parallel = None
+            self.ExactDepthCutoffs = False
+
+    def EnableStatistics(self, Timing=False):
+        """Collect per-ply search statistics from now on; Timing also times move generation and evaluation."""
+        from SearchStatistics import SearchStatistics
+        self.Stats = SearchStatistics(Timing)
+
+    def DisableStatistics(self):
+        """Stop collecting per-ply search statistics."""
+        self.Stats = None
+
+    def StatisticsSnapshot(self):
+        """Return SearchStatistics.Snapshot() for the last search, or None if statistics are disabled."""
+        return self.Stats.Snapshot() if self.Stats is not None else None
+
+    def ResetSearchCounters(self):
+        """Zero the analytics counters and per-ply statistics before a new search."""
+        self.NumberNodesExpanded = 0
+        self.NumberNodesPruned = 0
+        self.FirstMoveCutoffs = 0
+        self.TTHits = 0
+        self.TTMisses = 0
+        self.TTCollisions = 0
+        self.TablebaseHits = 0
+        self.QuiescenceNodes = 0
+        self.QuiescenceCutoffs = 0
+        self.BatchedEvaluations = 0
+        self.AspirationResearches = 0
+        self.ReductionResearches = 0
+        self.MaxRecursionDepth = 0
+        self.SearchNodes = 0
+        if self.Stats is not None:
+            self.Stats.NewSearch()
+
+    def SearchCounters(self):
+        """Return the additive search counters as a tuple, for merging results from other processes."""
+        return (self.NumberNodesExpanded, self.NumberNodesPruned, self.FirstMoveCutoffs,
+                self.TTHits, self.TTMisses, self.TTCollisions, self.SearchNodes, self.TablebaseHits,
+                self.QuiescenceNodes, self.QuiescenceCutoffs, self.BatchedEvaluations)
+
+    def AddSearchCounters(self, Counters):
+        """Add counters returned by SearchCounters (or differences of them) to this agent's counters."""
+        (Expanded, Pruned, FirstMoveCutoffs, TTHits, TTMisses, TTCollisions, SearchNodes,
+         TablebaseHits, QuiescenceNodes, QuiescenceCutoffs, BatchedEvaluations) = Counters
+        self.NumberNodesExpanded += Expanded
+        self.NumberNodesPruned += Pruned
+        self.FirstMoveCutoffs += FirstMoveCutoffs
+        self.TTHits += TTHits
+        self.TTMisses += TTMisses
+        self.TTCollisions += TTCollisions
+        self.SearchNodes += SearchNodes
+        self.TablebaseHits += TablebaseHits
+        self.QuiescenceNodes += QuiescenceNodes
+        self.QuiescenceCutoffs += QuiescenceCutoffs
+        self.BatchedEvaluations += BatchedEvaluations
+
+    def RequestStop(self):
+        """
+        Ask a running IterativeDeepening call (usually on another thread) to stop and return
+        the best move of its deepest finished iteration.
+        """
+        self.StopRequested = True
+
+    def CheckBudget(self):
+        """Raise SearchTimeout if the node or time budget is spent; otherwise schedule the next check."""
+        if self.StopRequested:
+            raise SearchTimeout()
+        if self.NodeLimit is not None and self.SearchNodes >= self.NodeLimit:
+            raise SearchTimeout()
+        if self.Deadline is not None and time.perf_counter() >= self.Deadline:
+            raise SearchTimeout()
+        self.NextBudgetCheck = self.SearchNodes + 1024
+        if self.NodeLimit is not None:
+            self.NextBudgetCheck = min(self.NextBudgetCheck, self.NodeLimit)
+
+    def IterativeDeepening(self, State, TimeLimitMs=None, NodeLimit=None, MaxDepth=64, IsMaximizing=True,
+                           Progress=None):
+        """
+        Search depth 1, 2, 3, ... until TimeLimitMs milliseconds or NodeLimit Minimax calls
+        have been used, MaxDepth is reached or RequestStop is called.
+        Returns a tuple: (EvaluationScore, BestMove) from the deepest finished iteration;
+        an iteration cut off by the budget is discarded. The first iteration always
+        completes so a move is available. Each iteration's principal variation is
+        searched first in the next one.
+        State may be a GameBoard.Board list or a BitBoard, as for Minimax.
+        Progress, if given, is called as Progress(Depth, EvaluationScore, BestMove) after
+        every finished iteration, from the searching thread.
+        """
+        IsList = isinstance(State, list)
+        Player = 'B' if IsMaximizing else 'W'
+        # Search a private copy: an aborted iteration leaves its board mid-variation.
+        if State is self.GameInstance.Board:
+            # The game's own board: its rules engine already holds the position and legal moves.
+            Board = self.GameInstance.Position.Copy()
+            Moves = self.GameInstance.LegalMoves(Player)
+        else:
+            Board = BitBoard.FromBoard(State) if IsList else State.Copy()
+            Moves = self.GetPossibleMoves(Board, Player)
+        self.Table.NewSearch()
+        self.Orderer.NewSearch()
+        self.ResetSearchCounters()
+        self.PVMoves = {}
+        self.PrincipalVariation = []
+        self.CompletedDepth = 0
+        StartTime = time.perf_counter()
+
+        Score, BestMove = self.Evaluate(Board), None
+        TablebaseResult = self.TablebaseMove(Board, IsMaximizing)
+        if TablebaseResult is not None:
+            # The tablebase already knows the perfect move.
+            Score, BestMove = TablebaseResult
+            MaxDepth = 0
+        elif len(Moves) == 1:
+            # A forced move needs no search.
+            BestMove = Moves[0]
+            MaxDepth = 0
+        for Depth in range(1, MaxDepth + 1):
+            if Depth == 2:
+                # Enforce the budget once the first iteration has produced a move.
+                self.Deadline = StartTime + TimeLimitMs / 1000 if TimeLimitMs is not None else None
+                self.NodeLimit = self.SearchNodes + NodeLimit if NodeLimit is not None else None
+                self.NextBudgetCheck = self.SearchNodes  # Also polls StopRequested.
+            elif Depth > 2 and TimeLimitMs is not None and \
+                    time.perf_counter() - StartTime > TimeLimitMs / 2000:
+                break  # Past half the budget the next iteration would almost surely be cut off.
+            if Depth > 1 and self.StopRequested:
+                break
+            try:
+                # A root without moves is lost at once; the serial search scores it.
+                if self.Parallel is not None and Moves:
+                    # The root order must not depend on which worker searched what, so it
+                    # starts from a static order and only moves each iteration's best move first.
+                    if Depth == 1:
+                        Moves = sorted(Moves, key=lambda Move: (-Move[2].bit_count(), Move))
+                    Score, BestMove, _ = self.Parallel.SearchRoot(self, Board, Depth, IsMaximizing, Moves)
+                    Moves = [BestMove] + [Move for Move in Moves if Move != BestMove]
+                    self.RootOrdering = Moves
+                elif self.Algorithm == PVS:
+                    Score, BestMove = self.AspirationSearch(Board, Depth, IsMaximizing,
+                                                            Score if self.CompletedDepth else None)
+                else:
+                    Score, BestMove = self.Minimax(Board, Depth, -math.inf, math.inf, IsMaximizing)
+            except SearchTimeout:
+                break
+            self.CompletedDepth = Depth
+            self.PrincipalVariation = self.ExtractPrincipalVariation(Board, IsMaximizing, Depth)
+            if self.Stats is not None:
+                self.Stats.RecordIteration(Depth)
+            if Progress is not None:
+                Progress(Depth, Score, MoveToRowCol(BestMove) if IsList and BestMove else BestMove)
+            if abs(Score) == math.inf:
+                break  # The game result is already decided within this depth.
+        self.Deadline = None
+        self.NodeLimit = None
+        self.NextBudgetCheck = math.inf
+        self.StopRequested = False
+        self.PVMoves = {}
+        self.LastMoveOrdering = self.DescribeOrdering()
+        if IsList:
+            return Score, (MoveToRowCol(BestMove) if BestMove else None)
+        return Score, BestMove
+
+    def DescribeOrdering(self):
+        """Summarize the root move ordering and the ordering quality of the last search."""
+        return "Root Order (first 3): %s | First-move cutoffs: %.1f%%" % (
+            ", ".join(str(MoveToRowCol(Move)) for Move in self.RootOrdering[:3]),
+            self.Orderer.FirstMoveCutoffRate())
+
+    def ExtractPrincipalVariation(self, Board, IsMaximizing, Depth):
+        """
+        Follow the best moves stored in the transposition table from Board for up to Depth plies.
+        Returns the list of moves and records them in self.PVMoves for the next iteration.
+        """
+        Variation = []
+        self.PVMoves = {}
+        for _ in range(Depth):
+            Key = Board.Hash if IsMaximizing else Board.Hash ^ ZOBRIST_SIDE
+            Entry = self.Table.Probe(Key)
+            if Entry is None or Entry[0] != Key or Entry[4] is None or Key in self.PVMoves:
+                break
+            self.PVMoves[Key] = Entry[4]
+            Variation.append(Entry[4])
+            Board = Board.ApplyMove(Entry[4])
+            IsMaximizing = not IsMaximizing
+        return Variation
 
     def IsTerminal(self, State):
         """Return True if the game is over (one side has no pieces left)."""
-        if not isinstance(State, list):
-            return True
-        WhiteExists = any(Cell in ('W', 'WK') for Row in State for Cell in Row)
-        BlackExists = any(Cell in ('B', 'BK') for Row in State for Cell in Row)
-        return not (WhiteExists and BlackExists)
+        if isinstance(State, list):
+            State = BitBoard.FromBoard(State)
+        return not (State.BlackPieces and State.WhitePieces)
 
     def Evaluate(self, State):
         """
-        Evaluation function that calculates a score based on piece count.
-        Kings are weighted more heavily.
-        """
-        Value = 0
-        for Row in State:
-            for Cell in Row:
-                if Cell == 'W':
-                    Value -= 1
-                elif Cell == 'B':
-                    Value += 1
-                elif Cell == 'WK':
-                    Value -= 1.5
-                elif Cell == 'BK':
-                    Value += 1.5
-        return Value
+        Evaluation function: material with kings weighted more heavily, plus the
+        positional terms of Evaluation.Evaluator (piece-square table, back-rank guard,
+        mobility and king centralization).
+        """
+        if isinstance(State, list):
+            State = BitBoard.FromBoard(State)
+        return self.Evaluator.Evaluate(State)
 
     def GetPossibleMoves(self, State, Player):
         """
         Generate all legal moves for the given Player.
-        Returns moves as tuples:
+        For a BitBoard, returns the BitBoard (From, To, Captured, Path) moves.
+        For a GameBoard.Board list, returns moves as tuples:
           (StartingMoveLocationRow, StartingMoveLocationCol, TargetingMoveLocationRow, TargetingMoveLocationCol)
-        Capture moves (jumps) are mandatory.
-        """
-        Moves = []
-        JumpMoves = []
-        for Row in range(8):
-            for Col in range(8):
-                Piece = State[Row][Col]
-                if Piece == Player or (len(Piece) == 2 and Piece.endswith("K") and Piece[0] == Player):
-                    if len(Piece) == 2 and Piece.endswith("K"):
-                        NormalDirs = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-                        JumpDirs = [(-2, -2), (-2, 2), (2, -2), (2, 2)]
-                    else:
-                        if Player == 'B':
-                            NormalDirs = [(1, -1), (1, 1)]
-                            JumpDirs = [(2, -2), (2, 2)]
-                        else:  # Player == 'W'
-                            NormalDirs = [(-1, -1), (-1, 1)]
-                            JumpDirs = [(-2, -2), (-2, 2)]
-                    
-                    for dR, dC in NormalDirs:
-                        NewRow = Row + dR
-                        NewCol = Col + dC
-                        if 0 <= NewRow < 8 and 0 <= NewCol < 8 and State[NewRow][NewCol] == '.':
-                            Moves.append((Row, Col, NewRow, NewCol))
-                    for dR, dC in JumpDirs:
-                        NewRow = Row + dR
-                        NewCol = Col + dC
-                        MidRow = Row + dR // 2
-                        MidCol = Col + dC // 2
-                        if 0 <= NewRow < 8 and 0 <= NewCol < 8 and State[NewRow][NewCol] == '.':
-                            MidPiece = State[MidRow][MidCol]
-                            if MidPiece != '.' and MidPiece[0] != Player:
-                                JumpMoves.append((Row, Col, NewRow, NewCol))
-        # If any capture moves exist, return those (they are mandatory).
-        if JumpMoves:
-            return JumpMoves
-        return Moves
+        extended by one (Row, Col) pair per further hop of a multi-jump.
+        Capture moves (jumps) are mandatory and a whole capture sequence is one move.
+        """
+        if isinstance(State, BitBoard):
+            return State.GetMoves(Player)
+        return [MoveToRowCol(Move) for Move in BitBoard.FromBoard(State).GetMoves(Player)]
 
     def ApplyMove(self, State, Move):
         """
         Return a new board state after applying the given Move.
-        Handles capturing (removes jumped piece) and king promotion.
+        Handles capturing (removes every jumped piece of a multi-jump) and king promotion.
         """
-        StartingMoveLocationRow, StartingMoveLocationCol, TargetingMoveLocationRow, TargetingMoveLocationCol = Move
+        if isinstance(State, BitBoard):
+            return State.ApplyMove(Move)
+        StartingMoveLocationRow, StartingMoveLocationCol = Move[0], Move[1]
+        TargetingMoveLocationRow, TargetingMoveLocationCol = Move[-2], Move[-1]
         NewState = [Row[:] for Row in State]
         Piece = NewState[StartingMoveLocationRow][StartingMoveLocationCol]
-        NewState[TargetingMoveLocationRow][TargetingMoveLocationCol] = Piece
         NewState[StartingMoveLocationRow][StartingMoveLocationCol] = '.'
-        if abs(TargetingMoveLocationRow - StartingMoveLocationRow) == 2:
-            MidRow = (StartingMoveLocationRow + TargetingMoveLocationRow) // 2
-            MidCol = (StartingMoveLocationCol + TargetingMoveLocationCol) // 2
-            NewState[MidRow][MidCol] = '.'
+        # Remove the piece jumped by every hop of the move.
+        for Index in range(0, len(Move) - 2, 2):
+            FromRow, FromCol, ToRow, ToCol = Move[Index:Index + 4]
+            if abs(ToRow - FromRow) == 2:
+                NewState[(FromRow + ToRow) // 2][(FromCol + ToCol) // 2] = '.'
+        NewState[TargetingMoveLocationRow][TargetingMoveLocationCol] = Piece
         if Piece == 'B' and TargetingMoveLocationRow == 7:
             NewState[TargetingMoveLocationRow][TargetingMoveLocationCol] = 'BK'
         elif Piece == 'W' and TargetingMoveLocationRow == 0:
@@ -0,0 +1,251 @@
+"""
+Module: Tournament
+Purpose: Plays headless CheckersAI vs CheckersAI matches over a process pool.
+         Each game starts from a few random opening plies and every opening is played
+         twice with colors swapped. Games end when the side to move has no move, on
+         threefold repetition or at the move limit (both draws). Results stream to a
+         tab-separated file, one line per game, and a summary gives the win/draw/loss
+         record, an Elo estimate and each engine's nodes per second.
+
+Usage:
+    python Tournament.py --games 1000 --workers 8 --a-depth 6 --b-time 100 --output Results.tsv
+    python Tournament.py --games 1000 --a-time 100 --b-time 100 --b-algorithm pvs
+"""
+
+import argparse
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from BitBoard import BitBoard, MoveToNotation, ZOBRIST_SIDE
+
+RESULT_FIELDS = ("Game", "AColor", "Result", "Reason", "Plies",
+                 "ANodes", "ASeconds", "BNodes", "BSeconds", "Opening")
+
+# Per-process engines of a pool worker, set up by _InitWorker.
+_Engines = None
+
+
+class EngineConfig:
+    def __init__(self, Name, MaxDepth=64, TimeLimitMs=None, NodeLimit=None,
+                 TableMemoryBytes=16 * 1024 * 1024, EvaluationPath=None, QuiescenceDepth=8, Algorithm="minimax"):
+        """
+        Search settings of one tournament engine: a fixed depth (MaxDepth with no other
+        limit), a per-move time control in milliseconds, and/or a per-move node cap.
+        EvaluationPath names a JSON file of evaluation weights; None uses the defaults.
+        QuiescenceDepth caps the capture search past the horizon (0 disables it).
+        Algorithm is the search of CheckersAI.IterativeDeepening, "minimax" or "pvs".
+        """
+        self.Name = Name
+        self.MaxDepth = MaxDepth
+        self.TimeLimitMs = TimeLimitMs
+        self.NodeLimit = NodeLimit
+        self.TableMemoryBytes = TableMemoryBytes
+        self.EvaluationPath = EvaluationPath
+        self.QuiescenceDepth = QuiescenceDepth
+        self.Algorithm = Algorithm
+
+    def __repr__(self):
+        Limits = ["depth %d" % self.MaxDepth]
+        if self.TimeLimitMs is not None:
+            Limits.append("%d ms" % self.TimeLimitMs)
+        if self.NodeLimit is not None:
+            Limits.append("%d nodes" % self.NodeLimit)
+        if self.Algorithm != "minimax":
+            Limits.append(self.Algorithm)
+        if self.QuiescenceDepth != 8:
+            Limits.append("quiescence %d" % self.QuiescenceDepth)
+        if self.EvaluationPath is not None:
+            Limits.append(self.EvaluationPath)
+        return "%s (%s)" % (self.Name, ", ".join(Limits))
+
+
+def RandomOpening(Seed, Plies):
+    """Return a list of Plies random legal moves from the initial position (shorter if the game ends)."""
+    from GameBoard import GameBoard
+    Rng = random.Random(Seed)
+    Board = BitBoard.FromBoard(GameBoard().Board)
+    Player = 'W'  # White moves first, as in PlayCheckers.
+    Opening = []
+    for _ in range(Plies):
+        Moves = Board.GetMoves(Player)
+        if not Moves:
+            break
+        Move = Rng.choice(Moves)
+        Board.MakeMove(Move)
+        Opening.append(Move)
+        Player = 'B' if Player == 'W' else 'W'
+    return Opening
+
+
+def _InitWorker(Configs):
+    """Create one CheckersAI per engine for this worker."""
+    global _Engines
+    from GameBoard import GameBoard
+    from SearchToolBox import CheckersAI
+    _Engines = []
+    for Config in Configs:
+        AI = CheckersAI(GameBoard(), Config.TableMemoryBytes)
+        AI.QuiescenceDepth = Config.QuiescenceDepth
+        AI.Algorithm = Config.Algorithm
+        if Config.EvaluationPath is not None:
+            AI.LoadEvaluation(Config.EvaluationPath)
+        _Engines.append((Config, AI))
+
+
+def PlayGame(Engines, AColor, Opening, MaxPlies=200):
+    """
+    Play one game between Engines[0] (A, playing AColor) and Engines[1] (B) after the
+    Opening moves. Returns (Result, Reason, Plies, ANodes, ASeconds, BNodes, BSeconds)
+    with Result '1-0', '0-1' or '1/2' from A's point of view.
+    """
+    from GameBoard import GameBoard
+    Board = BitBoard.FromBoard(GameBoard().Board)
+    Player = 'W'
+    for Move in Opening:
+        Board.MakeMove(Move)
+        Player = 'B' if Player == 'W' else 'W'
+    for _, AI in Engines:
+        AI.Table.Clear()
+    Nodes = [0, 0]
+    Seconds = [0.0, 0.0]
+    Seen = {}
+    Plies = len(Opening)
+    while True:
+        Key = Board.Hash if Player == 'B' else Board.Hash ^ ZOBRIST_SIDE
+        Seen[Key] = Seen.get(Key, 0) + 1
+        if Seen[Key] >= 3:
+            Result, Reason = '1/2', "repetition"
+            break
+        if Plies >= MaxPlies:
+            Result, Reason = '1/2', "move limit"
+            break
+        if not Board.GetMoves(Player):
+            Result, Reason = ('0-1' if Player == AColor else '1-0'), "no moves"
+            break
+        Index = 0 if Player == AColor else 1
+        Config, AI = Engines[Index]
+        StartTime = time.perf_counter()
+        _, Move = AI.IterativeDeepening(Board, TimeLimitMs=Config.TimeLimitMs, NodeLimit=Config.NodeLimit,
+                                        MaxDepth=Config.MaxDepth, IsMaximizing=Player == 'B')
+        Seconds[Index] += time.perf_counter() - StartTime
+        Nodes[Index] += AI.SearchNodes
+        Board.MakeMove(Move)
+        Player = 'B' if Player == 'W' else 'W'
+        Plies += 1
+    return Result, Reason, Plies, Nodes[0], Seconds[0], Nodes[1], Seconds[1]
+
+
+def _PlayGame(Game, AColor, Opening, MaxPlies):
+    """Worker entry point: play one game with this process's engines."""
+    return (Game, AColor, Opening) + PlayGame(_Engines, AColor, Opening, MaxPlies)
+
+
+def EloEstimate(Wins, Draws, Losses):
+    """Return (Elo difference of A over B, 95% margin) from a match record; infinite if one side scored 0%."""
+    Games = Wins + Draws + Losses
+    if Games == 0:
+        return 0.0, math.inf
+    Score = (Wins + Draws / 2) / Games
+    if Score <= 0 or Score >= 1:
+        return (math.inf if Score >= 1 else -math.inf), math.inf
+    Elo = -400 * math.log10(1 / Score - 1)
+    Deviation = math.sqrt((Wins * (1 - Score) ** 2 + Draws * (0.5 - Score) ** 2 +
+                           Losses * Score ** 2) / Games) / math.sqrt(Games)
+    Upper = min(Score + 1.96 * Deviation, 1 - 1e-9)
+    Lower = max(Score - 1.96 * Deviation, 1e-9)
+    Margin = (-400 * math.log10(1 / Upper - 1) + 400 * math.log10(1 / Lower - 1)) / 2
+    return Elo, Margin
+
+
+def RunTournament(ConfigA, ConfigB, Games, OutputPath, Workers=None, OpeningPlies=4, MaxPlies=200,
+                  Seed=0, Report=print):
+    """
+    Play Games games of ConfigA against ConfigB on Workers processes, appending one line per
+    finished game to OutputPath. Returns the summary dictionary that is also reported.
+    """
+    Wins = Draws = Losses = 0
+    Nodes = [0, 0]
+    Seconds = [0.0, 0.0]
+    StartTime = time.perf_counter()
+    with open(OutputPath, "w") as Output, \
+            ProcessPoolExecutor(max_workers=Workers, initializer=_InitWorker,
+                                initargs=((ConfigA, ConfigB),)) as Pool:
+        Output.write("# %r vs %r\n" % (ConfigA, ConfigB))
+        Output.write("\t".join(RESULT_FIELDS) + "\n")
+        Futures = []
+        for Game in range(Games):
+            # Each opening is played twice with the colors swapped.
+            Opening = RandomOpening(Seed + Game // 2, OpeningPlies)
+            Futures.append(Pool.submit(_PlayGame, Game, 'B' if Game % 2 == 0 else 'W', Opening, MaxPlies))
+        for Done, Future in enumerate(as_completed(Futures), 1):
+            (Game, AColor, Opening, Result, Reason, Plies,
+             ANodes, ASeconds, BNodes, BSeconds) = Future.result()
+            Wins += Result == '1-0'
+            Draws += Result == '1/2'
+            Losses += Result == '0-1'
+            Nodes[0] += ANodes
+            Nodes[1] += BNodes
+            Seconds[0] += ASeconds
+            Seconds[1] += BSeconds
+            Output.write("%d\t%s\t%s\t%s\t%d\t%d\t%.3f\t%d\t%.3f\t%s\n"
+                         % (Game, AColor, Result, Reason, Plies, ANodes, ASeconds, BNodes, BSeconds,
+                            " ".join(MoveToNotation(Move) for Move in Opening)))
+            Output.flush()
+            if Done % 100 == 0 or Done == Games:
+                Elo, Margin = EloEstimate(Wins, Draws, Losses)
+                Report("%d/%d games: +%d =%d -%d, Elo %+.0f ± %.0f"
+                       % (Done, Games, Wins, Draws, Losses, Elo, Margin))
+    Elo, Margin = EloEstimate(Wins, Draws, Losses)
+    Summary = {
+        "Games": Games,
+        "Wins": Wins,
+        "Draws": Draws,
+        "Losses": Losses,
+        "Elo": Elo,
+        "Elo Margin": Margin,
+        "A Nodes Per Second": Nodes[0] / Seconds[0] if Seconds[0] else 0,
+        "B Nodes Per Second": Nodes[1] / Seconds[1] if Seconds[1] else 0,
+        "Wall Time": time.perf_counter() - StartTime,
+    }
+    for Name, Value in Summary.items():
+        Report("%s: %s" % (Name, "%.1f" % Value if isinstance(Value, float) else Value))
+    return Summary
+
+
+def Main(Arguments=None):
+    """Command-line entry point for engine-vs-engine matches."""
+    from SearchToolBox import MINIMAX, SEARCH_ALGORITHMS
+    Parser = argparse.ArgumentParser(description="Play a headless CheckersAI vs CheckersAI match.")
+    Parser.add_argument("--games", type=int, default=100, help="number of games (default 100)")
+    Parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    for Engine in ("a", "b"):
+        Parser.add_argument("--%s-depth" % Engine, type=int, default=64, help="engine %s search depth" % Engine.upper())
+        Parser.add_argument("--%s-time" % Engine, type=int, default=None, help="engine %s ms per move" % Engine.upper())
+        Parser.add_argument("--%s-nodes" % Engine, type=int, default=None, help="engine %s nodes per move" % Engine.upper())
+        Parser.add_argument("--%s-eval" % Engine, default=None, help="engine %s evaluation weights file" % Engine.upper())
+        Parser.add_argument("--%s-quiescence" % Engine, type=int, default=8,
+                            help="engine %s capture search plies past the horizon, 0 disables (default 8)" % Engine.upper())
+        Parser.add_argument("--%s-algorithm" % Engine, choices=SEARCH_ALGORITHMS, default=MINIMAX,
+                            help="engine %s search algorithm (default minimax)" % Engine.upper())
+    Parser.add_argument("--opening-plies", type=int, default=4, help="random opening plies (default 4)")
+    Parser.add_argument("--max-plies", type=int, default=200, help="plies before a game is drawn (default 200)")
+    Parser.add_argument("--seed", type=int, default=0, help="seed of the random openings")
+    Parser.add_argument("--output", default="Results.tsv", help="results file")
+    Options = Parser.parse_args(Arguments)
+    Configs = []
+    for Engine in ("a", "b"):
+        Depth, TimeLimitMs, NodeLimit = (getattr(Options, "%s_%s" % (Engine, Name)) for Name in ("depth", "time", "nodes"))
+        if Depth == 64 and TimeLimitMs is None and NodeLimit is None:
+            TimeLimitMs = 100  # Some limit is needed; default to a fast time control.
+        Configs.append(EngineConfig(Engine.upper(), Depth, TimeLimitMs, NodeLimit,
+                                    EvaluationPath=getattr(Options, "%s_eval" % Engine),
+                                    QuiescenceDepth=getattr(Options, "%s_quiescence" % Engine),
+                                    Algorithm=getattr(Options, "%s_algorithm" % Engine)))
+    RunTournament(Configs[0], Configs[1], Options.games, Options.output, Options.workers,
+                  Options.opening_plies, Options.max_plies, Options.seed)
+
+
+if __name__ == "__main__":
+    Main()
@@ -0,0 +1,65 @@
+"""
+Module: TranspositionTable
+Purpose: Implements a fixed-size transposition table for the Minimax search, keyed by the
+         Zobrist hashes that BitBoard keeps up to date. Entries remember the depth, score,
+         bound type and best move of a searched position so that transpositions and later
+         turns do not search the same subtree again.
+"""
+
+# Bound types stored with each score.
+EXACT = 0
+LOWER_BOUND = 1  # The search failed high: the true score is >= the stored score.
+UPPER_BOUND = 2  # The search failed low: the true score is <= the stored score.
+
+# Replacement policies for an occupied slot.
+DEPTH_PREFERRED = "depth-preferred"
+ALWAYS_REPLACE = "always-replace"
+
+# Approximate memory used by one slot: the list pointer plus an entry tuple and its fields.
+ENTRY_BYTES = 144
+
+
+class TranspositionTable:
+    def __init__(self, MemoryLimitBytes=16 * 1024 * 1024, ReplacementPolicy=DEPTH_PREFERRED):
+        """
+        Allocate a table that fits in MemoryLimitBytes.
+        ReplacementPolicy is DEPTH_PREFERRED (keep the deeper entry unless it is left over
+        from an earlier search) or ALWAYS_REPLACE.
+        """
+        if ReplacementPolicy not in (DEPTH_PREFERRED, ALWAYS_REPLACE):
+            raise ValueError("Unknown replacement policy: %r" % (ReplacementPolicy,))
+        self.Size = max(1, MemoryLimitBytes // ENTRY_BYTES)
+        self.ReplacementPolicy = ReplacementPolicy
+        self.Entries = [None] * self.Size
+        self.Generation = 0  # Bumped once per root search so stale entries can be replaced.
+
+    def NewSearch(self):
+        """Mark the start of a new root search; older entries become replaceable."""
+        self.Generation += 1
+
+    def Clear(self):
+        """Remove every entry from the table."""
+        self.Entries = [None] * self.Size
+
+    def Probe(self, Key):
+        """
+        Return the entry stored in Key's slot, or None if the slot is empty.
+        Entries are tuples (Key, Depth, Score, Bound, BestMove, Generation); the caller
+        must compare Entry[0] with Key, since a different position may share the slot.
+        """
+        return self.Entries[Key % self.Size]
+
+    def Store(self, Key, Depth, Score, Bound, BestMove):
+        """Store a search result, subject to the replacement policy."""
+        Index = Key % self.Size
+        Existing = self.Entries[Index]
+        if (Existing is not None and self.ReplacementPolicy == DEPTH_PREFERRED
+                and Existing[0] != Key and Existing[5] == self.Generation and Existing[1] > Depth):
+            return
+        if BestMove is None and Existing is not None and Existing[0] == Key:
+            BestMove = Existing[4]  # Keep the known best move for move ordering.
+        self.Entries[Index] = (Key, Depth, Score, Bound, BestMove, self.Generation)
+
+    def Usage(self):
+        """Return the fraction of slots that hold an entry."""
+        return sum(1 for Entry in self.Entries if Entry is not None) / self.Size
@@ -0,0 +1,60 @@
+"""
+Module: test_evaluation
+Purpose: Checks that a default search scores wide frontier nodes with the batched NumPy
+         evaluator, and that batching does not change the search result.
+         Run with: python -m unittest test_evaluation
+"""
+
+import unittest
+
+import Evaluation
+from BitBoard import BitBoard
+from GameBoard import GameBoard
+from SearchToolBox import CheckersAI
+
+
+def Squares(*Indices):
+    return sum(1 << Index for Index in Indices)
+
+
+# Eight kings a side, two rows apart: 21 moves each, none of them a capture.
+BLACK = Squares(0, 1, 2, 3, 8, 9, 10, 11)
+WHITE = Squares(20, 21, 22, 23, 28, 29, 30, 31)
+
+
+class BatchedEvaluationTest(unittest.TestCase):
+    def Search(self):
+        AI = CheckersAI(GameBoard())
+        Result = AI.IterativeDeepening(BitBoard(BLACK, WHITE, BLACK | WHITE), MaxDepth=4, IsMaximizing=True)
+        return Result, AI
+
+    @unittest.skipIf(Evaluation.numpy is None, "NumPy is not installed")
+    def test_default_search_batches_wide_frontiers(self):
+        Batched, AI = self.Search()
+        self.assertGreater(AI.BatchedEvaluations, 0)
+        Threshold = Evaluation.NUMPY_MIN_BATCH
+        Evaluation.NUMPY_MIN_BATCH = 1 << 30
+        try:
+            Scalar, ScalarAI = self.Search()
+        finally:
+            Evaluation.NUMPY_MIN_BATCH = Threshold
+        self.assertEqual(ScalarAI.BatchedEvaluations, 0)
+        self.assertEqual(Batched, Scalar)
+        self.assertEqual(AI.SearchNodes, ScalarAI.SearchNodes)
+
+    @unittest.skipIf(Evaluation.numpy is None, "NumPy is not installed")
+    def test_stacked_scores_match_scalar(self):
+        Board = BitBoard(BLACK, WHITE, Squares(0, 9, 22, 31))
+        Evaluator = Evaluation.Evaluator()
+        Moves = Board.GetMoves('B')
+        Expected = []
+        for Move in Moves:
+            Undo = Board.MakeMove(Move)
+            Expected.append(Evaluator.Evaluate(Board))
+            Board.UnmakeMove(Undo)
+        self.assertTrue(Evaluator.PrefersBatch(len(Moves)))
+        self.assertEqual(Evaluator.EvaluateChildren(Board, Moves), Expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+"""
+Module: test_opening_book
+Purpose: Checks that OpeningBook.ImportLines reads numeric-notation game lines as found
+         in game collections, with move numbers and game results.
+         Run with: python -m unittest test_opening_book
+"""
+
+import os
+import tempfile
+import unittest
+
+from BitBoard import MoveToNotation, ParseFEN
+from OpeningBook import ImportLines, OpeningBook
+
+LINES = [
+    "24-20 11-15 *",
+    "1. 24-20 11-15 2. 28-24 1-0",
+    "22-18 9-13 1/2-1/2",
+    "22-18 abc 9-13",
+]
+
+
+class ImportLinesTest(unittest.TestCase):
+    def test_result_tokens_are_not_moves(self):
+        Reports = []
+        with tempfile.TemporaryDirectory() as Directory:
+            Path = os.path.join(Directory, "Book.ckob")
+            self.assertEqual(ImportLines(LINES, Path, Report=Reports.append), 5)
+            Book = OpeningBook(Path)
+            Board, _ = ParseFEN("W:W21-32:B1-12")
+            self.assertEqual(sorted((MoveToNotation(Move), Weight) for Move, Weight in Book.Candidates(Board, 'W')),
+                             [("22-18", 2), ("24-20", 2)])
+        self.assertEqual(Reports[:-1], ["Line 4: abc is not legal here; rest of line skipped"])
+
+
+if __name__ == "__main__":
+    unittest.main()
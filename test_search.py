@@ -0,0 +1,43 @@
+"""
+Module: test_search
+Purpose: Regression checks for CheckersAI searches on positions that are already decided.
+         Run with: python -m unittest test_search
+"""
+
+import math
+import unittest
+
+from BitBoard import BitBoard, ParseFEN
+from GameBoard import GameBoard
+from SearchToolBox import PVS, CheckersAI
+
+
+class DecidedPositionTest(unittest.TestCase):
+    def test_aspiration_search_ends_on_a_won_score(self):
+        # Black wins within a few plies, so an aspiration window around the last score fails high on +inf.
+        for Black, White, Kings in ((0x80, 0x40001, 0x80), (0x1410400, 0x9, 0), (0x1002000, 0x1, 0)):
+            Scores = []
+            for Algorithm in ("minimax", PVS):
+                AI = CheckersAI(GameBoard())
+                AI.Algorithm = Algorithm
+                Scores.append(AI.IterativeDeepening(BitBoard(Black, White, Kings), MaxDepth=8, NodeLimit=200000)[0])
+                self.assertLess(AI.AspirationResearches, 10)
+            self.assertEqual(Scores, [math.inf, math.inf])
+
+    def test_parallel_search_of_a_root_without_moves(self):
+        Board, Player = ParseFEN("B:W5,6,10:B1")
+        Results = []
+        for Workers in (None, 2):
+            AI = CheckersAI(GameBoard())
+            if Workers:
+                AI.EnableParallelSearch(Workers)
+            try:
+                Results.append((AI.IterativeDeepening(Board, MaxDepth=4, IsMaximizing=Player == 'B'),
+                                AI.CompletedDepth))
+            finally:
+                AI.DisableParallelSearch()
+        self.assertEqual(Results, [((-math.inf, None), 1)] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()